@@ -1,19 +1,149 @@
 """
 Auto-generated ABI for truepass contract
-Generated from: 0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4
+Generated from: 0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass
 Network: testnet
 """
 
+ABI_HASH = "f68f06703d89fd8558b1a3d865abf905ef1dc253db7ca3e8fa8fdc5238889ebd"
+
 ABI = {
     "address": "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4",
     "name": "truepass",
     "friends": [],
     "exposed_functions": [
+        {
+            "name": "add_to_whitelist",
+            "visibility": "public",
+            "is_entry": True,
+            "is_view": False,
+            "generic_type_params": [],
+            "params": [
+                "signer",
+                "address"
+            ],
+            "return": []
+        },
+        {
+            "name": "batch_add_to_whitelist",
+            "visibility": "public",
+            "is_entry": True,
+            "is_view": False,
+            "generic_type_params": [],
+            "params": [
+                "signer",
+                "vector<address>"
+            ],
+            "return": []
+        },
+        {
+            "name": "batch_delete_key",
+            "visibility": "public",
+            "is_entry": True,
+            "is_view": False,
+            "generic_type_params": [],
+            "params": [
+                "signer",
+                "vector<0x1::string::String>"
+            ],
+            "return": []
+        },
+        {
+            "name": "batch_remove_from_whitelist",
+            "visibility": "public",
+            "is_entry": True,
+            "is_view": False,
+            "generic_type_params": [],
+            "params": [
+                "signer",
+                "vector<address>"
+            ],
+            "return": []
+        },
+        {
+            "name": "batch_set_key_value",
+            "visibility": "public",
+            "is_entry": True,
+            "is_view": False,
+            "generic_type_params": [],
+            "params": [
+                "signer",
+                "vector<0x1::string::String>",
+                "vector<0x1::string::String>"
+            ],
+            "return": []
+        },
+        {
+            "name": "delete_key",
+            "visibility": "public",
+            "is_entry": True,
+            "is_view": False,
+            "generic_type_params": [],
+            "params": [
+                "signer",
+                "0x1::string::String"
+            ],
+            "return": []
+        },
+        {
+            "name": "get_all_keys",
+            "visibility": "public",
+            "is_entry": False,
+            "is_view": True,
+            "generic_type_params": [],
+            "params": [],
+            "return": [
+                "vector<0x1::string::String>"
+            ]
+        },
+        {
+            "name": "get_entries_page",
+            "visibility": "public",
+            "is_entry": False,
+            "is_view": True,
+            "generic_type_params": [],
+            "params": [
+                "u64",
+                "u64"
+            ],
+            "return": [
+                "vector<0x1::string::String>",
+                "vector<0x1::string::String>",
+                "u64"
+            ]
+        },
+        {
+            "name": "get_key_value",
+            "visibility": "public",
+            "is_entry": False,
+            "is_view": True,
+            "generic_type_params": [],
+            "params": [
+                "0x1::string::String"
+            ],
+            "return": [
+                "0x1::string::String"
+            ]
+        },
+        {
+            "name": "get_keys_page",
+            "visibility": "public",
+            "is_entry": False,
+            "is_view": True,
+            "generic_type_params": [],
+            "params": [
+                "u64",
+                "u64"
+            ],
+            "return": [
+                "vector<0x1::string::String>",
+                "u64"
+            ]
+        },
         {
             "name": "get_message",
             "visibility": "public",
-            "is_entry": false,
-            "is_view": true,
+            "is_entry": False,
+            "is_view": True,
             "generic_type_params": [],
             "params": [
                 "address"
@@ -25,8 +155,8 @@ ABI = {
         {
             "name": "get_number",
             "visibility": "public",
-            "is_entry": false,
-            "is_view": true,
+            "is_entry": False,
+            "is_view": True,
             "generic_type_params": [],
             "params": [],
             "return": [
@@ -36,8 +166,8 @@ ABI = {
         {
             "name": "get_status",
             "visibility": "public",
-            "is_entry": false,
-            "is_view": true,
+            "is_entry": False,
+            "is_view": True,
             "generic_type_params": [],
             "params": [
                 "address"
@@ -46,22 +176,157 @@ ABI = {
                 "bool"
             ]
         },
+        {
+            "name": "get_whitelist",
+            "visibility": "public",
+            "is_entry": False,
+            "is_view": True,
+            "generic_type_params": [],
+            "params": [],
+            "return": [
+                "vector<address>"
+            ]
+        },
+        {
+            "name": "get_whitelist_page",
+            "visibility": "public",
+            "is_entry": False,
+            "is_view": True,
+            "generic_type_params": [],
+            "params": [
+                "u64",
+                "u64"
+            ],
+            "return": [
+                "vector<address>",
+                "u64"
+            ]
+        },
+        {
+            "name": "init_database",
+            "visibility": "public",
+            "is_entry": True,
+            "is_view": False,
+            "generic_type_params": [],
+            "params": [
+                "signer"
+            ],
+            "return": []
+        },
         {
             "name": "init_status",
             "visibility": "public",
-            "is_entry": true,
-            "is_view": false,
+            "is_entry": True,
+            "is_view": False,
             "generic_type_params": [],
             "params": [
                 "signer"
             ],
             "return": []
         },
+        {
+            "name": "init_whitelist",
+            "visibility": "public",
+            "is_entry": True,
+            "is_view": False,
+            "generic_type_params": [],
+            "params": [
+                "signer"
+            ],
+            "return": []
+        },
+        {
+            "name": "is_whitelisted",
+            "visibility": "public",
+            "is_entry": False,
+            "is_view": True,
+            "generic_type_params": [],
+            "params": [
+                "address"
+            ],
+            "return": [
+                "bool"
+            ]
+        },
+        {
+            "name": "key_exists",
+            "visibility": "public",
+            "is_entry": False,
+            "is_view": True,
+            "generic_type_params": [],
+            "params": [
+                "0x1::string::String"
+            ],
+            "return": [
+                "bool"
+            ]
+        },
+        {
+            "name": "migrate_database",
+            "visibility": "public",
+            "is_entry": True,
+            "is_view": False,
+            "generic_type_params": [],
+            "params": [
+                "signer",
+                "u64"
+            ],
+            "return": []
+        },
+        {
+            "name": "migrate_whitelist",
+            "visibility": "public",
+            "is_entry": True,
+            "is_view": False,
+            "generic_type_params": [],
+            "params": [
+                "signer",
+                "u64"
+            ],
+            "return": []
+        },
+        {
+            "name": "pending_migration",
+            "visibility": "public",
+            "is_entry": False,
+            "is_view": True,
+            "generic_type_params": [],
+            "params": [],
+            "return": [
+                "u64",
+                "u64"
+            ]
+        },
+        {
+            "name": "remove_from_whitelist",
+            "visibility": "public",
+            "is_entry": True,
+            "is_view": False,
+            "generic_type_params": [],
+            "params": [
+                "signer",
+                "address"
+            ],
+            "return": []
+        },
+        {
+            "name": "set_key_value",
+            "visibility": "public",
+            "is_entry": True,
+            "is_view": False,
+            "generic_type_params": [],
+            "params": [
+                "signer",
+                "0x1::string::String",
+                "0x1::string::String"
+            ],
+            "return": []
+        },
         {
             "name": "set_message",
             "visibility": "public",
-            "is_entry": true,
-            "is_view": false,
+            "is_entry": True,
+            "is_view": False,
             "generic_type_params": [],
             "params": [
                 "signer",
@@ -72,8 +337,8 @@ ABI = {
         {
             "name": "set_status_true",
             "visibility": "public",
-            "is_entry": true,
-            "is_view": false,
+            "is_entry": True,
+            "is_view": False,
             "generic_type_params": [],
             "params": [
                 "signer"
@@ -83,8 +348,8 @@ ABI = {
         {
             "name": "update_status",
             "visibility": "public",
-            "is_entry": true,
-            "is_view": false,
+            "is_entry": True,
+            "is_view": False,
             "generic_type_params": [],
             "params": [
                 "address",
@@ -96,8 +361,8 @@ ABI = {
     "structs": [
         {
             "name": "AddressStatusHolder",
-            "is_native": false,
-            "is_event": false,
+            "is_native": False,
+            "is_event": False,
             "abilities": [
                 "key"
             ],
@@ -109,10 +374,140 @@ ABI = {
                 }
             ]
         },
+        {
+            "name": "DatabaseChange",
+            "is_native": False,
+            "is_event": True,
+            "abilities": [
+                "drop",
+                "store"
+            ],
+            "generic_type_params": [],
+            "fields": [
+                {
+                    "name": "account",
+                    "type": "address"
+                },
+                {
+                    "name": "key",
+                    "type": "0x1::string::String"
+                },
+                {
+                    "name": "old_value",
+                    "type": "0x1::string::String"
+                },
+                {
+                    "name": "new_value",
+                    "type": "0x1::string::String"
+                }
+            ]
+        },
+        {
+            "name": "IndexedValue",
+            "is_native": False,
+            "is_event": False,
+            "abilities": [
+                "drop",
+                "store"
+            ],
+            "generic_type_params": [],
+            "fields": [
+                {
+                    "name": "value",
+                    "type": "0x1::string::String"
+                },
+                {
+                    "name": "position",
+                    "type": "u64"
+                }
+            ]
+        },
+        {
+            "name": "KeyDeleted",
+            "is_native": False,
+            "is_event": True,
+            "abilities": [
+                "drop",
+                "store"
+            ],
+            "generic_type_params": [],
+            "fields": [
+                {
+                    "name": "account",
+                    "type": "address"
+                },
+                {
+                    "name": "key",
+                    "type": "0x1::string::String"
+                },
+                {
+                    "name": "old_value",
+                    "type": "0x1::string::String"
+                }
+            ]
+        },
+        {
+            "name": "KeyValueDatabase",
+            "is_native": False,
+            "is_event": False,
+            "abilities": [
+                "key"
+            ],
+            "generic_type_params": [],
+            "fields": [
+                {
+                    "name": "data",
+                    "type": "vector<0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass::KeyValuePair>"
+                }
+            ]
+        },
+        {
+            "name": "KeyValueIndex",
+            "is_native": False,
+            "is_event": False,
+            "abilities": [
+                "key"
+            ],
+            "generic_type_params": [],
+            "fields": [
+                {
+                    "name": "entries",
+                    "type": "0x1::table::Table<0x1::string::String, 0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass::IndexedValue>"
+                },
+                {
+                    "name": "keys",
+                    "type": "0x1::table::Table<u64, 0x1::string::String>"
+                },
+                {
+                    "name": "length",
+                    "type": "u64"
+                }
+            ]
+        },
+        {
+            "name": "KeyValuePair",
+            "is_native": False,
+            "is_event": False,
+            "abilities": [
+                "drop",
+                "store"
+            ],
+            "generic_type_params": [],
+            "fields": [
+                {
+                    "name": "key",
+                    "type": "0x1::string::String"
+                },
+                {
+                    "name": "value",
+                    "type": "0x1::string::String"
+                }
+            ]
+        },
         {
             "name": "MessageChange",
-            "is_native": false,
-            "is_event": true,
+            "is_native": False,
+            "is_event": True,
             "abilities": [
                 "drop",
                 "store"
@@ -135,8 +530,8 @@ ABI = {
         },
         {
             "name": "MessageHolder",
-            "is_native": false,
-            "is_event": false,
+            "is_native": False,
+            "is_event": False,
             "abilities": [
                 "key"
             ],
@@ -147,6 +542,44 @@ ABI = {
                     "type": "0x1::string::String"
                 }
             ]
+        },
+        {
+            "name": "Whitelist",
+            "is_native": False,
+            "is_event": False,
+            "abilities": [
+                "key"
+            ],
+            "generic_type_params": [],
+            "fields": [
+                {
+                    "name": "allowed_addresses",
+                    "type": "vector<address>"
+                }
+            ]
+        },
+        {
+            "name": "WhitelistIndex",
+            "is_native": False,
+            "is_event": False,
+            "abilities": [
+                "key"
+            ],
+            "generic_type_params": [],
+            "fields": [
+                {
+                    "name": "positions",
+                    "type": "0x1::table::Table<address, u64>"
+                },
+                {
+                    "name": "members",
+                    "type": "0x1::table::Table<u64, address>"
+                },
+                {
+                    "name": "length",
+                    "type": "u64"
+                }
+            ]
         }
     ]
 }
@@ -155,24 +588,174 @@ ABI = {
 CONTRACT_ADDRESS = "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4"
 MODULE_NAME = "truepass"
 
+# 生成时建好的索引，查找为 O(1)，导入时不做任何扫描
+FUNCTIONS = {
+    "add_to_whitelist": ABI["exposed_functions"][0],
+    "batch_add_to_whitelist": ABI["exposed_functions"][1],
+    "batch_delete_key": ABI["exposed_functions"][2],
+    "batch_remove_from_whitelist": ABI["exposed_functions"][3],
+    "batch_set_key_value": ABI["exposed_functions"][4],
+    "delete_key": ABI["exposed_functions"][5],
+    "get_all_keys": ABI["exposed_functions"][6],
+    "get_entries_page": ABI["exposed_functions"][7],
+    "get_key_value": ABI["exposed_functions"][8],
+    "get_keys_page": ABI["exposed_functions"][9],
+    "get_message": ABI["exposed_functions"][10],
+    "get_number": ABI["exposed_functions"][11],
+    "get_status": ABI["exposed_functions"][12],
+    "get_whitelist": ABI["exposed_functions"][13],
+    "get_whitelist_page": ABI["exposed_functions"][14],
+    "init_database": ABI["exposed_functions"][15],
+    "init_status": ABI["exposed_functions"][16],
+    "init_whitelist": ABI["exposed_functions"][17],
+    "is_whitelisted": ABI["exposed_functions"][18],
+    "key_exists": ABI["exposed_functions"][19],
+    "migrate_database": ABI["exposed_functions"][20],
+    "migrate_whitelist": ABI["exposed_functions"][21],
+    "pending_migration": ABI["exposed_functions"][22],
+    "remove_from_whitelist": ABI["exposed_functions"][23],
+    "set_key_value": ABI["exposed_functions"][24],
+    "set_message": ABI["exposed_functions"][25],
+    "set_status_true": ABI["exposed_functions"][26],
+    "update_status": ABI["exposed_functions"][27],
+}
+
+STRUCTS = {
+    "AddressStatusHolder": ABI["structs"][0],
+    "DatabaseChange": ABI["structs"][1],
+    "IndexedValue": ABI["structs"][2],
+    "KeyDeleted": ABI["structs"][3],
+    "KeyValueDatabase": ABI["structs"][4],
+    "KeyValueIndex": ABI["structs"][5],
+    "KeyValuePair": ABI["structs"][6],
+    "MessageChange": ABI["structs"][7],
+    "MessageHolder": ABI["structs"][8],
+    "Whitelist": ABI["structs"][9],
+    "WhitelistIndex": ABI["structs"][10],
+}
+
+VIEW_FUNCTION_NAMES = frozenset({
+    "get_all_keys",
+    "get_entries_page",
+    "get_key_value",
+    "get_keys_page",
+    "get_message",
+    "get_number",
+    "get_status",
+    "get_whitelist",
+    "get_whitelist_page",
+    "is_whitelisted",
+    "key_exists",
+    "pending_migration",
+})
+
+ENTRY_FUNCTION_NAMES = frozenset({
+    "add_to_whitelist",
+    "batch_add_to_whitelist",
+    "batch_delete_key",
+    "batch_remove_from_whitelist",
+    "batch_set_key_value",
+    "delete_key",
+    "init_database",
+    "init_status",
+    "init_whitelist",
+    "migrate_database",
+    "migrate_whitelist",
+    "remove_from_whitelist",
+    "set_key_value",
+    "set_message",
+    "set_status_true",
+    "update_status",
+})
+
+VIEW_FUNCTIONS = (
+    ABI["exposed_functions"][6],
+    ABI["exposed_functions"][7],
+    ABI["exposed_functions"][8],
+    ABI["exposed_functions"][9],
+    ABI["exposed_functions"][10],
+    ABI["exposed_functions"][11],
+    ABI["exposed_functions"][12],
+    ABI["exposed_functions"][13],
+    ABI["exposed_functions"][14],
+    ABI["exposed_functions"][18],
+    ABI["exposed_functions"][19],
+    ABI["exposed_functions"][22],
+)
+
+ENTRY_FUNCTIONS = (
+    ABI["exposed_functions"][0],
+    ABI["exposed_functions"][1],
+    ABI["exposed_functions"][2],
+    ABI["exposed_functions"][3],
+    ABI["exposed_functions"][4],
+    ABI["exposed_functions"][5],
+    ABI["exposed_functions"][15],
+    ABI["exposed_functions"][16],
+    ABI["exposed_functions"][17],
+    ABI["exposed_functions"][20],
+    ABI["exposed_functions"][21],
+    ABI["exposed_functions"][23],
+    ABI["exposed_functions"][24],
+    ABI["exposed_functions"][25],
+    ABI["exposed_functions"][26],
+    ABI["exposed_functions"][27],
+)
+
+# 所有生成模块：模块 ID -> ABI，"地址::模块::函数" -> 函数定义
+MODULES = {
+    "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass": ABI,
+}
+
+QUALIFIED_FUNCTIONS = {
+    "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass::add_to_whitelist": ABI["exposed_functions"][0],
+    "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass::batch_add_to_whitelist": ABI["exposed_functions"][1],
+    "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass::batch_delete_key": ABI["exposed_functions"][2],
+    "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass::batch_remove_from_whitelist": ABI["exposed_functions"][3],
+    "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass::batch_set_key_value": ABI["exposed_functions"][4],
+    "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass::delete_key": ABI["exposed_functions"][5],
+    "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass::get_all_keys": ABI["exposed_functions"][6],
+    "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass::get_entries_page": ABI["exposed_functions"][7],
+    "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass::get_key_value": ABI["exposed_functions"][8],
+    "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass::get_keys_page": ABI["exposed_functions"][9],
+    "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass::get_message": ABI["exposed_functions"][10],
+    "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass::get_number": ABI["exposed_functions"][11],
+    "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass::get_status": ABI["exposed_functions"][12],
+    "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass::get_whitelist": ABI["exposed_functions"][13],
+    "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass::get_whitelist_page": ABI["exposed_functions"][14],
+    "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass::init_database": ABI["exposed_functions"][15],
+    "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass::init_status": ABI["exposed_functions"][16],
+    "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass::init_whitelist": ABI["exposed_functions"][17],
+    "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass::is_whitelisted": ABI["exposed_functions"][18],
+    "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass::key_exists": ABI["exposed_functions"][19],
+    "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass::migrate_database": ABI["exposed_functions"][20],
+    "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass::migrate_whitelist": ABI["exposed_functions"][21],
+    "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass::pending_migration": ABI["exposed_functions"][22],
+    "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass::remove_from_whitelist": ABI["exposed_functions"][23],
+    "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass::set_key_value": ABI["exposed_functions"][24],
+    "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass::set_message": ABI["exposed_functions"][25],
+    "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass::set_status_true": ABI["exposed_functions"][26],
+    "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass::update_status": ABI["exposed_functions"][27],
+}
+
 def get_function_by_name(name: str):
     """Get function definition by name"""
-    for func in ABI["exposed_functions"]:
-        if func["name"] == name:
-            return func
-    return None
+    return FUNCTIONS.get(name)
 
 def get_struct_by_name(name: str):
     """Get struct definition by name"""
-    for struct in ABI["structs"]:
-        if struct["name"] == name:
-            return struct
-    return None
+    return STRUCTS.get(name)
 
 def get_view_functions():
     """Get all view functions"""
-    return [func for func in ABI["exposed_functions"] if func["is_view"]]
+    return list(VIEW_FUNCTIONS)
 
 def get_entry_functions():
     """Get all entry functions"""
-    return [func for func in ABI["exposed_functions"] if func["is_entry"]]
+    return list(ENTRY_FUNCTIONS)
+
+def is_view_function(name: str) -> bool:
+    return name in VIEW_FUNCTION_NAMES
+
+def is_entry_function(name: str) -> bool:
+    return name in ENTRY_FUNCTION_NAMES
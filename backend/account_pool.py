@@ -0,0 +1,203 @@
+"""
+签名账户池
+加载多个签名账户，把写操作分散到不同账户上：Aptos 按序列号串行执行同一账户的
+交易，单个账户的写吞吐有上限，多个账户并行提交时吞吐随账户数近似线性增长
+"""
+
+import asyncio
+from typing import Dict, Iterable, List, Optional
+from aptos_sdk.account import Account
+from abi import CONTRACT_ADDRESS
+
+# 各 entry 函数对签名账户的要求（未列出的函数任何账户都可以调用）；
+# OWN 表示状态存放在签名账户自己名下，必须由调用方指定账户，不能由池路由
+WHITELISTED = "whitelisted"
+DEPLOYER = "deployer"
+OWN = "own"
+SIGNER_REQUIREMENTS = {
+    "init_status": OWN,
+    "set_status_true": OWN,
+    "set_message": OWN,
+    "set_key_value": WHITELISTED,
+    "delete_key": WHITELISTED,
+    "batch_set_key_value": WHITELISTED,
+    "batch_delete_key": WHITELISTED,
+    "init_whitelist": DEPLOYER,
+    "add_to_whitelist": DEPLOYER,
+    "remove_from_whitelist": DEPLOYER,
+    "batch_add_to_whitelist": DEPLOYER,
+    "batch_remove_from_whitelist": DEPLOYER,
+    "init_database": DEPLOYER,
+    "migrate_whitelist": DEPLOYER,
+    "migrate_database": DEPLOYER,
+}
+
+
+def _normalize(address: str) -> str:
+    """统一地址格式（小写、补齐 64 位十六进制）便于比较"""
+    address = str(address).lower()
+    if address.startswith("0x"):
+        address = address[2:]
+    return "0x" + address.rjust(64, "0")
+
+
+def load_keys(path: str) -> List[Account]:
+    """从文件读取私钥（每行一个，# 开头为注释）"""
+    with open(path, encoding="utf-8") as f:
+        return [
+            Account.load_key(line.strip())
+            for line in f
+            if line.strip() and not line.lstrip().startswith("#")
+        ]
+
+
+class PooledSigner:
+    """池中的一个签名账户及其负载"""
+
+    def __init__(self, account: Account, pipeline):
+        self.account = account
+        self.address = _normalize(account.address())
+        self.pipeline = pipeline
+        # None 表示尚未查询白名单
+        self.whitelisted: Optional[bool] = None
+        self.in_flight = 0
+        self.submitted = 0
+        self.failed = 0
+
+    @property
+    def sequence_number(self) -> Optional[int]:
+        """下一笔交易的本地序列号（尚未同步时为 None）"""
+        return self.pipeline.next_sequence_number
+
+    def stats(self) -> dict:
+        return {
+            "whitelisted": self.whitelisted,
+            "in_flight": self.in_flight,
+            "submitted": self.submitted,
+            "failed": self.failed,
+            "sequence_number": self.sequence_number,
+        }
+
+
+class AccountPool:
+    """
+    多账户写入路由。
+
+    每次写入选择满足函数要求（白名单、部署者）的账户中在途交易最少的一个，
+    负载相同时轮流选择；交易经各账户自己的流水线提交，互不阻塞。把状态存放在
+    签名账户名下的函数（init_status、set_status_true、set_message）不参与路由：
+    必须通过 signer 指定账户，调用方应使用显式或默认账户提交（见 pins_signer）。
+    """
+
+    def __init__(self, client, accounts: Iterable[Account] = ()):
+        self.client = client
+        self.signers: Dict[str, PooledSigner] = {}
+        self._next = 0
+        self._whitelist_loaded = False
+        self._whitelist_lock = asyncio.Lock()
+        for account in accounts:
+            self.add(account)
+
+    def __len__(self) -> int:
+        return len(self.signers)
+
+    def add(self, account: Account) -> PooledSigner:
+        address = _normalize(account.address())
+        signer = self.signers.get(address)
+        if signer is None:
+            signer = PooledSigner(account, self.client.pipeline(account))
+            self.signers[address] = signer
+        return signer
+
+    async def refresh_whitelist(self):
+        """重新读取链上白名单，更新各账户的资格"""
+        allowed = set()
+        async for address in self.client.iter_whitelist():
+            allowed.add(_normalize(address))
+        for signer in self.signers.values():
+            signer.whitelisted = signer.address in allowed
+        self._whitelist_loaded = True
+
+    @staticmethod
+    def pins_signer(function_name: str) -> bool:
+        """该函数是否写入签名账户自己名下的状态（不能由池选择账户）"""
+        return SIGNER_REQUIREMENTS.get(function_name) == OWN
+
+    async def eligible(self, function_name: str) -> List[PooledSigner]:
+        requirement = SIGNER_REQUIREMENTS.get(function_name)
+        signers = list(self.signers.values())
+        if requirement == OWN:
+            return []
+        if requirement == DEPLOYER:
+            deployer = _normalize(CONTRACT_ADDRESS)
+            return [signer for signer in signers if signer.address == deployer]
+        if requirement == WHITELISTED:
+            if not self._whitelist_loaded or any(signer.whitelisted is None for signer in signers):
+                async with self._whitelist_lock:
+                    if not self._whitelist_loaded or any(signer.whitelisted is None for signer in signers):
+                        await self.refresh_whitelist()
+            return [signer for signer in signers if signer.whitelisted]
+        return signers
+
+    async def pick(self, function_name: str) -> PooledSigner:
+        """选择在途交易最少的合格账户"""
+        if self.pins_signer(function_name):
+            raise ValueError(f"{function_name} stores state under the signer's account; submit it with an explicit account")
+        candidates = await self.eligible(function_name)
+        if not candidates:
+            requirement = SIGNER_REQUIREMENTS.get(function_name, "any")
+            raise ValueError(f"no {requirement} signer in the pool for {function_name}")
+        start = self._next % len(candidates)
+        self._next += 1
+        best = None
+        for offset in range(len(candidates)):
+            signer = candidates[(start + offset) % len(candidates)]
+            if best is None or signer.in_flight < best.in_flight:
+                best = signer
+                if not best.in_flight:
+                    break
+        return best
+
+    async def submit(self, function_name: str, *args, signer: Optional[PooledSigner] = None) -> asyncio.Future:
+        """路由并提交 entry 函数，返回确认 Future（与 submit_entry_nowait 相同）"""
+        if signer is None:
+            signer = await self.pick(function_name)
+        signer.in_flight += 1
+        try:
+            confirmation = await self.client.submit_entry_nowait(function_name, signer.account, *args)
+        except Exception:
+            signer.in_flight -= 1
+            signer.failed += 1
+            raise
+        signer.submitted += 1
+        confirmation.add_done_callback(lambda done: self._on_done(signer, function_name, args, done))
+        return confirmation
+
+    async def submit_entry(self, function_name: str, *args) -> str:
+        """路由、提交并等待确认，返回交易哈希"""
+        return await (await self.submit(function_name, *args))
+
+    def _on_done(self, signer: PooledSigner, function_name: str, args, done: asyncio.Future):
+        signer.in_flight -= 1
+        if done.cancelled() or done.exception() is not None:
+            signer.failed += 1
+            return
+        # 白名单变化后同步池内账户的资格
+        if function_name in ("add_to_whitelist", "remove_from_whitelist"):
+            addresses = [args[0]]
+        elif function_name in ("batch_add_to_whitelist", "batch_remove_from_whitelist"):
+            addresses = args[0]
+        else:
+            return
+        added = function_name in ("add_to_whitelist", "batch_add_to_whitelist")
+        for address in addresses:
+            member = self.signers.get(_normalize(address))
+            if member is not None:
+                member.whitelisted = added
+
+    def stats(self) -> dict:
+        return {
+            "signers": len(self.signers),
+            "in_flight": sum(signer.in_flight for signer in self.signers.values()),
+            "accounts": {address: signer.stats() for address, signer in self.signers.items()},
+        }
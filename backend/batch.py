@@ -0,0 +1,162 @@
+"""
+无交互批量模式
+从 JSONL 读取操作：读操作并发执行，写操作按输入顺序进入账户流水线；
+每个输入输出一行 JSONL 结果，最后输出吞吐、延迟百分位和失败汇总
+"""
+
+import asyncio
+import json
+import time
+from collections import Counter, deque
+from typing import Any, Dict, Iterable, List, Optional, TextIO, Tuple
+from aptos_sdk.account import Account
+from blockchain_client import TruePassClient, DEFAULT_BATCH_CONCURRENCY
+from account_pool import AccountPool
+from latency import summarize
+
+# 常用操作的命名参数，按 ABI 参数顺序排列；其余函数通过 "args" 列表传参
+NAMED_ARGS = {
+    "get_status": ["address"],
+    "get_message": ["address"],
+    "is_whitelisted": ["address"],
+    "get_key_value": ["key"],
+    "key_exists": ["key"],
+    "set_message": ["message"],
+    "update_status": ["address", "status"],
+    "add_to_whitelist": ["address"],
+    "remove_from_whitelist": ["address"],
+    "set_key_value": ["key", "value"],
+    "delete_key": ["key"],
+}
+
+# 未提供 address 时默认使用当前账户地址的操作
+DEFAULT_TO_ACCOUNT = {"get_status", "get_message", "is_whitelisted"}
+
+
+def parse_operation(request: Dict[str, Any], account: Optional[Account] = None) -> Tuple[str, List[Any]]:
+    """从一条请求中取出操作名和按 ABI 顺序排列的参数"""
+    op = request.get("op")
+    if not op:
+        raise ValueError("missing 'op'")
+    if "args" in request:
+        return op, list(request["args"])
+    args = []
+    for name in NAMED_ARGS.get(op, []):
+        if name in request:
+            args.append(request[name])
+        elif name == "address" and op in DEFAULT_TO_ACCOUNT and account is not None:
+            args.append(str(account.address()))
+        else:
+            raise ValueError(f"missing '{name}' for {op}")
+    return op, args
+
+
+class BatchRunner:
+    """执行一批 JSONL 操作"""
+
+    def __init__(
+        self,
+        client: TruePassClient,
+        account: Optional[Account] = None,
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        pool: Optional[AccountPool] = None,
+    ):
+        self.client = client
+        self.account = account
+        # 传入账户池时写操作分散到池中各账户并行提交，不再保证按输入顺序上链；
+        # 写入签名账户自己名下状态的操作仍由 account 提交
+        self.pool = pool
+        self.concurrency = concurrency
+        self._reads = asyncio.Semaphore(concurrency)
+        # 上一个写操作提交完成的 Future，用于保证写操作按输入顺序提交
+        self._last_submit: Optional[asyncio.Future] = None
+
+    def _parse(self, line: str) -> Tuple[str, List[Any]]:
+        return parse_operation(json.loads(line), self.account)
+
+    async def _read(self, op: str, args: List[Any]) -> Any:
+        async with self._reads:
+            return await self.client.call_view(op, *args)
+
+    async def _write(self, op: str, args: List[Any], previous: Optional[asyncio.Future], submitted: asyncio.Future) -> str:
+        if self.pool is not None and not self.pool.pins_signer(op):
+            submitted.set_result(None)
+            return await self.pool.submit_entry(op, *args)
+        if self.account is None:
+            raise ValueError("no account loaded for write operations")
+        try:
+            if previous is not None:
+                await asyncio.wait([previous])
+            confirmation = await self.client.submit_entry_nowait(op, self.account, *args)
+        finally:
+            submitted.set_result(None)
+        return await confirmation
+
+    async def _execute(self, line_number: int, line: str) -> Dict[str, Any]:
+        started = time.perf_counter()
+        record: Dict[str, Any] = {"line": line_number}
+        submitted = None
+        try:
+            op, args = self._parse(line)
+            record["op"] = op
+            plan = self.client._plan(op)
+            if plan.is_view:
+                record["kind"] = "read"
+                record["result"] = await self._read(op, args)
+            else:
+                record["kind"] = "write"
+                submitted = asyncio.get_running_loop().create_future()
+                previous, self._last_submit = self._last_submit, submitted
+                record["result"] = await self._write(op, args, previous, submitted)
+            record["ok"] = True
+        except Exception as e:
+            if submitted is not None and not submitted.done():
+                submitted.set_result(None)
+            record["ok"] = False
+            record["error"] = f"{type(e).__name__}: {e}"
+        record["latency_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        return record
+
+    async def run(self, lines: Iterable[str], out: TextIO) -> Dict[str, Any]:
+        """执行全部操作，按输入顺序写出结果行，返回汇总"""
+        latencies = {"read": [], "write": []}
+        errors = Counter()
+        total = failed = 0
+        started = time.perf_counter()
+
+        def emit(record: Dict[str, Any]):
+            nonlocal total, failed
+            total += 1
+            if record["ok"]:
+                latencies[record["kind"]].append(record["latency_ms"] / 1000)
+            else:
+                failed += 1
+                errors[record["error"].split(":", 1)[0]] += 1
+            out.write(json.dumps(record, default=str) + "\n")
+
+        # 按输入顺序输出，最多保留 4 * concurrency 个未输出的操作
+        window = self.concurrency * 4
+        pending = deque()
+        for line_number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            pending.append(asyncio.ensure_future(self._execute(line_number, line)))
+            if len(pending) >= window:
+                emit(await pending.popleft())
+        while pending:
+            emit(await pending.popleft())
+
+        elapsed = time.perf_counter() - started
+        summary = {
+            "total": total,
+            "ok": total - failed,
+            "failed": failed,
+            "elapsed_s": round(elapsed, 3),
+            "throughput_ops": round(total / elapsed, 2) if elapsed > 0 else 0.0,
+            "read_latency": summarize(latencies["read"]),
+            "write_latency": summarize(latencies["write"]),
+            "errors": dict(errors),
+        }
+        out.write(json.dumps({"summary": summary}) + "\n")
+        out.flush()
+        return summary
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+TruePassClient 基准测试
+对本地全节点替身（或指定节点）在多个并发级别下测量每个客户端方法的
+调用吞吐与 p50/p99 延迟，结果写成可在提交之间对比的 JSON
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+from aptos_sdk.account import Account
+from blockchain_client import TruePassClient
+from http_pool import HttpPool
+from latency import summarize
+from stub_node import StubConfig, StubFullnode
+
+DEFAULT_CONCURRENCY_LEVELS = [1, 8, 32]
+DEFAULT_DURATION = 3.0
+DEFAULT_OUTPUT = "bench_results.json"
+
+# 批量查询场景每次调用包含的地址数
+MANY_BATCH_SIZE = 100
+
+# 场景：(client, 工作协程使用的账户, 调用序号) -> 是否成功
+Scenario = Callable[[TruePassClient, Account, int], Awaitable[bool]]
+
+
+async def _get_status_many(client: TruePassClient, account: Account, i: int) -> bool:
+    addresses = [str(account.address())] * MANY_BATCH_SIZE
+    results = [result async for result in client.get_status_many(addresses)]
+    return all(result.ok for result in results)
+
+
+async def _pipelined_set_message(client: TruePassClient, account: Account, i: int) -> bool:
+    await (await client.submit_entry_nowait("set_message", account, f"bench-{i}"))
+    return True
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "get_status": lambda c, a, i: _not_none(c.get_status(str(a.address()))),
+    "get_message": lambda c, a, i: _not_none(c.get_message(str(a.address()))),
+    "get_number": lambda c, a, i: _not_none(c.get_number()),
+    "get_account_info": lambda c, a, i: _not_none(c.get_account_info(str(a.address()))),
+    "get_status_many": _get_status_many,
+    "call_view": lambda c, a, i: _succeeds(c.call_view("is_whitelisted", str(a.address()))),
+    "init_status": lambda c, a, i: _not_none(c.init_status(a)),
+    "set_message": lambda c, a, i: _not_none(c.set_message(a, f"bench-{i}")),
+    "set_status_true": lambda c, a, i: _not_none(c.set_status_true(a)),
+    "update_status": lambda c, a, i: _not_none(c.update_status(a, str(a.address()), i % 2 == 0)),
+    "submit_entry": lambda c, a, i: _succeeds(c.submit_entry("set_key_value", a, f"key-{i}", "value")),
+    "submit_entry_nowait": _pipelined_set_message,
+}
+
+
+async def _not_none(call: Awaitable) -> bool:
+    return await call is not None
+
+
+async def _succeeds(call: Awaitable) -> bool:
+    await call
+    return True
+
+
+async def run_level(
+    client: TruePassClient,
+    scenario: Scenario,
+    accounts: List[Account],
+    concurrency: int,
+    duration: float,
+) -> dict:
+    """闭环运行 concurrency 个工作协程 duration 秒"""
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(account: Account):
+        nonlocal errors
+        i = 0
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                ok = await scenario(client, account, i)
+            except Exception:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+            i += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(accounts[w]) for w in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stats = summarize(latencies)
+    stats["errors"] = errors
+    stats["calls_per_s"] = round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0
+    return stats
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+async def run_benchmarks(
+    node_url: Optional[str],
+    scenarios: List[str],
+    levels: List[int],
+    duration: float,
+    stub_config: StubConfig,
+) -> dict:
+    stub = None
+    if node_url is None:
+        stub = StubFullnode(stub_config)
+        node_url = await stub.start()
+    accounts = [Account.generate() for _ in range(max(levels))]
+    results: Dict[str, Dict[str, dict]] = {}
+    try:
+        async with HttpPool(max_connections=max(levels), max_keepalive_connections=max(levels)) as pool:
+            async with TruePassClient(node_url, http_pool=pool) as client:
+                for name in scenarios:
+                    results[name] = {}
+                    for concurrency in levels:
+                        # 包装方法成功/失败都会打印，计时期间丢弃输出
+                        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                            stats = await run_level(client, SCENARIOS[name], accounts, concurrency, duration)
+                        results[name][str(concurrency)] = stats
+                        print(
+                            f"{name:<20} c={concurrency:<4} {stats['calls_per_s']:>10.1f} calls/s  "
+                            f"p50={stats.get('p50_ms', 0):.2f}ms  p99={stats.get('p99_ms', 0):.2f}ms  "
+                            f"errors={stats['errors']}",
+                            file=sys.stderr,
+                        )
+    finally:
+        if stub is not None:
+            await stub.stop()
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": int(time.time()),
+            "python": platform.python_version(),
+            "node_url": "stub" if stub is not None else node_url,
+            "duration_s": duration,
+            "concurrency_levels": levels,
+            "stub": None if stub is None else {
+                "latency_ms": stub_config.latency_ms,
+                "jitter_ms": stub_config.jitter_ms,
+                "error_rate": stub_config.error_rate,
+            },
+        },
+        "results": results,
+    }
+
+
+def compare(old: dict, new: dict):
+    """打印两次结果的吞吐与 p99 变化"""
+    print(f"{'scenario':<20} {'c':>4} {'calls/s':>22} {'p99 ms':>22}")
+    for name, levels in new["results"].items():
+        for level, stats in levels.items():
+            before = old.get("results", {}).get(name, {}).get(level)
+            if before is None:
+                continue
+
+            def change(key):
+                a, b = before.get(key, 0), stats.get(key, 0)
+                pct = f"{(b - a) / a * 100:+.1f}%" if a else "n/a"
+                return f"{a:.1f}->{b:.1f} ({pct})"
+
+            print(f"{name:<20} {level:>4} {change('calls_per_s'):>22} {change('p99_ms'):>22}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TruePassClient against a local stub fullnode")
+    parser.add_argument("--node-url", help="benchmark a real node instead of the local stub")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated scenario names")
+    parser.add_argument("--concurrency", default=",".join(map(str, DEFAULT_CONCURRENCY_LEVELS)))
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION, help="seconds per scenario and level")
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="stub latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--compare", metavar="OLD_JSON", help="print changes against a previous result file")
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+    levels = [int(level) for level in args.concurrency.split(",")]
+    stub_config = StubConfig(args.latency_ms, args.jitter_ms, args.error_rate, seed=0)
+
+    report = asyncio.run(run_benchmarks(args.node_url, scenarios, levels, args.duration, stub_config))
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"✅ Results written to {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,85 +5,806 @@ Aptos 区块链交互客户端
 
 import asyncio
 import json
-from typing import Optional, List, Any
+import time
+from collections import deque
+from typing import Optional, List, Any, AsyncIterator, Callable, Iterable, Sequence, Tuple
+import httpx
 from aptos_sdk.client import RestClient
 from aptos_sdk.account import Account
 from aptos_sdk.transactions import (
     EntryFunction,
+    RawTransaction,
+    SignedTransaction,
     TransactionArgument,
     TransactionPayload,
 )
 from aptos_sdk.type_tag import TypeTag, StructTag
 from abi import ABI, CONTRACT_ADDRESS, MODULE_NAME, get_function_by_name
+from tx_pipeline import (
+    TransactionPipeline,
+    DEFAULT_MAX_IN_FLIGHT,
+    DEFAULT_MAX_GAS_AMOUNT,
+    DEFAULT_GAS_UNIT_PRICE,
+    DEFAULT_EXPIRATION_TTL,
+)
+from view_cache import ViewCache, DEFAULT_CACHE_TTL
+from http_pool import HttpPool
+from call_plans import CallError, CallPlan, compile_abi
+from metrics import Metrics
+from gas import GasEstimator
+from bulk_signer import BulkSigner, DEFAULT_SIGN_BATCH_SIZE
+from endpoint_pool import EndpointPool, post_signed_transaction, post_view, stream_view_response
+from stream_decode import StringVectorDecoder, stream_element_type
+from confirmations import ConfirmationPoller
+from kv_writer import KeyValueWriter, DEFAULT_COALESCE_WINDOW, DEFAULT_MAX_PENDING_KEYS
+
+# 批量查询默认的并发请求数
+DEFAULT_BATCH_CONCURRENCY = 32
+
+# 流式读取 view 响应体时每次读取的字节数
+DEFAULT_STREAM_CHUNK_SIZE = 64 * 1024
+
+# 分页 view 每页条目数（合约的 MAX_PAGE_SIZE）
+DEFAULT_PAGE_SIZE = 1000
+
+# 批量 entry 函数每笔交易最多包含的条目数与参数字节数（交易大小上限为 64 KiB）
+DEFAULT_WRITE_BATCH_SIZE = 500
+MAX_BATCH_ARGUMENT_BYTES = 48 * 1024
+
+# 存储迁移每笔交易从旧向量搬到表索引的条目数
+DEFAULT_MIGRATION_CHUNK_SIZE = 200
+
+# 启动时把 ABI 编译成按函数名索引的调用计划表
+CALL_PLANS = compile_abi(ABI, CONTRACT_ADDRESS)
+
+# 写操作成功后需要失效的 view 缓存：entry 函数名 -> ((view 函数名, 失效范围), ...)
+# 失效范围：INVALIDATE_SENDER 只失效以发送者地址为参数的结果，整数表示以该位置的
+# 地址（或地址列表中每个地址）为参数的结果，None 表示失效该函数的全部结果
+INVALIDATE_SENDER = "sender"
+_WHITELIST_LISTS = (("get_whitelist", None), ("get_whitelist_page", None))
+_WHITELIST_VIEWS = (("is_whitelisted", None),) + _WHITELIST_LISTS
+_DATABASE_VIEWS = (
+    ("get_key_value", None),
+    ("key_exists", None),
+    ("get_all_keys", None),
+    ("get_keys_page", None),
+    ("get_entries_page", None),
+)
+WRITE_INVALIDATIONS = {
+    "init_status": (("get_status", INVALIDATE_SENDER),),
+    "set_status_true": (("get_status", INVALIDATE_SENDER),),
+    "update_status": (("get_status", 0),),
+    "set_message": (("get_message", INVALIDATE_SENDER),),
+    "init_whitelist": _WHITELIST_VIEWS,
+    "migrate_whitelist": _WHITELIST_VIEWS + (("pending_migration", None),),
+    "add_to_whitelist": (("is_whitelisted", 0),) + _WHITELIST_LISTS,
+    "batch_add_to_whitelist": (("is_whitelisted", 0),) + _WHITELIST_LISTS,
+    "remove_from_whitelist": (("is_whitelisted", 0),) + _WHITELIST_LISTS,
+    "batch_remove_from_whitelist": (("is_whitelisted", 0),) + _WHITELIST_LISTS,
+    "init_database": _DATABASE_VIEWS,
+    "migrate_database": _DATABASE_VIEWS + (("pending_migration", None),),
+    "set_key_value": _DATABASE_VIEWS,
+    "batch_set_key_value": _DATABASE_VIEWS,
+    "delete_key": _DATABASE_VIEWS,
+    "batch_delete_key": _DATABASE_VIEWS,
+}
+
+
+class ViewResult:
+    """批量查询中单个输入的结果，错误单独记录而不影响整个批次"""
+
+    __slots__ = ("index", "args", "value", "error")
+
+    def __init__(self, index: int, args: List[Any], value: Any = None, error: Optional[Exception] = None):
+        self.index = index
+        self.args = args
+        self.value = value
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self) -> str:
+        if self.error is not None:
+            return f"ViewResult(index={self.index}, args={self.args!r}, error={self.error!r})"
+        return f"ViewResult(index={self.index}, args={self.args!r}, value={self.value!r})"
+
+
+class SubmitResult:
+    """批量提交中单笔交易的结果"""
+
+    __slots__ = ("index", "args", "tx_hash", "error")
+
+    def __init__(self, index: int, args: List[Any], tx_hash: Optional[str] = None, error: Optional[Exception] = None):
+        self.index = index
+        self.args = args
+        self.tx_hash = tx_hash
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self) -> str:
+        if self.error is not None:
+            return f"SubmitResult(index={self.index}, args={self.args!r}, error={self.error!r})"
+        return f"SubmitResult(index={self.index}, args={self.args!r}, tx_hash={self.tx_hash!r})"
+
+
+def _first(result: List[Any]) -> Any:
+    return result[0] if result else None
+
 
 class TruePassClient:
-    def __init__(self, node_url: str = "https://fullnode.testnet.aptoslabs.com/v1"):
-        self.client = RestClient(node_url)
+    def __init__(
+        self,
+        node_url: str = "https://fullnode.testnet.aptoslabs.com/v1",
+        pipelined: bool = False,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        cache_size: int = 0,
+        cache_ttl: Optional[float] = DEFAULT_CACHE_TTL,
+        http_pool: Optional[HttpPool] = None,
+        metrics: Optional[Metrics] = None,
+        gas_estimator: Optional[GasEstimator] = None,
+        node_urls: Optional[List[str]] = None,
+        hedge: bool = True,
+        shared_confirmations: bool = True,
+        http_transport: Optional[httpx.AsyncBaseTransport] = None,
+        rest_client: Optional[RestClient] = None,
+    ):
+        # 传入 node_urls 时使用多节点池（按健康度路由、对冲读、写故障切换），忽略 node_url；
+        # 传入 rest_client 时直接使用它（如进程内的合约模拟器）
+        if rest_client is not None:
+            self.client = rest_client
+        elif node_urls:
+            self.client = EndpointPool(node_urls, hedge=hedge)
+        else:
+            self.client = RestClient(node_url)
+        # RestClient 的所有请求都经由其 httpx 会话发出，这里替换为（可共享的）连接池；
+        # 未传入连接池时创建一个由本客户端负责关闭的默认池（http_transport 替换其传输层）
+        self._owns_http_pool = http_pool is None
+        self.http_pool = http_pool if http_pool is not None else HttpPool(transport=http_transport)
+        rest_clients = [endpoint.client for endpoint in self.client.endpoints] if isinstance(self.client, EndpointPool) else [self.client]
+        # 被替换的 SDK 会话在 close() 时关闭
+        self._replaced_sessions = [session for session in map(self.http_pool.attach, rest_clients) if session is not None]
         self.contract_address = CONTRACT_ADDRESS
         self.module_name = MODULE_NAME
+        self.plans = CALL_PLANS
+        # 流水线模式：写操作通过每个账户的 TransactionPipeline 提交
+        self.pipelined = pipelined
+        self.max_in_flight = max_in_flight
+        self._pipelines = {}
+        # view 结果缓存，cache_size 为 0 时关闭
+        self.cache = ViewCache(cache_size, cache_ttl) if cache_size > 0 else None
+        # 各阶段延迟、调用/错误计数与 HTTP 字节数
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.metrics.instrument_session(self.http_pool.session)
+        # 提交前模拟估算 gas（传入 GasEstimator 时启用）
+        self.gas_estimator = gas_estimator
+        # 所有写操作共享的确认轮询器（关闭时每笔交易单独调用 wait_for_transaction）
+        self.confirmations = ConfirmationPoller(self.client) if shared_confirmations else None
+        # submit_bulk 未传入签名器时按需创建的进程池
+        self._bulk_signer: Optional[BulkSigner] = None
+        # 每个账户的键值写入合并器
+        self._kv_writers = {}
         
+    async def close(self):
+        """等待在途流水线交易结束并释放 HTTP 连接（共享连接池除外）"""
+        for writer in self._kv_writers.values():
+            await writer.close()
+        for pipeline in self._pipelines.values():
+            await pipeline.drain()
+        if self.confirmations is not None:
+            await self.confirmations.close()
+        if self._bulk_signer is not None:
+            self._bulk_signer.close()
+            self._bulk_signer = None
+        for session in self._replaced_sessions:
+            await session.aclose()
+        self._replaced_sessions = []
+        if self._owns_http_pool:
+            await self.http_pool.close()
+    
+    async def __aenter__(self) -> "TruePassClient":
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    def _get_module_id(self) -> str:
+        """构建完整的模块 ID"""
+        return f"{self.contract_address}::{self.module_name}"
+    
     def _get_function_name(self, function_name: str) -> str:
-        """构建完整的函数名"""
+        """构建完整的函数名（ABI 中的函数使用预先计算的 ID）"""
+        plan = self.plans.get(function_name)
+        if plan is not None:
+            return plan.function_id
         return f"{self.contract_address}::{self.module_name}::{function_name}"
     
-    async def get_status(self, address: str) -> Optional[bool]:
-        """获取地址状态"""
+    def _plan(self, function_name: str) -> CallPlan:
+        plan = self.plans.get(function_name)
+        if plan is None:
+            raise CallError(f"{function_name} is not an exposed function of {self.module_name}")
+        return plan
+    
+    async def call_view(
+        self,
+        function_name: str,
+        *args: Any,
+        use_cache: bool = True,
+        ledger_version: Optional[int] = None,
+    ) -> Any:
+        """
+        按 ABI 校验参数并调用任意 view 函数，返回解码后的结果。
+
+        指定 ledger_version 时在该账本版本上执行；参数不匹配时抛出 CallError，
+        网络错误原样抛出。
+        """
+        plan = self._plan(function_name)
+        with self.metrics.timer(function_name, "encode"):
+            arguments = plan.encode_view_args(args)
+        result = await self._view(function_name, arguments, use_cache, ledger_version)
+        with self.metrics.timer(function_name, "decode"):
+            return plan.decode(result)
+    
+    async def submit_entry(self, function_name: str, account: Account, *args: Any) -> str:
+        """
+        按 ABI 校验参数并提交任意 entry 函数，等待确认后返回交易哈希。
+
+        参数不匹配时抛出 CallError，提交或执行失败时抛出异常。
+        """
+        with self.metrics.timer(function_name, "build"):
+            payload = TransactionPayload(self._plan(function_name).build_entry_function(args))
+        return await self._submit(account, payload)
+    
+    async def _fetch_view(
+        self,
+        function_name: str,
+        arguments: List[Any],
+        ledger_version: Optional[int] = None,
+    ) -> List[Any]:
+        """向节点发起 view 请求"""
+        try:
+            with self.metrics.timer(function_name, "request"):
+                if ledger_version is not None:
+                    function_id = self._get_function_name(function_name)
+                    if isinstance(self.client, EndpointPool):
+                        return await self.client.view_at(function_id, [], arguments, ledger_version)
+                    return await post_view(self.client, function_id, [], arguments, ledger_version)
+                return await self.client.view_function(
+                    self._get_function_name(function_name),
+                    [],
+                    arguments
+                )
+        except Exception as e:
+            self.metrics.record_error(function_name, e)
+            raise
+    
+    async def _view(
+        self,
+        function_name: str,
+        arguments: List[Any],
+        use_cache: bool = True,
+        ledger_version: Optional[int] = None,
+    ) -> List[Any]:
+        """执行 view 函数并返回原始结果列表，启用缓存时先查缓存"""
+        self.metrics.record_call(function_name, "read")
+        if self.cache is None or not use_cache:
+            return await self._fetch_view(function_name, arguments, ledger_version)
+        if ledger_version is None:
+            key = ViewCache.make_key(function_name, arguments)
+        else:
+            key = ViewCache.make_pinned_key(function_name, arguments, ledger_version)
+        result = self.cache.get(key, None)
+        if result is None:
+            if ledger_version is not None:
+                result = await self._fetch_view(function_name, arguments, ledger_version)
+                # 固定版本的结果不会变化，永不过期（仍受 LRU 容量限制）
+                self.cache.put(key, result, None)
+            else:
+                # 读取期间确认的写交易会失效该函数，此时读到的可能是写入前的值，不写回缓存
+                generation = self.cache.generation(function_name)
+                result = await self._fetch_view(function_name, arguments, ledger_version)
+                self.cache.put(key, result, generation=generation)
+        return result
+    
+    def invalidate_cache(self, function_name: Optional[str] = None, arguments: Optional[List[Any]] = None):
+        """手动失效缓存：不带参数时清空，只带函数名时失效该函数的全部结果"""
+        if self.cache is None:
+            return
+        if function_name is None:
+            self.cache.clear()
+        elif arguments is None:
+            self.cache.invalidate_function(function_name)
+        else:
+            self.cache.invalidate(ViewCache.make_key(function_name, arguments))
+    
+    def endpoint_stats(self) -> Optional[dict]:
+        """多节点池的对冲、切换次数与各节点健康状态，单节点时返回 None"""
+        return self.client.stats() if isinstance(self.client, EndpointPool) else None
+    
+    def cache_stats(self) -> Optional[dict]:
+        """缓存命中、未命中、淘汰计数"""
+        return self.cache.stats() if self.cache is not None else None
+    
+    def _invalidate_for_payload(self, account: Account, payload: TransactionPayload):
+        """写交易确认后失效受影响的 view 缓存"""
+        if self.cache is None:
+            return
+        entry_function = payload.value
+        function_name = getattr(entry_function, "function", None)
+        targets = WRITE_INVALIDATIONS.get(function_name)
+        if targets is None:
+            return
+        args = None
+        for view_name, target in targets:
+            if target is None:
+                self.cache.invalidate_function(view_name)
+                continue
+            if target == INVALIDATE_SENDER:
+                addresses = [account.address()]
+            else:
+                if args is None:
+                    args = self.plans[function_name].decode_entry_args(entry_function.args)
+                value = args[target]
+                addresses = value if isinstance(value, list) else [value]
+            plan = self.plans[view_name]
+            for address in addresses:
+                self.cache.invalidate(ViewCache.make_key(view_name, plan.encode_view_args((address,))))
+    
+    async def view_many(
+        self,
+        function_name: str,
+        arguments: Iterable[List[Any]],
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        ordered: bool = True,
+        decode: Optional[Callable[[List[Any]], Any]] = None,
+        use_cache: bool = True,
+        ledger_version: Optional[int] = None,
+    ) -> AsyncIterator[ViewResult]:
+        """
+        对一组参数并发执行同一个 view 函数，结果以流的形式逐个产出。
+
+        输入是惰性消费的，同时在途的请求不超过 concurrency 个；ordered 为 True 时
+        按输入顺序产出（最多缓存 4 * concurrency 个已完成结果），否则按完成顺序产出。
+        每个输入的异常记录在对应 ViewResult.error 中，不会中断整个批次。
+        ABI 中的函数按调用计划编码参数，未指定 decode 时按调用计划解码结果。
+        指定 ledger_version 时所有调用都在该账本版本上执行。
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+        semaphore = asyncio.Semaphore(concurrency)
+        plan = self.plans.get(function_name)
+        if decode is None:
+            decode = plan.decode if plan is not None else _first
+
+        async def run(index: int, args: List[Any]) -> ViewResult:
+            async with semaphore:
+                try:
+                    encoded = plan.encode_view_args(tuple(args)) if plan is not None else args
+                    return ViewResult(index, args, decode(await self._view(function_name, encoded, use_cache, ledger_version)))
+                except Exception as e:
+                    return ViewResult(index, args, error=e)
+
+        source = iter(enumerate(arguments))
+        if ordered:
+            window = concurrency * 4
+            pending = deque()
+            try:
+                for index, args in source:
+                    pending.append(asyncio.ensure_future(run(index, list(args))))
+                    if len(pending) >= window:
+                        yield await pending.popleft()
+                while pending:
+                    yield await pending.popleft()
+            finally:
+                for task in pending:
+                    task.cancel()
+        else:
+            pending = set()
+            try:
+                for index, args in source:
+                    pending.add(asyncio.ensure_future(run(index, list(args))))
+                    if len(pending) >= concurrency:
+                        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                        for task in done:
+                            yield task.result()
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+            finally:
+                for task in pending:
+                    task.cancel()
+    
+    def get_status_many(
+        self,
+        addresses: Iterable[str],
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        ordered: bool = True,
+        use_cache: bool = True,
+    ) -> AsyncIterator[ViewResult]:
+        """批量获取地址状态"""
+        return self.view_many(
+            "get_status",
+            ([address] for address in addresses),
+            concurrency,
+            ordered,
+            use_cache=use_cache,
+        )
+    
+    def get_message_many(
+        self,
+        addresses: Iterable[str],
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        ordered: bool = True,
+        use_cache: bool = True,
+    ) -> AsyncIterator[ViewResult]:
+        """批量获取地址消息"""
+        return self.view_many(
+            "get_message",
+            ([address] for address in addresses),
+            concurrency,
+            ordered,
+            use_cache=use_cache,
+        )
+    
+    async def stream_view(
+        self,
+        function_name: str,
+        *args: Any,
+        ledger_version: Optional[int] = None,
+        chunk_size: int = DEFAULT_STREAM_CHUNK_SIZE,
+    ) -> AsyncIterator[Any]:
+        """
+        流式调用返回单个 vector 的 view 函数，逐个产出解码后的元素。
+
+        响应体按块增量解析，不会整体载入内存；元素类型必须在 JSON 中以字符串
+        表示（address、String、u64 及以上整数、vector<u8>）。结果不经过缓存。
+        多节点池时请求发往池选择的节点，拿到响应前的节点故障会换节点重试。
+        """
+        plan = self._plan(function_name)
+        element = stream_element_type(plan)
+        with self.metrics.timer(function_name, "encode"):
+            arguments = plan.encode_view_args(args)
+        self.metrics.record_call(function_name, "stream")
+        if isinstance(self.client, EndpointPool):
+            opened = self.client.stream_view(plan.function_id, [], arguments, ledger_version)
+        else:
+            opened = stream_view_response(self.client, plan.function_id, [], arguments, ledger_version)
+        decoder = StringVectorDecoder()
         try:
-            function_name = self._get_function_name("get_status")
-            result = await self.client.view_function(
-                function_name,
-                [],
-                [address]
+            with self.metrics.timer(function_name, "request"):
+                async with opened as response:
+                    async for chunk in response.aiter_bytes(chunk_size):
+                        for item in decoder.feed(chunk):
+                            yield element.from_json(item)
+                    decoder.close()
+        except Exception as e:
+            self.metrics.record_error(function_name, e)
+            raise
+    
+    def iter_all_keys(self, ledger_version: Optional[int] = None) -> AsyncIterator[str]:
+        """流式获取键值数据库中的全部键"""
+        return self.stream_view("get_all_keys", ledger_version=ledger_version)
+    
+    def iter_whitelist(self, ledger_version: Optional[int] = None) -> AsyncIterator[str]:
+        """流式获取白名单地址"""
+        return self.stream_view("get_whitelist", ledger_version=ledger_version)
+    
+    async def paginate(
+        self,
+        function_name: str,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        ledger_version: Optional[int] = None,
+    ) -> AsyncIterator[Any]:
+        """
+        逐页调用 (start, limit) -> (列..., 总数) 形式的分页 view，逐条产出结果。
+
+        单列时产出元素本身，多列时产出按行组合的元组。所有页固定在同一个账本
+        版本上读取（未指定时取当前版本），翻页期间的写入不会导致重复或遗漏。
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be >= 1")
+        if ledger_version is None:
+            ledger_version = await self.ledger_version()
+        start = 0
+        while True:
+            *columns, total = await self.call_view(
+                function_name, start, page_size, use_cache=False, ledger_version=ledger_version
             )
-            return result[0] if result else None
+            if not columns[0]:
+                return
+            if len(columns) == 1:
+                for item in columns[0]:
+                    yield item
+            else:
+                for row in zip(*columns):
+                    yield row
+            start += len(columns[0])
+            if start >= total:
+                return
+    
+    def iter_keys_paged(self, page_size: int = DEFAULT_PAGE_SIZE, ledger_version: Optional[int] = None) -> AsyncIterator[str]:
+        """分页获取全部键"""
+        return self.paginate("get_keys_page", page_size, ledger_version)
+    
+    def iter_entries(
+        self, page_size: int = DEFAULT_PAGE_SIZE, ledger_version: Optional[int] = None
+    ) -> AsyncIterator[Tuple[str, str]]:
+        """分页获取全部 (键, 值)"""
+        return self.paginate("get_entries_page", page_size, ledger_version)
+    
+    def iter_whitelist_paged(self, page_size: int = DEFAULT_PAGE_SIZE, ledger_version: Optional[int] = None) -> AsyncIterator[str]:
+        """分页获取白名单地址"""
+        return self.paginate("get_whitelist_page", page_size, ledger_version)
+    
+    async def get_status(self, address: str, use_cache: bool = True) -> Optional[bool]:
+        """获取地址状态"""
+        try:
+            return await self.call_view("get_status", address, use_cache=use_cache)
         except Exception as e:
             print(f"❌ Error getting status: {e}")
             return None
     
-    async def get_message(self, address: str) -> Optional[str]:
+    async def get_message(self, address: str, use_cache: bool = True) -> Optional[str]:
         """获取地址消息"""
         try:
-            function_name = self._get_function_name("get_message")
-            result = await self.client.view_function(
-                function_name,
-                [],
-                [address]
-            )
-            return result[0] if result else None
+            return await self.call_view("get_message", address, use_cache=use_cache)
         except Exception as e:
             print(f"❌ Error getting message: {e}")
             return None
     
-    async def get_number(self) -> Optional[int]:
+    async def get_number(self, use_cache: bool = True) -> Optional[int]:
         """获取数字"""
         try:
-            function_name = self._get_function_name("get_number")
-            result = await self.client.view_function(
-                function_name,
-                [],
-                []
-            )
-            return int(result[0]) if result else None
+            return await self.call_view("get_number", use_cache=use_cache)
         except Exception as e:
             print(f"❌ Error getting number: {e}")
             return None
     
+    async def ledger_version(self) -> int:
+        """节点当前的账本版本"""
+        return int((await self.client.info())["ledger_version"])
+    
+    async def snapshot(self, ledger_version: Optional[int] = None) -> "Snapshot":
+        """创建固定在某个账本版本（默认当前版本）上的一致性只读视图"""
+        if ledger_version is None:
+            ledger_version = await self.ledger_version()
+        return Snapshot(self, ledger_version)
+    
+    def pipeline(self, account: Account) -> TransactionPipeline:
+        """获取（或创建）账户的交易流水线"""
+        key = str(account.address())
+        pipeline = self._pipelines.get(key)
+        if pipeline is None:
+            pipeline = TransactionPipeline(
+                self.client, account, self.max_in_flight, self.metrics, self.gas_estimator, self.confirmations
+            )
+            self._pipelines[key] = pipeline
+        return pipeline
+    
+    async def _submit(self, account: Account, payload: TransactionPayload) -> str:
+        """签名、提交并等待交易确认，返回交易哈希"""
+        if self.pipelined:
+            # 流水线自己记录调用、各阶段耗时与错误
+            tx_hash = await (await self.pipeline(account).submit(payload))
+            self._invalidate_for_payload(account, payload)
+            return tx_hash
+        metrics = self.metrics
+        operation = payload.value.function
+        metrics.record_call(operation, "write")
+        try:
+            with metrics.timer(operation, "sequence_number"):
+                sequence_number = await self.client.account_sequence_number(account.address())
+            with metrics.timer(operation, "prepare"):
+                raw_transaction = await self.client.create_bcs_transaction(account, payload, sequence_number)
+            if self.gas_estimator is not None:
+                with metrics.timer(operation, "estimate_gas"):
+                    estimate = await self.gas_estimator.estimate(self.client, account, payload)
+                self.gas_estimator.apply(raw_transaction, estimate)
+            with metrics.timer(operation, "sign"):
+                signed_transaction = SignedTransaction(raw_transaction, account.sign_transaction(raw_transaction))
+            with metrics.timer(operation, "submit"):
+                tx_hash = await self.client.submit_bcs_transaction(signed_transaction)
+            with metrics.timer(operation, "wait"):
+                gas_used = await self._wait(tx_hash, account, raw_transaction.sequence_number)
+        except Exception as e:
+            metrics.record_error(operation, e)
+            if self.gas_estimator is not None:
+                self.gas_estimator.forget(payload)
+            raise
+        self._invalidate_for_payload(account, payload)
+        if self.gas_estimator is not None:
+            await self.gas_estimator.after_commit(self.client, payload, tx_hash, gas_used)
+        return tx_hash
+    
+    async def _wait(self, tx_hash: str, account: Account, sequence_number: int) -> Optional[int]:
+        """等待交易确认，经共享轮询器确认时返回 gas 用量"""
+        if self.confirmations is None:
+            await self.client.wait_for_transaction(tx_hash)
+            return None
+        confirmation = await self.confirmations.wait(tx_hash, account.address(), sequence_number)
+        return confirmation.gas_used
+    
+    async def submit_pipelined(
+        self,
+        account: Account,
+        function_name: str,
+        arguments: List[TransactionArgument],
+    ) -> asyncio.Future:
+        """
+        通过账户流水线提交 entry 函数调用，不等待确认。
+
+        返回的 Future 在交易确认后解析为交易哈希，失败时抛出异常。
+        """
+        payload = EntryFunction.natural(
+            self._get_module_id(),
+            function_name,
+            [],
+            arguments
+        )
+        return await self._submit_nowait(account, TransactionPayload(payload))
+    
+    async def submit_entry_nowait(self, function_name: str, account: Account, *args: Any) -> asyncio.Future:
+        """按 ABI 校验参数并通过账户流水线提交 entry 函数，返回确认 Future"""
+        with self.metrics.timer(function_name, "build"):
+            payload = TransactionPayload(self._plan(function_name).build_entry_function(args))
+        return await self._submit_nowait(account, payload)
+    
+    async def _submit_nowait(self, account: Account, payload: TransactionPayload) -> asyncio.Future:
+        future = await self.pipeline(account).submit(payload)
+
+        def invalidate(done: asyncio.Future):
+            if not done.cancelled() and done.exception() is None:
+                self._invalidate_for_payload(account, payload)
+
+        future.add_done_callback(invalidate)
+        return future
+    
+    def kv_writer(
+        self,
+        account: Account,
+        window: float = DEFAULT_COALESCE_WINDOW,
+        max_pending_keys: int = DEFAULT_MAX_PENDING_KEYS,
+    ) -> KeyValueWriter:
+        """获取（或创建）账户的键值写入合并器，参数只在首次创建时生效"""
+        key = str(account.address())
+        writer = self._kv_writers.get(key)
+        if writer is None:
+            writer = KeyValueWriter(self, account, window, max_pending_keys)
+            self._kv_writers[key] = writer
+        return writer
+    
+    async def _submit_signed_bytes(self, signed_transaction: bytes) -> str:
+        """提交已签名交易的 BCS 字节，返回交易哈希"""
+        if isinstance(self.client, EndpointPool):
+            return await self.client.submit_signed_bytes(signed_transaction)
+        return await post_signed_transaction(self.client, signed_transaction)
+    
+    async def submit_bulk(
+        self,
+        function_name: str,
+        account: Account,
+        arguments: Iterable[Iterable[Any]],
+        signer: Optional[BulkSigner] = None,
+        batch_size: int = DEFAULT_SIGN_BATCH_SIZE,
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        wait: bool = True,
+    ) -> AsyncIterator[SubmitResult]:
+        """
+        以同一账户批量提交 entry 函数调用，按输入顺序产出 SubmitResult。
+
+        原始交易在事件循环中按本地递增的序列号构建，每 batch_size 笔交给
+        BulkSigner 的进程池签名，签名下一批的同时提交上一批；最多 concurrency
+        笔交易同时处于提交/等待确认中。参数校验失败的输入不占用序列号。
+        """
+        plan = self._plan(function_name)
+        if signer is None:
+            if self._bulk_signer is None:
+                self._bulk_signer = BulkSigner()
+            signer = self._bulk_signer
+        metrics = self.metrics
+        pipeline = self._pipelines.get(str(account.address()))
+        if pipeline is not None:
+            # 与账户流水线共用序列号：先等待其在途交易，之后让它重新同步
+            await pipeline.drain()
+            pipeline.invalidate()
+        with metrics.timer(function_name, "sequence_number"):
+            chain_id = int(await self.client.chain_id())
+            sequence_number = int(await self.client.account_sequence_number(account.address()))
+        config = getattr(self.client, "client_config", None)
+        max_gas_amount = getattr(config, "max_gas_amount", DEFAULT_MAX_GAS_AMOUNT)
+        gas_unit_price = getattr(config, "gas_unit_price", DEFAULT_GAS_UNIT_PRICE)
+        expiration_ttl = getattr(config, "expiration_ttl", DEFAULT_EXPIRATION_TTL)
+        in_flight = asyncio.Semaphore(concurrency)
+        loop = asyncio.get_running_loop()
+
+        async def sign(raw_transactions: List[RawTransaction]) -> List[bytes]:
+            with metrics.timer(function_name, "sign"):
+                return await signer.sign(account, raw_transactions)
+
+        async def send(
+            index: int,
+            args: List[Any],
+            payload: TransactionPayload,
+            signed: asyncio.Future,
+            position: int,
+            sequence_number: int,
+        ) -> SubmitResult:
+            try:
+                signed_transaction = (await signed)[position]
+                async with in_flight:
+                    with metrics.timer(function_name, "submit"):
+                        tx_hash = await self._submit_signed_bytes(signed_transaction)
+                    if wait:
+                        with metrics.timer(function_name, "wait"):
+                            await self._wait(tx_hash, account, sequence_number)
+            except Exception as e:
+                metrics.record_error(function_name, e)
+                return SubmitResult(index, args, error=e)
+            if wait:
+                self._invalidate_for_payload(account, payload)
+            return SubmitResult(index, args, tx_hash)
+
+        pending = deque()
+        batch = []
+        window = max(concurrency * 4, batch_size * 2)
+
+        def flush():
+            signed = asyncio.ensure_future(sign([raw_transaction for _, _, _, raw_transaction in batch]))
+            for position, (index, args, payload, raw_transaction) in enumerate(batch):
+                pending.append(asyncio.ensure_future(
+                    send(index, args, payload, signed, position, raw_transaction.sequence_number)
+                ))
+            batch.clear()
+
+        try:
+            for index, args in enumerate(arguments):
+                args = list(args)
+                metrics.record_call(function_name, "write")
+                try:
+                    with metrics.timer(function_name, "build"):
+                        payload = TransactionPayload(plan.build_entry_function(args))
+                    raw_transaction = RawTransaction(
+                        account.address(),
+                        sequence_number,
+                        payload,
+                        max_gas_amount,
+                        gas_unit_price,
+                        int(time.time()) + expiration_ttl,
+                        chain_id,
+                    )
+                    if self.gas_estimator is not None:
+                        with metrics.timer(function_name, "estimate_gas"):
+                            estimate = await self.gas_estimator.estimate(self.client, account, payload)
+                        self.gas_estimator.apply(raw_transaction, estimate)
+                except Exception as e:
+                    metrics.record_error(function_name, e)
+                    failed = loop.create_future()
+                    failed.set_result(SubmitResult(index, args, error=e))
+                    pending.append(failed)
+                else:
+                    sequence_number += 1
+                    batch.append((index, args, payload, raw_transaction))
+                    if len(batch) >= batch_size:
+                        flush()
+                while len(pending) >= window:
+                    yield await pending.popleft()
+            if batch:
+                flush()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+    
     async def init_status(self, account: Account) -> Optional[str]:
         """初始化状态"""
         try:
-            payload = EntryFunction.natural(
-                self.module_name,
-                "init_status",
-                [],
-                []
-            )
-            
-            signed_transaction = await self.client.create_bcs_signed_transaction(
-                account, TransactionPayload(payload)
-            )
-            
-            tx_hash = await self.client.submit_bcs_transaction(signed_transaction)
-            await self.client.wait_for_transaction(tx_hash)
+            tx_hash = await self.submit_entry("init_status", account)
             
             print(f"✅ Status initialized. Transaction: {tx_hash}")
             return tx_hash
@@ -95,19 +816,7 @@ class TruePassClient:
     async def set_message(self, account: Account, message: str) -> Optional[str]:
         """设置消息"""
         try:
-            payload = EntryFunction.natural(
-                self.module_name,
-                "set_message",
-                [],
-                [TransactionArgument(message, str)]
-            )
-            
-            signed_transaction = await self.client.create_bcs_signed_transaction(
-                account, TransactionPayload(payload)
-            )
-            
-            tx_hash = await self.client.submit_bcs_transaction(signed_transaction)
-            await self.client.wait_for_transaction(tx_hash)
+            tx_hash = await self.submit_entry("set_message", account, message)
             
             print(f"✅ Message set to '{message}'. Transaction: {tx_hash}")
             return tx_hash
@@ -119,19 +828,7 @@ class TruePassClient:
     async def set_status_true(self, account: Account) -> Optional[str]:
         """设置状态为 true"""
         try:
-            payload = EntryFunction.natural(
-                self.module_name,
-                "set_status_true",
-                [],
-                []
-            )
-            
-            signed_transaction = await self.client.create_bcs_signed_transaction(
-                account, TransactionPayload(payload)
-            )
-            
-            tx_hash = await self.client.submit_bcs_transaction(signed_transaction)
-            await self.client.wait_for_transaction(tx_hash)
+            tx_hash = await self.submit_entry("set_status_true", account)
             
             print(f"✅ Status set to true. Transaction: {tx_hash}")
             return tx_hash
@@ -143,22 +840,7 @@ class TruePassClient:
     async def update_status(self, account: Account, target_address: str, status: bool) -> Optional[str]:
         """更新指定地址的状态（需要权限）"""
         try:
-            payload = EntryFunction.natural(
-                self.module_name,
-                "update_status",
-                [],
-                [
-                    TransactionArgument(target_address, str),
-                    TransactionArgument(status, bool)
-                ]
-            )
-            
-            signed_transaction = await self.client.create_bcs_signed_transaction(
-                account, TransactionPayload(payload)
-            )
-            
-            tx_hash = await self.client.submit_bcs_transaction(signed_transaction)
-            await self.client.wait_for_transaction(tx_hash)
+            tx_hash = await self.submit_entry("update_status", account, target_address, status)
             
             print(f"✅ Status updated for {target_address} to {status}. Transaction: {tx_hash}")
             return tx_hash
@@ -167,6 +849,125 @@ class TruePassClient:
             print(f"❌ Error updating status: {e}")
             return None
     
+    async def submit_batched(
+        self,
+        function_name: str,
+        account: Account,
+        columns: Sequence[Sequence[Any]],
+        batch_size: int = DEFAULT_WRITE_BATCH_SIZE,
+    ) -> List[str]:
+        """
+        把等长的参数列按行切分成多笔批量 entry 交易提交，全部确认后按顺序返回交易哈希。
+
+        每笔交易最多 batch_size 行，参数总字节数不超过 MAX_BATCH_ARGUMENT_BYTES；
+        各笔交易经账户流水线按顺序提交，任意一笔失败时抛出异常。
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        columns = [list(column) for column in columns]
+        if len({len(column) for column in columns}) > 1:
+            raise CallError(f"{function_name} argument lists must have the same length")
+        rows = len(columns[0]) if columns else 0
+        confirmations = []
+        start = 0
+        while start < rows:
+            end = start
+            size = 0
+            while end < rows and end - start < batch_size:
+                row_size = sum(len(str(column[end]).encode()) + 4 for column in columns)
+                if end > start and size + row_size > MAX_BATCH_ARGUMENT_BYTES:
+                    break
+                size += row_size
+                end += 1
+            confirmations.append(
+                await self.submit_entry_nowait(function_name, account, *(column[start:end] for column in columns))
+            )
+            start = end
+        return list(await asyncio.gather(*confirmations))
+    
+    async def batch_set_key_value(
+        self, account: Account, items, batch_size: int = DEFAULT_WRITE_BATCH_SIZE
+    ) -> Optional[List[str]]:
+        """批量设置键值（items 为字典或 (键, 值) 序列）"""
+        pairs = list(items.items() if isinstance(items, dict) else items)
+        try:
+            tx_hashes = await self.submit_batched(
+                "batch_set_key_value", account, [[k for k, _ in pairs], [v for _, v in pairs]], batch_size
+            )
+            print(f"✅ {len(pairs)} key-value pairs set in {len(tx_hashes)} transaction(s)")
+            return tx_hashes
+        except Exception as e:
+            print(f"❌ Error setting key-value pairs: {e}")
+            return None
+    
+    async def batch_delete_key(
+        self, account: Account, keys: Iterable[str], batch_size: int = DEFAULT_WRITE_BATCH_SIZE
+    ) -> Optional[List[str]]:
+        """批量删除键（某一笔交易中有不存在的键时该笔交易整体失败）"""
+        keys = list(keys)
+        try:
+            tx_hashes = await self.submit_batched("batch_delete_key", account, [keys], batch_size)
+            print(f"✅ {len(keys)} keys deleted in {len(tx_hashes)} transaction(s)")
+            return tx_hashes
+        except Exception as e:
+            print(f"❌ Error deleting keys: {e}")
+            return None
+    
+    async def batch_add_to_whitelist(
+        self, account: Account, addresses: Iterable[str], batch_size: int = DEFAULT_WRITE_BATCH_SIZE
+    ) -> Optional[List[str]]:
+        """批量加入白名单（需要部署者账户）"""
+        addresses = list(addresses)
+        try:
+            tx_hashes = await self.submit_batched("batch_add_to_whitelist", account, [addresses], batch_size)
+            print(f"✅ {len(addresses)} addresses whitelisted in {len(tx_hashes)} transaction(s)")
+            return tx_hashes
+        except Exception as e:
+            print(f"❌ Error adding addresses to whitelist: {e}")
+            return None
+    
+    async def batch_remove_from_whitelist(
+        self, account: Account, addresses: Iterable[str], batch_size: int = DEFAULT_WRITE_BATCH_SIZE
+    ) -> Optional[List[str]]:
+        """批量移出白名单（需要部署者账户）"""
+        addresses = list(addresses)
+        try:
+            tx_hashes = await self.submit_batched("batch_remove_from_whitelist", account, [addresses], batch_size)
+            print(f"✅ {len(addresses)} addresses removed from whitelist in {len(tx_hashes)} transaction(s)")
+            return tx_hashes
+        except Exception as e:
+            print(f"❌ Error removing addresses from whitelist: {e}")
+            return None
+    
+    async def migrate_storage(
+        self, account: Account, chunk_size: int = DEFAULT_MIGRATION_CHUNK_SIZE
+    ) -> Optional[List[str]]:
+        """
+        把白名单和键值数据从旧的向量存储迁移到表索引（需要部署者账户）。
+
+        合约升级后应尽快调用：写操作只作用于表索引，首次迁移交易负责创建索引。
+        每笔交易最多迁移 chunk_size 条，直到 pending_migration 报告没有剩余。
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be >= 1")
+        tx_hashes = []
+        try:
+            first = True
+            while True:
+                whitelist, database = await self.call_view("pending_migration", use_cache=False)
+                if not first and not int(whitelist) and not int(database):
+                    break
+                if first or int(whitelist):
+                    tx_hashes.append(await self.submit_entry("migrate_whitelist", account, chunk_size))
+                if first or int(database):
+                    tx_hashes.append(await self.submit_entry("migrate_database", account, chunk_size))
+                first = False
+            print(f"✅ Storage migrated in {len(tx_hashes)} transaction(s)")
+            return tx_hashes
+        except Exception as e:
+            print(f"❌ Error migrating storage: {e}")
+            return None
+    
     async def get_account_info(self, address: str) -> Optional[dict]:
         """获取账户信息"""
         try:
@@ -174,4 +975,88 @@ class TruePassClient:
             return account_data
         except Exception as e:
             print(f"❌ Error getting account info: {e}")
-            return None
\ No newline at end of file
+            return None
+
+
+class Snapshot:
+    """
+    固定在一个账本版本上的只读视图。
+
+    快照内的所有 view 调用看到同一个链上状态，多次调用、批量扫描之间的结果
+    互相一致；结果永不过期，客户端启用缓存时会一直缓存（按 LRU 淘汰）。
+    """
+
+    def __init__(self, client: TruePassClient, ledger_version: int):
+        self.client = client
+        self.ledger_version = ledger_version
+
+    def __repr__(self) -> str:
+        return f"Snapshot(ledger_version={self.ledger_version})"
+
+    async def call_view(self, function_name: str, *args: Any, use_cache: bool = True) -> Any:
+        return await self.client.call_view(
+            function_name, *args, use_cache=use_cache, ledger_version=self.ledger_version
+        )
+
+    def view_many(
+        self,
+        function_name: str,
+        arguments: Iterable[List[Any]],
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        ordered: bool = True,
+        decode: Optional[Callable[[List[Any]], Any]] = None,
+        use_cache: bool = True,
+    ) -> AsyncIterator[ViewResult]:
+        return self.client.view_many(
+            function_name, arguments, concurrency, ordered, decode, use_cache, self.ledger_version
+        )
+
+    def stream_view(self, function_name: str, *args: Any, chunk_size: int = DEFAULT_STREAM_CHUNK_SIZE) -> AsyncIterator[Any]:
+        return self.client.stream_view(function_name, *args, ledger_version=self.ledger_version, chunk_size=chunk_size)
+
+    async def get_status(self, address: str) -> bool:
+        """获取地址状态"""
+        return await self.call_view("get_status", address)
+
+    async def get_message(self, address: str) -> str:
+        """获取地址消息"""
+        return await self.call_view("get_message", address)
+
+    async def get_number(self) -> int:
+        """获取数字"""
+        return await self.call_view("get_number")
+
+    def get_status_many(
+        self,
+        addresses: Iterable[str],
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        ordered: bool = True,
+    ) -> AsyncIterator[ViewResult]:
+        """批量获取地址状态"""
+        return self.view_many("get_status", ([address] for address in addresses), concurrency, ordered)
+
+    def get_message_many(
+        self,
+        addresses: Iterable[str],
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        ordered: bool = True,
+    ) -> AsyncIterator[ViewResult]:
+        """批量获取地址消息"""
+        return self.view_many("get_message", ([address] for address in addresses), concurrency, ordered)
+
+    def iter_all_keys(self) -> AsyncIterator[str]:
+        """流式获取快照版本上的全部键"""
+        return self.client.iter_all_keys(self.ledger_version)
+
+    def iter_whitelist(self) -> AsyncIterator[str]:
+        """流式获取快照版本上的白名单地址"""
+        return self.client.iter_whitelist(self.ledger_version)
+
+    def iter_keys_paged(self, page_size: int = DEFAULT_PAGE_SIZE) -> AsyncIterator[str]:
+        return self.client.iter_keys_paged(page_size, self.ledger_version)
+
+    def iter_entries(self, page_size: int = DEFAULT_PAGE_SIZE) -> AsyncIterator[Tuple[str, str]]:
+        return self.client.iter_entries(page_size, self.ledger_version)
+
+    def iter_whitelist_paged(self, page_size: int = DEFAULT_PAGE_SIZE) -> AsyncIterator[str]:
+        return self.client.iter_whitelist_paged(page_size, self.ledger_version)
@@ -0,0 +1,128 @@
+"""
+多进程批量签名
+原始交易在事件循环中构建，BCS 序列化与 ed25519 签名按批交给进程池完成；
+签名后的交易字节写入与工作进程共享的内存槽，主进程按偏移直接读取，不经过管道回传
+"""
+
+import asyncio
+import ctypes
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.sharedctypes import RawArray
+from typing import Dict, List, Optional, Sequence, Tuple
+from aptos_sdk import ed25519
+from aptos_sdk.account import Account
+from aptos_sdk.transactions import RawTransaction, SignedTransaction
+
+# 每批交给工作进程签名的交易数
+DEFAULT_SIGN_BATCH_SIZE = 256
+# 每个共享内存槽的字节数，放不下的交易改为随结果经管道回传
+DEFAULT_SLOT_SIZE = 1 << 20
+
+# 工作进程内的状态：共享内存槽与按私钥缓存的签名密钥
+_worker_slots: List[ctypes.Array] = []
+_worker_keys: Dict[bytes, ed25519.PrivateKey] = {}
+
+
+def _init_worker(slots: List[ctypes.Array]):
+    global _worker_slots
+    _worker_slots = slots
+
+
+def _sign_batch(
+    slot_index: int,
+    private_key: bytes,
+    raw_transactions: Sequence[RawTransaction],
+) -> Tuple[List[Optional[Tuple[int, int]]], List[bytes]]:
+    """在工作进程中签名一批交易，返回每笔交易在槽内的 (偏移, 长度) 及放不下的交易字节"""
+    key = _worker_keys.get(private_key)
+    if key is None:
+        key = _worker_keys[private_key] = ed25519.PrivateKey.from_hex(private_key)
+    slot = _worker_slots[slot_index]
+    base = ctypes.addressof(slot)
+    capacity = len(slot)
+    offsets: List[Optional[Tuple[int, int]]] = []
+    overflow: List[bytes] = []
+    position = 0
+    for raw_transaction in raw_transactions:
+        data = SignedTransaction(raw_transaction, raw_transaction.sign(key)).bytes()
+        if position + len(data) <= capacity:
+            ctypes.memmove(base + position, data, len(data))
+            offsets.append((position, len(data)))
+            position += len(data)
+        else:
+            offsets.append(None)
+            overflow.append(data)
+    return offsets, overflow
+
+
+class BulkSigner:
+    """
+    进程池签名器。
+
+    每个在途批次占用一个共享内存槽，槽数默认为进程数的两倍，使事件循环在
+    读取上一批结果时工作进程可以继续签名下一批。
+    """
+
+    def __init__(
+        self,
+        processes: Optional[int] = None,
+        slots: Optional[int] = None,
+        slot_size: int = DEFAULT_SLOT_SIZE,
+    ):
+        self.processes = processes or os.cpu_count() or 1
+        self.slot_size = slot_size
+        self._slots = [RawArray(ctypes.c_ubyte, slot_size) for _ in range(slots or self.processes * 2)]
+        self._executor = ProcessPoolExecutor(
+            self.processes, initializer=_init_worker, initargs=(self._slots,)
+        )
+        self._free: Optional[asyncio.Queue] = None
+        self.batches = 0
+        self.transactions = 0
+        self.overflowed = 0
+
+    async def sign(self, account: Account, raw_transactions: Sequence[RawTransaction]) -> List[bytes]:
+        """签名一批原始交易，按输入顺序返回 SignedTransaction 的 BCS 字节"""
+        if self._free is None:
+            self._free = asyncio.Queue()
+            for index in range(len(self._slots)):
+                self._free.put_nowait(index)
+        slot_index = await self._free.get()
+        try:
+            offsets, overflow = await asyncio.get_running_loop().run_in_executor(
+                self._executor, _sign_batch, slot_index, account.private_key.key.encode(), list(raw_transactions)
+            )
+            view = memoryview(self._slots[slot_index])
+            signed = []
+            spilled = iter(overflow)
+            for entry in offsets:
+                if entry is None:
+                    signed.append(next(spilled))
+                else:
+                    position, length = entry
+                    signed.append(view[position:position + length].tobytes())
+            view.release()
+        finally:
+            self._free.put_nowait(slot_index)
+        self.batches += 1
+        self.transactions += len(offsets)
+        self.overflowed += len(overflow)
+        return signed
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> "BulkSigner":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def stats(self) -> dict:
+        return {
+            "processes": self.processes,
+            "slots": len(self._slots),
+            "batches": self.batches,
+            "transactions": self.transactions,
+            "overflowed": self.overflowed,
+        }
@@ -0,0 +1,225 @@
+"""
+ABI 驱动的调用计划
+启动时把 ABI 编译成按函数名索引的调用计划表：预先计算完整函数 ID、
+每个参数的编码器（view 用 JSON，entry 用 BCS）以及返回值解码器
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from aptos_sdk.account_address import AccountAddress
+from aptos_sdk.bcs import Deserializer, Serializer
+from aptos_sdk.transactions import EntryFunction, ModuleId
+
+STRING_TYPE = "0x1::string::String"
+
+_INTEGER_BITS = {"u8": 8, "u16": 16, "u32": 32, "u64": 64, "u128": 128, "u256": 256}
+# u64 及以上在 JSON 中以字符串表示
+_STRING_ENCODED_INTEGERS = {"u64", "u128", "u256"}
+
+
+class CallError(ValueError):
+    """调用参数与 ABI 不匹配"""
+
+
+class MoveType:
+    """单个 Move 参数/返回类型的编码与解码规则"""
+
+    __slots__ = ("name", "to_json", "to_bcs", "from_json", "from_bcs")
+
+    def __init__(
+        self,
+        name: str,
+        to_json: Callable[[Any], Any],
+        to_bcs: Callable[[Serializer, Any], None],
+        from_json: Callable[[Any], Any],
+        from_bcs: Callable[[Deserializer], Any],
+    ):
+        self.name = name
+        self.to_json = to_json
+        self.to_bcs = to_bcs
+        self.from_json = from_json
+        self.from_bcs = from_bcs
+
+
+def _check_integer(type_name: str, bits: int) -> Callable[[Any], int]:
+    upper = 1 << bits
+
+    def check(value: Any) -> int:
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise CallError(f"expected {type_name}, got {type(value).__name__}")
+        if not 0 <= value < upper:
+            raise CallError(f"{value} is out of range for {type_name}")
+        return value
+
+    return check
+
+
+def _check_bool(value: Any) -> bool:
+    if not isinstance(value, bool):
+        raise CallError(f"expected bool, got {type(value).__name__}")
+    return value
+
+
+def _check_string(value: Any) -> str:
+    if not isinstance(value, str):
+        raise CallError(f"expected {STRING_TYPE}, got {type(value).__name__}")
+    return value
+
+
+def _to_address(value: Any) -> AccountAddress:
+    if isinstance(value, AccountAddress):
+        return value
+    try:
+        return AccountAddress.from_str_relaxed(str(value))
+    except Exception as e:
+        raise CallError(f"invalid address {value!r}: {e}")
+
+
+def _to_bytes(value: Any) -> bytes:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value)
+    raise CallError(f"expected bytes for vector<u8>, got {type(value).__name__}")
+
+
+def parse_type(type_name: str) -> MoveType:
+    """把 ABI 中的类型字符串解析为编码/解码规则"""
+    if type_name == "bool":
+        return MoveType(type_name, _check_bool, lambda ser, v: ser.bool(_check_bool(v)), bool, Deserializer.bool)
+    if type_name in _INTEGER_BITS:
+        check = _check_integer(type_name, _INTEGER_BITS[type_name])
+        serialize = getattr(Serializer, type_name)
+        if type_name in _STRING_ENCODED_INTEGERS:
+            to_json = lambda v: str(check(v))
+        else:
+            to_json = check
+        return MoveType(
+            type_name, to_json, lambda ser, v: serialize(ser, check(v)), int, getattr(Deserializer, type_name)
+        )
+    if type_name == "address":
+        return MoveType(
+            type_name,
+            lambda v: str(_to_address(v)),
+            lambda ser, v: ser.struct(_to_address(v)),
+            str,
+            lambda de: str(AccountAddress.deserialize(de)),
+        )
+    if type_name == STRING_TYPE:
+        return MoveType(type_name, _check_string, lambda ser, v: ser.str(_check_string(v)), str, Deserializer.str)
+    if type_name == "vector<u8>":
+        return MoveType(
+            type_name,
+            lambda v: "0x" + _to_bytes(v).hex(),
+            lambda ser, v: ser.to_bytes(_to_bytes(v)),
+            lambda v: bytes.fromhex(v[2:] if v.startswith("0x") else v),
+            Deserializer.to_bytes,
+        )
+    if type_name.startswith("vector<") and type_name.endswith(">"):
+        inner = parse_type(type_name[len("vector<"):-1])
+
+        def to_list(value: Any) -> list:
+            if isinstance(value, (str, bytes)) or not hasattr(value, "__iter__"):
+                raise CallError(f"expected a sequence for {type_name}, got {type(value).__name__}")
+            return list(value)
+
+        return MoveType(
+            type_name,
+            lambda v: [inner.to_json(item) for item in to_list(v)],
+            lambda ser, v: ser.sequence(to_list(v), inner.to_bcs),
+            lambda v: [inner.from_json(item) for item in v],
+            lambda de: de.sequence(inner.from_bcs),
+        )
+    # 结构体等其他类型：不做转换，原样传递 JSON
+    return MoveType(type_name, lambda v: v, _unsupported_bcs(type_name), lambda v: v, _unsupported_bcs(type_name))
+
+
+def _unsupported_bcs(type_name: str) -> Callable[..., Any]:
+    def unsupported(*args: Any):
+        raise CallError(f"cannot BCS-encode or decode argument of type {type_name}")
+
+    return unsupported
+
+
+def _is_signer(type_name: str) -> bool:
+    return type_name in ("signer", "&signer")
+
+
+class CallPlan:
+    """单个函数的预编译调用计划"""
+
+    __slots__ = (
+        "name",
+        "function_id",
+        "module_id",
+        "is_view",
+        "is_entry",
+        "param_types",
+        "return_types",
+    )
+
+    def __init__(self, definition: dict, module_id: ModuleId, module_name: str):
+        self.name = definition["name"]
+        self.function_id = f"{module_name}::{self.name}"
+        self.module_id = module_id
+        self.is_view = definition["is_view"]
+        self.is_entry = definition["is_entry"]
+        self.param_types: Tuple[MoveType, ...] = tuple(
+            parse_type(param) for param in definition["params"] if not _is_signer(param)
+        )
+        self.return_types: Tuple[MoveType, ...] = tuple(
+            parse_type(ret) for ret in definition["return"]
+        )
+
+    def _check_arity(self, args: Tuple[Any, ...]):
+        if len(args) != len(self.param_types):
+            raise CallError(
+                f"{self.name} expects {len(self.param_types)} argument(s) "
+                f"({', '.join(t.name for t in self.param_types)}), got {len(args)}"
+            )
+
+    def encode_view_args(self, args: Tuple[Any, ...]) -> List[Any]:
+        """校验并编码 view 调用的 JSON 参数"""
+        if not self.is_view:
+            raise CallError(f"{self.name} is not a view function")
+        self._check_arity(args)
+        return [move_type.to_json(arg) for move_type, arg in zip(self.param_types, args)]
+
+    def build_entry_function(self, args: Tuple[Any, ...]) -> EntryFunction:
+        """校验并编码 entry 调用的 BCS 参数"""
+        if not self.is_entry:
+            raise CallError(f"{self.name} is not an entry function")
+        self._check_arity(args)
+        encoded = []
+        for move_type, arg in zip(self.param_types, args):
+            ser = Serializer()
+            move_type.to_bcs(ser, arg)
+            encoded.append(ser.output())
+        return EntryFunction(self.module_id, self.name, [], encoded)
+
+    def decode_entry_args(self, arguments: List[bytes]) -> Tuple[Any, ...]:
+        """把 entry 调用的 BCS 参数解码为 Python 值（build_entry_function 的逆操作）"""
+        if len(arguments) != len(self.param_types):
+            raise CallError(f"{self.name} expects {len(self.param_types)} argument(s), got {len(arguments)}")
+        values = []
+        for move_type, argument in zip(self.param_types, arguments):
+            de = Deserializer(argument)
+            values.append(move_type.from_bcs(de))
+            if de.remaining():
+                raise CallError(f"{de.remaining()} trailing byte(s) after {move_type.name} argument")
+        return tuple(values)
+
+    def decode(self, result: Optional[List[Any]]) -> Any:
+        """解码 view 返回值：单个返回值直接返回，多个返回元组"""
+        if not result:
+            return None
+        values = tuple(move_type.from_json(value) for move_type, value in zip(self.return_types, result))
+        return values[0] if len(values) == 1 else values
+
+
+def compile_abi(abi: dict, address: Optional[str] = None) -> Dict[str, CallPlan]:
+    """把 ABI 字典编译为 函数名 -> CallPlan 的索引表"""
+    module_address = AccountAddress.from_str_relaxed(address or abi["address"])
+    module_name = f"{address or abi['address']}::{abi['name']}"
+    module_id = ModuleId(module_address, abi["name"])
+    return {
+        definition["name"]: CallPlan(definition, module_id, module_name)
+        for definition in abi["exposed_functions"]
+    }
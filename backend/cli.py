@@ -3,15 +3,34 @@
 TruePass 区块链交互终端
 """
 
+import argparse
 import asyncio
+import json
 import sys
 from aptos_sdk.account import Account
-from blockchain_client import TruePassClient
+from blockchain_client import TruePassClient, DEFAULT_BATCH_CONCURRENCY
+from batch import BatchRunner
+from account_pool import AccountPool, load_keys
+from daemon import TruePassDaemon
+from watcher import AddressWatcher, FIELDS
+
+# 守护进程模式默认的 view 缓存大小；默认关闭，因为缓存只在本进程的写入后失效，
+# 其他客户端的写入在 TTL 内读不到，需要时用 --cache-size 开启
+DEFAULT_DAEMON_CACHE_SIZE = 0
 
 class TruePassCLI:
-    def __init__(self):
-        self.client = TruePassClient()
+    def __init__(self, node_url: str = None, **client_options):
+        urls = [url.strip() for url in node_url.split(",") if url.strip()] if node_url else []
+        if len(urls) > 1:
+            # 多个节点：按健康度路由并对冲读请求
+            self.client = TruePassClient(node_urls=urls, **client_options)
+        elif urls:
+            self.client = TruePassClient(urls[0], **client_options)
+        else:
+            self.client = TruePassClient(**client_options)
         self.account = None
+        # 多签名账户池（--keys），写操作分散到各账户
+        self.pool = None
         
     def load_account(self, private_key: str = None):
         """加载账户"""
@@ -222,9 +241,95 @@ class TruePassCLI:
             
             input("\nPress Enter to continue...")
 
+    def load_pool(self, path: str):
+        """从文件加载多个签名账户组成账户池"""
+        accounts = load_keys(path)
+        if self.account is not None:
+            accounts.append(self.account)
+        self.pool = AccountPool(self.client, accounts)
+        print(f"✅ Loaded {len(self.pool)} signer accounts", file=sys.stderr)
+        return self.pool
+
+    async def run_batch(self, path: str, concurrency: int, private_key: str = None, keys: str = None):
+        """无交互批量模式：从 JSONL 文件（- 表示标准输入）读取操作"""
+        if private_key:
+            self.account = Account.load_key(private_key)
+        if keys:
+            self.load_pool(keys)
+        runner = BatchRunner(self.client, self.account, concurrency, self.pool)
+        if path == "-":
+            summary = await runner.run(sys.stdin, sys.stdout)
+        else:
+            with open(path, encoding="utf-8") as f:
+                summary = await runner.run(f, sys.stdout)
+        return summary["failed"] == 0
+
+    async def run_watch(self, path: str, fields: str, emit_initial: bool = False):
+        """监视模式：从文件（- 表示标准输入）读取地址，每个变化输出一行 JSON，Ctrl+C 结束"""
+        source = sys.stdin if path == "-" else open(path, encoding="utf-8")
+        try:
+            addresses = [line.strip() for line in source if line.strip() and not line.startswith("#")]
+        finally:
+            if source is not sys.stdin:
+                source.close()
+        watcher = AddressWatcher(
+            self.client,
+            addresses,
+            [field.strip() for field in fields.split(",") if field.strip()],
+            emit_initial=emit_initial,
+        )
+        print(f"👀 Watching {len(watcher)} addresses", file=sys.stderr)
+        try:
+            async for change in watcher.watch():
+                print(json.dumps(change.to_json(), ensure_ascii=False), flush=True)
+        finally:
+            print(f"📊 {json.dumps(watcher.stats())}", file=sys.stderr)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="TruePass Blockchain CLI")
+    parser.add_argument("--node-url", help="Aptos fullnode REST URL (comma-separated for a failover pool)")
+    parser.add_argument("--batch", metavar="FILE", help="run operations from a JSONL file ('-' for stdin) without prompts")
+    parser.add_argument("--private-key", help="signer private key for batch or daemon writes")
+    parser.add_argument("--keys", metavar="FILE", help="file of signer private keys (one per line); writes are spread across them")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_BATCH_CONCURRENCY, help="max concurrent reads in batch mode")
+    parser.add_argument("--watch", metavar="FILE", help="watch the addresses in FILE ('-' for stdin) and print changes as JSONL")
+    parser.add_argument("--fields", default=",".join(FIELDS), help="comma-separated fields to watch (status, message)")
+    parser.add_argument("--emit-initial", action="store_true", help="also print the first value read for each address")
+    parser.add_argument("--daemon", action="store_true", help="serve commands from tpctl.py over a Unix socket")
+    parser.add_argument("--socket", help="daemon socket path (default: $TRUEPASS_SOCKET or /tmp/truepass-<uid>.sock)")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_DAEMON_CACHE_SIZE, help="daemon view cache entries (default 0 = off); cached reads may miss other clients' writes for the cache TTL")
+    return parser.parse_args(argv)
+
+async def run_daemon(args):
+    """守护进程模式：保持连接、账户和缓存常驻，直到收到 shutdown 命令"""
+    cli = TruePassCLI(args.node_url, pipelined=True, cache_size=args.cache_size)
+    async with cli.client:
+        daemon = TruePassDaemon(cli.client, args.socket)
+        if args.private_key:
+            print(f"✅ Account loaded: {daemon.load_account(args.private_key).address()}")
+        if args.keys:
+            daemon.pool = cli.load_pool(args.keys)
+            if daemon.default_account is not None:
+                daemon.pool.add(daemon.default_account)
+        await daemon.serve_forever()
+
 async def main():
-    cli = TruePassCLI()
-    await cli.run()
+    args = parse_args()
+    if args.daemon:
+        await run_daemon(args)
+        return
+    cli = TruePassCLI(args.node_url)
+    async with cli.client:
+        if args.batch:
+            if not await cli.run_batch(args.batch, args.concurrency, args.private_key, args.keys):
+                sys.exit(1)
+        elif args.watch:
+            try:
+                await cli.run_watch(args.watch, args.fields, args.emit_initial)
+            except (KeyboardInterrupt, asyncio.CancelledError):
+                pass
+        else:
+            await cli.run()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,283 @@
+"""
+共享交易确认轮询
+用一个后台任务跟踪所有待确认交易：按发送账户批量查询已上链交易（一次请求覆盖
+该账户的一段序列号），不知道发送者的交易才按哈希单独查询；轮询间隔随进展自适应，
+可选地限制总请求速率
+"""
+
+import asyncio
+import time
+from typing import Dict, Optional
+from aptos_sdk.client import ApiError
+
+DEFAULT_MIN_POLL_INTERVAL = 0.05
+DEFAULT_MAX_POLL_INTERVAL = 1.0
+# 一轮没有任何交易确认时轮询间隔的放大倍数
+DEFAULT_POLL_BACKOFF = 1.5
+# 总请求速率上限（次/秒），默认不限：每轮每个发送者只查询一次，请求数本就不超过逐笔按哈希等待
+DEFAULT_MAX_REQUESTS_PER_SECOND = None
+# 限速时令牌桶可积攒的突发请求量，以秒计（容量 = 速率 × 该值，至少 1 个）
+DEFAULT_BURST_SECONDS = 1.0
+# 每次按账户查询的最大交易数
+DEFAULT_PAGE_SIZE = 100
+# RestClient 没有 client_config 时的等待超时（秒）
+DEFAULT_WAIT_TIMEOUT = 20.0
+
+
+class Confirmation:
+    """已上链交易的执行结果"""
+
+    __slots__ = ("tx_hash", "version", "success", "vm_status", "gas_used")
+
+    def __init__(self, tx_hash: str, version: int, success: bool, vm_status: str, gas_used: int):
+        self.tx_hash = tx_hash
+        self.version = version
+        self.success = success
+        self.vm_status = vm_status
+        self.gas_used = gas_used
+
+    @classmethod
+    def from_json(cls, transaction: dict) -> "Confirmation":
+        return cls(
+            transaction["hash"],
+            int(transaction.get("version", 0)),
+            bool(transaction.get("success", False)),
+            transaction.get("vm_status", ""),
+            int(transaction.get("gas_used", 0)),
+        )
+
+    def __repr__(self) -> str:
+        return f"Confirmation({self.tx_hash}, version={self.version}, success={self.success}, gas_used={self.gas_used})"
+
+
+class TransactionFailed(Exception):
+    """交易已上链但执行失败"""
+
+    def __init__(self, confirmation: Confirmation):
+        super().__init__(f"{confirmation.vm_status} - {confirmation.tx_hash}")
+        self.confirmation = confirmation
+
+
+class _Waiter:
+    __slots__ = ("tx_hash", "sender", "sequence_number", "future", "deadline")
+
+    def __init__(self, tx_hash: str, sender: Optional[str], sequence_number: Optional[int], deadline: float):
+        self.tx_hash = tx_hash
+        self.sender = sender
+        self.sequence_number = sequence_number
+        self.future = asyncio.get_running_loop().create_future()
+        self.deadline = deadline
+
+
+class ConfirmationPoller:
+    """
+    多笔交易共享的确认轮询器。
+
+    wait() 在交易上链后返回 Confirmation，执行失败时抛出 TransactionFailed，
+    超时抛出 TimeoutError。同一哈希的多个等待者共享一次查询。没有待确认交易时
+    后台任务自动退出，下次 wait() 时重新启动。
+    """
+
+    def __init__(
+        self,
+        rest_client,
+        min_interval: float = DEFAULT_MIN_POLL_INTERVAL,
+        max_interval: float = DEFAULT_MAX_POLL_INTERVAL,
+        backoff: float = DEFAULT_POLL_BACKOFF,
+        max_requests_per_second: Optional[float] = DEFAULT_MAX_REQUESTS_PER_SECOND,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        timeout: Optional[float] = None,
+        burst_seconds: float = DEFAULT_BURST_SECONDS,
+    ):
+        if max_requests_per_second is not None and max_requests_per_second <= 0:
+            raise ValueError("max_requests_per_second must be > 0")
+        self.rest_client = rest_client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.max_requests_per_second = max_requests_per_second
+        self.burst_seconds = burst_seconds
+        self.page_size = page_size
+        if timeout is None:
+            config = getattr(rest_client, "client_config", None)
+            timeout = getattr(config, "transaction_wait_in_seconds", DEFAULT_WAIT_TIMEOUT)
+        self.timeout = timeout
+        self._waiters: Dict[str, _Waiter] = {}
+        # 发送者 -> {序列号: 等待者}
+        self._by_sender: Dict[str, Dict[int, _Waiter]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._interval = min_interval
+        # 令牌桶限速（设置了 max_requests_per_second 时）
+        self._tokens = self._capacity()
+        self._refilled_at = time.monotonic()
+        self.rounds = 0
+        self.requests = 0
+        self.confirmed = 0
+        self.failed = 0
+        self.timeouts = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._waiters)
+
+    def track(self, tx_hash: str, sender=None, sequence_number: Optional[int] = None) -> asyncio.Future:
+        """登记一笔待确认交易，返回在确认后解析为 Confirmation 的 Future"""
+        waiter = self._waiters.get(tx_hash)
+        if waiter is None:
+            sender = None if sender is None else str(sender)
+            waiter = _Waiter(tx_hash, sender, sequence_number, time.monotonic() + self.timeout)
+            self._waiters[tx_hash] = waiter
+            if sender is not None and sequence_number is not None:
+                self._by_sender.setdefault(sender, {})[sequence_number] = waiter
+            # 新交易通常很快上链，回到最短轮询间隔
+            self._interval = self.min_interval
+            if self._wakeup is not None:
+                self._wakeup.set()
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run())
+        return waiter.future
+
+    async def wait(self, tx_hash: str, sender=None, sequence_number: Optional[int] = None) -> Confirmation:
+        """等待交易确认（asyncio.shield 防止单个调用方取消影响共享等待者）"""
+        return await asyncio.shield(self.track(tx_hash, sender, sequence_number))
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for waiter in self._waiters.values():
+            waiter.future.cancel()
+        self._waiters.clear()
+        self._by_sender.clear()
+
+    async def _run(self):
+        while self._waiters:
+            self.rounds += 1
+            progressed = await self._poll_round()
+            self._expire()
+            if not self._waiters:
+                break
+            if not progressed:
+                self._interval = min(self._interval * self.backoff, self.max_interval)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll_round(self) -> bool:
+        before = self.confirmed + self.failed
+        requests = [self._poll_sender(sender, waiters) for sender, waiters in list(self._by_sender.items())]
+        requests += [
+            self._poll_hash(waiter) for waiter in list(self._waiters.values()) if waiter.sequence_number is None
+        ]
+        if requests:
+            await asyncio.gather(*requests)
+        return self.confirmed + self.failed > before
+
+    def _capacity(self) -> float:
+        if self.max_requests_per_second is None:
+            return 1.0
+        return max(1.0, self.max_requests_per_second * self.burst_seconds)
+
+    async def _throttle(self):
+        """令牌桶：平均每秒最多 max_requests_per_second 次查询，允许 burst_seconds 秒的突发"""
+        self.requests += 1
+        rate = self.max_requests_per_second
+        if rate is None:
+            return
+        capacity = self._capacity()
+        while True:
+            now = time.monotonic()
+            self._tokens = min(capacity, self._tokens + (now - self._refilled_at) * rate)
+            self._refilled_at = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return
+            await asyncio.sleep((1.0 - self._tokens) / rate)
+
+    async def _poll_sender(self, sender: str, waiters: Dict[int, _Waiter]):
+        if not waiters:
+            return
+        await self._throttle()
+        try:
+            transactions = await self.rest_client.transactions_by_account(
+                sender, limit=self.page_size, start=min(waiters)
+            )
+        except Exception:
+            # 查询失败不影响等待者，下一轮重试（超时由 _expire 处理）
+            return
+        for transaction in transactions:
+            waiter = waiters.get(int(transaction.get("sequence_number", -1)))
+            if waiter is None:
+                continue
+            if transaction.get("hash") != waiter.tx_hash:
+                # 该序列号已被另一笔交易使用，这笔交易不可能再上链
+                self._finish(waiter, error=RuntimeError(
+                    f"sequence number {waiter.sequence_number} of {sender} was used by {transaction.get('hash')}"
+                    f" - {waiter.tx_hash}"
+                ))
+                continue
+            self._finish(waiter, Confirmation.from_json(transaction))
+
+    async def _poll_hash(self, waiter: _Waiter):
+        await self._throttle()
+        try:
+            transaction = await self.rest_client.transaction_by_hash(waiter.tx_hash)
+        except ApiError as e:
+            if getattr(e, "status_code", None) == 404:
+                return
+            self._finish(waiter, error=e)
+            return
+        except Exception:
+            return
+        if transaction.get("type") != "pending_transaction":
+            self._finish(waiter, Confirmation.from_json(transaction))
+
+    def _expire(self):
+        now = time.monotonic()
+        for waiter in list(self._waiters.values()):
+            if now >= waiter.deadline:
+                self.timeouts += 1
+                self._finish(waiter, error=TimeoutError(f"transaction {waiter.tx_hash} timed out"))
+
+    def _finish(self, waiter: _Waiter, confirmation: Optional[Confirmation] = None, error: Optional[BaseException] = None):
+        self._waiters.pop(waiter.tx_hash, None)
+        if waiter.sender is not None and waiter.sequence_number is not None:
+            waiters = self._by_sender.get(waiter.sender)
+            if waiters is not None:
+                waiters.pop(waiter.sequence_number, None)
+                if not waiters:
+                    del self._by_sender[waiter.sender]
+        if confirmation is not None and not confirmation.success:
+            error = TransactionFailed(confirmation)
+        if error is not None:
+            self.failed += 1
+        else:
+            self.confirmed += 1
+        if waiter.future.done():
+            return
+        if error is not None:
+            waiter.future.set_exception(error)
+            # 没有调用方读取异常时避免 "exception was never retrieved" 警告
+            waiter.future.exception()
+        else:
+            waiter.future.set_result(confirmation)
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._waiters),
+            "senders": len(self._by_sender),
+            "rounds": self.rounds,
+            "requests": self.requests,
+            "confirmed": self.confirmed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "interval_s": round(self._interval, 3),
+        }
@@ -0,0 +1,182 @@
+"""
+常驻客户端守护进程
+保持预热的 HTTP 连接、已加载的账户和 view 缓存，通过本地 Unix socket 接收换行分隔的
+JSON 命令（格式与批量模式相同），供 tpctl.py 这样的轻量前端调用
+"""
+
+import asyncio
+import json
+import os
+import socket
+import time
+from typing import Any, Dict, Optional
+from aptos_sdk.account import Account
+from aptos_sdk.account_address import AccountAddress
+from blockchain_client import TruePassClient
+from batch import parse_operation
+from account_pool import AccountPool
+from tpctl import default_socket_path
+
+# 守护进程内置命令（其余操作按 ABI 函数处理）
+COMMANDS = ("ping", "load_account", "accounts", "stats", "invalidate_cache", "shutdown")
+
+
+def _normalize(address) -> str:
+    """统一地址格式（接受短格式、省略 0x 与大写），作为已加载账户的键"""
+    return str(AccountAddress.from_str_relaxed(str(address)))
+
+
+class TruePassDaemon:
+    """
+    Unix socket 服务端。
+
+    每个连接可以发送多条请求，按顺序逐条响应；不同连接并发处理。写操作走
+    客户端的账户流水线，多个前端同时写同一账户时序列号不会冲突。
+    """
+
+    def __init__(
+        self,
+        client: TruePassClient,
+        socket_path: Optional[str] = None,
+        pool: Optional[AccountPool] = None,
+    ):
+        self.client = client
+        # 传入账户池时，未指定 account 的写操作由池选择签名账户（写入签名账户自己
+        # 名下状态的操作除外，它们由默认账户提交）
+        self.pool = pool
+        self.socket_path = socket_path or default_socket_path()
+        self.accounts: Dict[str, Account] = {}
+        self.default_account: Optional[Account] = None
+        self.started_at = time.time()
+        self.requests = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._stopped = asyncio.Event()
+
+    def load_account(self, private_key: Optional[str] = None) -> Account:
+        """加载（或生成）账户并设为默认账户"""
+        account = Account.load_key(private_key) if private_key else Account.generate()
+        self.accounts[_normalize(account.address())] = account
+        self.default_account = account
+        return account
+
+    def _account(self, address: Optional[str]) -> Optional[Account]:
+        if address is None:
+            return self.default_account
+        try:
+            account = self.accounts.get(_normalize(address))
+        except Exception:
+            raise ValueError(f"invalid account address {address!r}")
+        if account is None:
+            raise ValueError(f"account {address} is not loaded")
+        return account
+
+    def _remove_stale_socket(self):
+        if not os.path.exists(self.socket_path):
+            return
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(self.socket_path)
+            except OSError:
+                os.unlink(self.socket_path)
+                return
+        raise RuntimeError(f"a daemon is already listening on {self.socket_path}")
+
+    async def start(self):
+        self._remove_stale_socket()
+        self._server = await asyncio.start_unix_server(self._serve, self.socket_path)
+        # 请求中可能包含私钥，只允许当前用户连接
+        os.chmod(self.socket_path, 0o600)
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+        self._stopped.set()
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"🚀 TruePass daemon listening on {self.socket_path}")
+        try:
+            await self._stopped.wait()
+        finally:
+            await self.stop()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                response = await self.handle_line(line)
+                writer.write(json.dumps(response, default=str).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def handle_line(self, line: bytes) -> Dict[str, Any]:
+        self.requests += 1
+        request: Dict[str, Any] = {}
+        try:
+            request = json.loads(line)
+            response = {"ok": True, "result": await self.handle(request)}
+        except Exception as e:
+            response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        if isinstance(request, dict) and "id" in request:
+            response["id"] = request["id"]
+        return response
+
+    async def handle(self, request: Dict[str, Any]) -> Any:
+        """执行一条请求，返回结果（失败时抛出异常）"""
+        op = request.get("op")
+        if op in COMMANDS:
+            return await getattr(self, f"_cmd_{op}")(request)
+        account = self._account(request.get("account"))
+        op, args = parse_operation(request, account)
+        plan = self.client._plan(op)
+        if plan.is_view:
+            return await self.client.call_view(
+                op, *args, use_cache=request.get("use_cache", True), ledger_version=request.get("ledger_version")
+            )
+        if self.pool is not None and "account" not in request and not self.pool.pins_signer(op):
+            return await self.pool.submit_entry(op, *args)
+        if account is None:
+            raise ValueError("no account loaded for write operations")
+        return await (await self.client.submit_entry_nowait(op, account, *args))
+
+    async def _cmd_ping(self, request):
+        return "pong"
+
+    async def _cmd_load_account(self, request):
+        return str(self.load_account(request.get("private_key")).address())
+
+    async def _cmd_accounts(self, request):
+        return {
+            "default": str(self.default_account.address()) if self.default_account else None,
+            "loaded": sorted(self.accounts),
+        }
+
+    async def _cmd_stats(self, request):
+        return {
+            "uptime_s": round(time.time() - self.started_at, 3),
+            "requests": self.requests,
+            "cache": self.client.cache_stats(),
+            "endpoints": self.client.endpoint_stats(),
+            "metrics": self.client.metrics.snapshot(),
+            "pool": self.pool.stats() if self.pool is not None else None,
+        }
+
+    async def _cmd_invalidate_cache(self, request):
+        self.client.invalidate_cache(request.get("function"))
+        return True
+
+    async def _cmd_shutdown(self, request):
+        # 先回复再退出
+        asyncio.get_running_loop().call_soon(self._stopped.set)
+        return True
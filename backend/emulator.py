@@ -0,0 +1,780 @@
+#!/usr/bin/env python3
+"""
+truepass 合约模拟器
+在进程内模拟 truepass 模块的状态与语义（白名单、键值数据库、状态/消息、DatabaseChange 事件、
+abort 码与序列号），以 httpx 传输层的形式接入 TruePassClient：客户端代码不做任何修改，
+请求不经过网络，适合集成测试和本地开发
+"""
+
+import argparse
+import asyncio
+import bisect
+import hashlib
+import json
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs
+import httpx
+from aptos_sdk.account_address import AccountAddress
+from aptos_sdk.bcs import Deserializer
+from aptos_sdk.client import ApiError, RestClient
+from aptos_sdk.transactions import SignedTransaction
+from abi import CONTRACT_ADDRESS, MODULE_NAME
+from blockchain_client import CALL_PLANS, TruePassClient
+from call_plans import CallError
+from event_indexer import DATABASE_CHANGE_EVENT, KEY_DELETED_EVENT, KV_EVENTS
+from stub_node import CHAIN_ID, StubConfig, StubFullnode
+
+MODULE_ID = f"{CONTRACT_ADDRESS}::{MODULE_NAME}"
+MESSAGE_CHANGE_EVENT = f"{MODULE_ID}::MessageChange"
+
+# 模拟器的节点地址（只用于拼接 URL，请求由传输层在进程内处理）
+EMULATOR_URL = "http://truepass-emulator/v1"
+
+# truepass.move 中的错误码：编号 -> (常量名, 说明)
+EPERMISSION_DENIED = 1
+EKEY_NOT_FOUND = 2
+ENOT_WHITELISTED = 3
+ELENGTH_MISMATCH = 4
+ERRORS = {
+    EPERMISSION_DENIED: ("EPERMISSION_DENIED", "Permission denied error"),
+    EKEY_NOT_FOUND: ("EKEY_NOT_FOUND", "Key not found error"),
+    ENOT_WHITELISTED: ("ENOT_WHITELISTED", "Address not in whitelist"),
+    ELENGTH_MISMATCH: ("ELENGTH_MISMATCH", "Batch argument vectors have different lengths"),
+}
+
+# std::error 的错误类别（abort 码 = 类别 << 16 | 编号）
+INVALID_ARGUMENT = 0x1
+PERMISSION_DENIED = 0x5
+NOT_FOUND = 0x6
+
+# 分页 view 每页最多返回的条目数（合约的 MAX_PAGE_SIZE）
+MAX_PAGE_SIZE = 1000
+
+
+def _address(value: Any) -> str:
+    """统一地址格式，与节点 JSON 中的地址表示一致"""
+    return str(AccountAddress.from_str_relaxed(str(value)))
+
+
+class ExecutionError(Exception):
+    """交易或 view 执行失败，status 为 VM 状态（如 MISSING_DATA）"""
+
+    def __init__(self, status: str):
+        super().__init__(status)
+        self.status = status
+
+    def vm_status(self, function_name: str) -> str:
+        return f"Execution failed in {MODULE_ID}::{function_name}: {self.status}"
+
+
+class MoveAbort(ExecutionError):
+    """合约 abort，code 与链上 abort 码相同"""
+
+    def __init__(self, category: int, reason: int):
+        self.code = category << 16 | reason
+        name, description = ERRORS[reason]
+        super().__init__(f"{name}({hex(self.code)}): {description}")
+
+    def vm_status(self, function_name: str) -> str:
+        return f"Move abort in {MODULE_ID}: {self.status}"
+
+
+class _IndexedList:
+    """
+    与合约表索引布局相同的有序集合：条目按插入顺序占用连续下标，
+    删除时用最后一个条目填补空位。修改方法返回撤销函数
+    """
+
+    def __init__(self):
+        self.items: List[Any] = []
+        self.positions: Dict[Any, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __contains__(self, item: Any) -> bool:
+        return item in self.positions
+
+    def add(self, item: Any) -> Optional[Callable[[], None]]:
+        if item in self.positions:
+            return None
+        self.positions[item] = len(self.items)
+        self.items.append(item)
+
+        def undo():
+            self.items.pop()
+            del self.positions[item]
+        return undo
+
+    def remove(self, item: Any) -> Callable[[], None]:
+        position = self.positions.pop(item)
+        last = self.items.pop()
+        moved = position < len(self.items)
+        if moved:
+            self.items[position] = last
+            self.positions[last] = position
+
+        def undo():
+            if moved:
+                self.items.append(last)
+                self.positions[last] = len(self.items) - 1
+                self.items[position] = item
+            else:
+                self.items.append(item)
+            self.positions[item] = position
+        return undo
+
+    def page(self, start: int, limit: int) -> List[Any]:
+        size = min(limit, MAX_PAGE_SIZE)
+        return self.items[start:start + size] if start < len(self.items) else []
+
+
+class ContractState:
+    """
+    truepass 模块的链上状态与执行语义。
+
+    execute() 原子地执行 entry 函数：abort 时撤销本次执行的所有修改并抛出 ExecutionError。
+    白名单与键值数据按迁移后的表索引布局保存，迁移函数只负责创建索引。
+    状态/消息相关函数的 Move 源码不在本仓库中，按 ABI 推断：未初始化时 get_status
+    返回 false、get_message 返回空字符串，修改未初始化的状态视为 MISSING_DATA。
+    """
+
+    def __init__(self, deployer: str = CONTRACT_ADDRESS, number: int = 0):
+        self.deployer = _address(deployer)
+        # None 表示对应资源尚未创建
+        self.whitelist: Optional[_IndexedList] = None
+        self.keys: Optional[_IndexedList] = None
+        self.values: Dict[str, str] = {}
+        self.statuses: Dict[str, bool] = {}
+        self.messages: Dict[str, str] = {}
+        self.number = number
+        self._undo: List[Callable[[], None]] = []
+        self._events: List[Tuple[str, dict]] = []
+        self._changes: List[dict] = []
+        # 最近一次成功 execute() 的写集（节点 JSON 中交易 changes 字段的格式）
+        self.write_set: List[dict] = []
+
+    def execute(self, sender: str, function_name: str, args: Tuple[Any, ...]) -> List[Tuple[str, dict]]:
+        """执行 entry 函数并返回产生的事件 (类型, 数据)；失败时状态保持不变"""
+        handler = getattr(self, f"_entry_{function_name}", None)
+        if handler is None:
+            raise ExecutionError("FUNCTION_RESOLUTION_FAILURE")
+        self._undo, self._events, self._changes = [], [], []
+        try:
+            handler(_address(sender), *args)
+        except ExecutionError:
+            self.rollback()
+            raise
+        events, self.write_set = self._events, self._changes
+        self._undo, self._events, self._changes = [], [], []
+        return events
+
+    def rollback(self):
+        """撤销最近一次 execute() 的修改"""
+        while self._undo:
+            self._undo.pop()()
+        self._events, self._changes = [], []
+
+    def simulate(self, sender: str, function_name: str, args: Tuple[Any, ...]) -> List[Tuple[str, dict]]:
+        """执行后立即撤销，只返回事件（失败时抛出 ExecutionError）"""
+        handler = getattr(self, f"_entry_{function_name}", None)
+        if handler is None:
+            raise ExecutionError("FUNCTION_RESOLUTION_FAILURE")
+        self._undo, self._events, self._changes = [], [], []
+        try:
+            handler(_address(sender), *args)
+            return self._events
+        finally:
+            self.rollback()
+
+    def view(self, function_name: str, args: Tuple[Any, ...]) -> Any:
+        handler = getattr(self, f"_view_{function_name}", None)
+        if handler is None:
+            raise ExecutionError("FUNCTION_RESOLUTION_FAILURE")
+        return handler(*args)
+
+    def _record(self, undo: Optional[Callable[[], None]]):
+        if undo is not None:
+            self._undo.append(undo)
+
+    def _emit(self, event_type: str, data: dict):
+        self._events.append((event_type, data))
+
+    def _write_resource(self, addr: str, struct_name: str, data: dict):
+        """记录一次资源写入（白名单与键值数据存放在表中，只有状态/消息资源会进入写集）"""
+        resource_type = f"{MODULE_ID}::{struct_name}"
+        self._changes.append({
+            "type": "write_resource",
+            "address": addr,
+            "state_key_hash": "0x" + hashlib.sha3_256(f"{addr}/{resource_type}".encode()).hexdigest(),
+            "data": {"type": resource_type, "data": data},
+        })
+
+    def _require_deployer(self, sender: str):
+        if sender != self.deployer:
+            raise MoveAbort(PERMISSION_DENIED, EPERMISSION_DENIED)
+
+    def _require_whitelisted(self, sender: str):
+        if not self._view_is_whitelisted(sender):
+            raise MoveAbort(PERMISSION_DENIED, ENOT_WHITELISTED)
+
+    def _whitelist(self) -> _IndexedList:
+        if self.whitelist is None:
+            raise ExecutionError("MISSING_DATA")
+        return self.whitelist
+
+    def _database(self) -> _IndexedList:
+        if self.keys is None:
+            raise ExecutionError("MISSING_DATA")
+        return self.keys
+
+    def _create(self, attribute: str, allow_existing: bool = False):
+        if getattr(self, attribute) is not None:
+            if allow_existing:
+                return
+            raise ExecutionError("RESOURCE_ALREADY_EXISTS")
+        setattr(self, attribute, _IndexedList())
+        self._record(lambda: setattr(self, attribute, None))
+
+    # 白名单
+
+    def _entry_init_whitelist(self, sender: str):
+        self._require_deployer(sender)
+        self._create("whitelist")
+
+    def _entry_migrate_whitelist(self, sender: str, max_items: int):
+        self._require_deployer(sender)
+        self._create("whitelist", allow_existing=True)
+
+    def _entry_add_to_whitelist(self, sender: str, addr: str):
+        self._entry_batch_add_to_whitelist(sender, [addr])
+
+    def _entry_batch_add_to_whitelist(self, sender: str, addrs: List[str]):
+        self._require_deployer(sender)
+        whitelist = self._whitelist()
+        for addr in addrs:
+            self._record(whitelist.add(_address(addr)))
+
+    def _entry_remove_from_whitelist(self, sender: str, addr: str):
+        self._entry_batch_remove_from_whitelist(sender, [addr])
+
+    def _entry_batch_remove_from_whitelist(self, sender: str, addrs: List[str]):
+        self._require_deployer(sender)
+        whitelist = self._whitelist()
+        for addr in addrs:
+            addr = _address(addr)
+            if addr not in whitelist:
+                raise MoveAbort(NOT_FOUND, EKEY_NOT_FOUND)
+            self._record(whitelist.remove(addr))
+
+    def _view_is_whitelisted(self, addr: str) -> bool:
+        return self.whitelist is not None and _address(addr) in self.whitelist
+
+    def _view_get_whitelist(self) -> List[str]:
+        return [] if self.whitelist is None else list(self.whitelist.items)
+
+    def _view_get_whitelist_page(self, start: int, limit: int) -> Tuple[List[str], int]:
+        if self.whitelist is None:
+            return [], 0
+        return self.whitelist.page(start, limit), len(self.whitelist)
+
+    # 键值数据库
+
+    def _entry_init_database(self, sender: str):
+        self._require_deployer(sender)
+        self._create("keys")
+
+    def _entry_migrate_database(self, sender: str, max_items: int):
+        self._require_deployer(sender)
+        self._create("keys", allow_existing=True)
+
+    def _view_pending_migration(self) -> Tuple[int, int]:
+        return 0, 0
+
+    def _entry_set_key_value(self, sender: str, key: str, value: str):
+        self._entry_batch_set_key_value(sender, [key], [value])
+
+    def _entry_batch_set_key_value(self, sender: str, keys: List[str], values: List[str]):
+        self._require_whitelisted(sender)
+        if len(keys) != len(values):
+            raise MoveAbort(INVALID_ARGUMENT, ELENGTH_MISMATCH)
+        database = self._database()
+        for key, value in zip(keys, values):
+            old_value = self.values.get(key)
+            self._record(database.add(key))
+            self.values[key] = value
+            self._record(self._value_restorer(key, old_value))
+            self._emit(DATABASE_CHANGE_EVENT, {
+                "account": sender,
+                "key": key,
+                "old_value": old_value or "",
+                "new_value": value,
+            })
+
+    def _entry_delete_key(self, sender: str, key: str):
+        self._entry_batch_delete_key(sender, [key])
+
+    def _entry_batch_delete_key(self, sender: str, keys: List[str]):
+        self._require_whitelisted(sender)
+        database = self._database()
+        for key in keys:
+            if key not in database:
+                raise MoveAbort(NOT_FOUND, EKEY_NOT_FOUND)
+            old_value = self.values.pop(key)
+            self._record(database.remove(key))
+            self._record(self._value_restorer(key, old_value))
+            self._emit(KEY_DELETED_EVENT, {"account": sender, "key": key, "old_value": old_value})
+
+    def _value_restorer(self, key: str, old_value: Optional[str]) -> Callable[[], None]:
+        def undo():
+            if old_value is None:
+                self.values.pop(key, None)
+            else:
+                self.values[key] = old_value
+        return undo
+
+    def _view_get_key_value(self, key: str) -> str:
+        if key not in self.values:
+            raise MoveAbort(NOT_FOUND, EKEY_NOT_FOUND)
+        return self.values[key]
+
+    def _view_key_exists(self, key: str) -> bool:
+        return key in self.values
+
+    def _view_get_all_keys(self) -> List[str]:
+        return [] if self.keys is None else list(self.keys.items)
+
+    def _view_get_keys_page(self, start: int, limit: int) -> Tuple[List[str], int]:
+        if self.keys is None:
+            return [], 0
+        return self.keys.page(start, limit), len(self.keys)
+
+    def _view_get_entries_page(self, start: int, limit: int) -> Tuple[List[str], List[str], int]:
+        if self.keys is None:
+            return [], [], 0
+        keys = self.keys.page(start, limit)
+        return keys, [self.values[key] for key in keys], len(self.keys)
+
+    # 状态与消息
+
+    def _entry_init_status(self, sender: str):
+        if sender in self.statuses:
+            raise ExecutionError("RESOURCE_ALREADY_EXISTS")
+        self._set_status(sender, False)
+
+    def _entry_set_status_true(self, sender: str):
+        if sender not in self.statuses:
+            raise ExecutionError("MISSING_DATA")
+        self._set_status(sender, True)
+
+    def _entry_update_status(self, sender: str, target: str, status: bool):
+        target = _address(target)
+        if target not in self.statuses:
+            raise ExecutionError("MISSING_DATA")
+        self._set_status(target, status)
+
+    def _set_status(self, addr: str, status: bool):
+        missing = addr not in self.statuses
+        old_status = self.statuses.get(addr)
+        self.statuses[addr] = status
+
+        def undo():
+            if missing:
+                del self.statuses[addr]
+            else:
+                self.statuses[addr] = old_status
+        self._record(undo)
+        self._write_resource(addr, "AddressStatusHolder", {"status": status})
+
+    def _entry_set_message(self, sender: str, message: str):
+        old_message = self.messages.get(sender)
+        self.messages[sender] = message
+
+        def undo():
+            if old_message is None:
+                del self.messages[sender]
+            else:
+                self.messages[sender] = old_message
+        self._record(undo)
+        self._write_resource(sender, "MessageHolder", {"message": message})
+        if old_message is not None:
+            self._emit(MESSAGE_CHANGE_EVENT, {"account": sender, "from_message": old_message, "to_message": message})
+
+    def _view_get_status(self, addr: str) -> bool:
+        return self.statuses.get(_address(addr), False)
+
+    def _view_get_message(self, addr: str) -> str:
+        return self.messages.get(_address(addr), "")
+
+    def _view_get_number(self) -> int:
+        return self.number
+
+
+class EmulatedFullnode(StubFullnode):
+    """
+    执行 truepass 交易的节点替身。
+
+    提交的交易在 StubFullnode 的接口之上被真正解码和执行：校验链 ID 与序列号
+    （过旧的序列号被拒绝，超前的交易在内存池中等待空缺补齐），abort 的交易同样上链并
+    消耗序列号。view 按请求的账本版本执行（历史版本通过重放交易得到）。延迟、错误注入
+    与 commit_delay 沿用 StubConfig。
+    """
+
+    def __init__(
+        self,
+        config: Optional[StubConfig] = None,
+        state: Optional[ContractState] = None,
+        verify_signatures: bool = False,
+    ):
+        super().__init__(config)
+        self.state = state if state is not None else ContractState()
+        self.verify_signatures = verify_signatures
+        self.plans = CALL_PLANS
+        # 已上链交易的完整 JSON
+        self.committed: Dict[str, dict] = {}
+        # 内存池中等待前序交易的交易：发送者 -> {序列号: (交易哈希, 交易字节)}
+        self.parked: Dict[str, Dict[int, Tuple[str, bytes]]] = {}
+        self._parked_hashes: Dict[str, Tuple[str, int]] = {}
+        # 成功执行的交易日志（版本号, 发送者, 函数名, 参数），用于重建历史版本
+        self._log: List[Tuple[int, str, str, Tuple[Any, ...]]] = []
+        # 所有事件，按 (版本号, 事件序号) 排序
+        self.events: List[dict] = []
+        self._event_keys: List[Tuple[int, int]] = []
+        self._snapshot: Optional[Tuple[int, ContractState]] = None
+        # 版本 0 的状态副本，重放历史版本的起点
+        self._genesis = _copy_state(self.state.__dict__)
+
+    def transport(self) -> "EmulatorTransport":
+        return EmulatorTransport(self)
+
+    def client(self, **kwargs) -> TruePassClient:
+        """创建连接到本模拟器的 TruePassClient（不经过网络）"""
+        client = TruePassClient(
+            EMULATOR_URL, rest_client=EmulatorRestClient(self), http_transport=self.transport(), **kwargs
+        )
+        if client.confirmations is not None:
+            # 交易在提交时即执行，确认轮询按 commit_delay 的量级进行
+            client.confirmations.min_interval = max(self.config.commit_delay / 4, 0.001)
+        return client
+
+    def event_source(self, event_types: Sequence[str] = KV_EVENTS) -> "EmulatorEventSource":
+        return EmulatorEventSource(self, event_types)
+
+    def _handle_account(self, parts, body, query):
+        return super()._handle_account([parts[0], _address(parts[1])] + parts[2:], body, query)
+
+    def _handle_account_transactions(self, parts, body, query):
+        return super()._handle_account_transactions([parts[0], _address(parts[1])] + parts[2:], body, query)
+
+    def _handle_view(self, parts, body, query):
+        request = json.loads(body or b"{}")
+        function_name = request.get("function", "").rsplit("::", 1)[-1]
+        plan = self.plans.get(function_name)
+        if plan is None or not plan.is_view:
+            return 400, {"message": f"function {request.get('function')} is not a view function", "error_code": "invalid_input"}
+        try:
+            arguments = request.get("arguments", [])
+            if len(arguments) != len(plan.param_types):
+                raise CallError(f"{function_name} expects {len(plan.param_types)} argument(s)")
+            args = tuple(move_type.from_json(value) for move_type, value in zip(plan.param_types, arguments))
+        except (CallError, ValueError, TypeError) as e:
+            return 400, {"message": f"invalid arguments: {e}", "error_code": "invalid_input"}
+        state = self._state_at(query.get("ledger_version", [None])[0])
+        if state is None:
+            return 404, {"message": "ledger version not found", "error_code": "version_not_found"}
+        try:
+            result = state.view(function_name, args)
+        except ExecutionError as e:
+            return 400, {"message": e.vm_status(function_name), "error_code": "invalid_input"}
+        if len(plan.return_types) == 1:
+            result = (result,)
+        return 200, [move_type.to_json(value) for move_type, value in zip(plan.return_types, result)]
+
+    def _state_at(self, ledger_version: Optional[str]) -> Optional[ContractState]:
+        """指定账本版本上的状态（当前版本直接返回实时状态）"""
+        if ledger_version is None or int(ledger_version) == self.version:
+            return self.state
+        version = int(ledger_version)
+        if not 0 <= version < self.version:
+            return None
+        if self._snapshot is not None and self._snapshot[0] == version:
+            return self._snapshot[1]
+        state = ContractState()
+        state.__dict__.update(_copy_state(self._genesis))
+        for logged_version, sender, function_name, args in self._log:
+            if logged_version > version:
+                break
+            state.execute(sender, function_name, args)
+        self._snapshot = (version, state)
+        return state
+
+    def _decode(self, body: bytes) -> Tuple[SignedTransaction, str, Tuple[Any, ...]]:
+        signed = SignedTransaction.deserialize(Deserializer(body))
+        entry_function = signed.transaction.payload.value
+        module = getattr(entry_function, "module", None)
+        if module is None or _address(module.address) != _address(CONTRACT_ADDRESS) or module.name != MODULE_NAME:
+            raise CallError("the emulator only executes entry functions of the truepass module")
+        plan = self.plans.get(entry_function.function)
+        if plan is None or not plan.is_entry:
+            raise CallError(f"{entry_function.function} is not an entry function of {MODULE_NAME}")
+        return signed, entry_function.function, plan.decode_entry_args(entry_function.args)
+
+    def _handle_submit(self, parts, body, query):
+        try:
+            signed, function_name, args = self._decode(body)
+        except Exception as e:
+            return 400, {"message": f"invalid transaction: {e}", "error_code": "invalid_input"}
+        raw = signed.transaction
+        if raw.chain_id != CHAIN_ID:
+            return 400, _vm_error("BAD_CHAIN_ID")
+        if self.verify_signatures and not signed.verify():
+            return 400, _vm_error("INVALID_SIGNATURE")
+        sender = _address(raw.sender)
+        expected = self.sequence_numbers.get(sender, 0)
+        tx_hash = "0x" + hashlib.sha3_256(body).hexdigest()
+        if raw.sequence_number < expected:
+            return 400, _vm_error("SEQUENCE_NUMBER_TOO_OLD")
+        if raw.sequence_number > expected:
+            # 超前的交易留在内存池，等前面的序列号补齐后再执行
+            self.parked.setdefault(sender, {})[raw.sequence_number] = (tx_hash, body)
+            self._parked_hashes[tx_hash] = (sender, raw.sequence_number)
+            return 202, {"hash": tx_hash, "type": "pending_transaction"}
+        self._commit(sender, raw.sequence_number, tx_hash, body, function_name, args)
+        parked = self.parked.get(sender)
+        while parked and self.sequence_numbers[sender] in parked:
+            next_hash, next_body = parked.pop(self.sequence_numbers[sender])
+            del self._parked_hashes[next_hash]
+            _, next_function, next_args = self._decode(next_body)
+            self._commit(sender, self.sequence_numbers[sender], next_hash, next_body, next_function, next_args)
+        if parked is not None and not parked:
+            del self.parked[sender]
+        return 202, {"hash": tx_hash, "type": "pending_transaction"}
+
+    def _commit(self, sender: str, sequence_number: int, tx_hash: str, body: bytes, function_name: str, args: Tuple[Any, ...]):
+        self.version += 1
+        self.sequence_numbers[sender] = sequence_number + 1
+        try:
+            events = self.state.execute(sender, function_name, args)
+            changes = self.state.write_set
+            success, vm_status = True, "Executed successfully"
+            self._log.append((self.version, sender, function_name, args))
+        except ExecutionError as e:
+            events, changes, success, vm_status = [], [], False, e.vm_status(function_name)
+        gas_used = self.gas_used(body)
+        plan = self.plans[function_name]
+        transaction_events = []
+        for index, (event_type, data) in enumerate(events):
+            transaction_events.append({
+                "type": event_type,
+                "guid": {"creation_number": "0", "account_address": "0x0"},
+                "sequence_number": "0",
+                "data": data,
+            })
+            self.events.append(dict(data, type=event_type, version=self.version, event_index=index))
+            self._event_keys.append((self.version, index))
+        self._record_transaction(tx_hash, sender, sequence_number, gas_used)
+        self.committed[tx_hash] = {
+            "type": "user_transaction",
+            "hash": tx_hash,
+            "version": str(self.version),
+            "sender": sender,
+            "sequence_number": str(sequence_number),
+            "success": success,
+            "vm_status": vm_status,
+            "gas_used": str(gas_used),
+            "timestamp": str(int(time.time() * 1_000_000)),
+            "payload": {
+                "type": "entry_function_payload",
+                "function": f"{MODULE_ID}::{function_name}",
+                "type_arguments": [],
+                "arguments": [move_type.to_json(value) for move_type, value in zip(plan.param_types, args)],
+            },
+            "changes": changes,
+            "events": transaction_events,
+        }
+
+    def _committed(self, tx_hash: str) -> Optional[dict]:
+        if super()._committed(tx_hash) is None:
+            return None
+        return dict(self.committed[tx_hash])
+
+    def _handle_transaction(self, parts, body, query):
+        tx_hash = parts[-1]
+        if tx_hash in self._parked_hashes:
+            return 200, {"type": "pending_transaction", "hash": tx_hash}
+        return super()._handle_transaction(parts, body, query)
+
+    def _handle_simulate(self, parts, body, query):
+        try:
+            signed, function_name, args = self._decode(body)
+        except Exception as e:
+            return 400, {"message": f"invalid transaction: {e}", "error_code": "invalid_input"}
+        try:
+            self.state.simulate(str(signed.transaction.sender), function_name, args)
+            success, vm_status = True, "Executed successfully"
+        except ExecutionError as e:
+            success, vm_status = False, e.vm_status(function_name)
+        return 200, [{
+            "success": success,
+            "vm_status": vm_status,
+            "gas_used": str(self.gas_used(body)),
+            "gas_unit_price": "100",
+        }]
+
+
+def _vm_error(status: str) -> dict:
+    return {"message": f"Invalid transaction: Type: Validation Code: {status}", "error_code": "vm_error"}
+
+
+def _page_query(limit: Optional[int], start: Optional[int]) -> Dict[str, List[str]]:
+    query = {}
+    if limit is not None:
+        query["limit"] = [str(limit)]
+    if start is not None:
+        query["start"] = [str(start)]
+    return query
+
+
+def _copy_state(attributes: dict) -> dict:
+    """复制 ContractState 的属性（索引与字典逐层复制，不共享可变对象）"""
+    copied = {}
+    for name, value in attributes.items():
+        if isinstance(value, _IndexedList):
+            clone = _IndexedList()
+            clone.items = list(value.items)
+            clone.positions = dict(value.positions)
+            value = clone
+        elif isinstance(value, (dict, list)):
+            value = type(value)(value)
+        copied[name] = value
+    return copied
+
+
+class EmulatorTransport(httpx.AsyncBaseTransport):
+    """把 httpx 请求直接交给模拟节点处理"""
+
+    def __init__(self, node: EmulatedFullnode):
+        self.node = node
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        status, payload = await self.node._dispatch(
+            request.method, request.url.path, body, parse_qs(request.url.query.decode())
+        )
+        return httpx.Response(status, json=payload, request=request)
+
+
+class EmulatorRestClient(RestClient):
+    """
+    直接调用模拟节点的 RestClient。
+
+    常用接口（节点信息、账户、view、提交与查询交易）跳过 HTTP 与 JSON 编解码，
+    直接调用节点的请求处理；其余接口照常经由 httpx 会话（EmulatorTransport）。
+    """
+
+    def __init__(self, node: EmulatedFullnode):
+        super().__init__(EMULATOR_URL)
+        self.node = node
+
+    async def _call(self, method: str, path: str, body: bytes = b"", query: Optional[dict] = None) -> Any:
+        status, payload = await self.node._dispatch(method, f"/v1/{path}", body, query)
+        if status >= 400:
+            raise ApiError(json.dumps(payload), status)
+        return payload
+
+    async def info(self) -> Dict[str, str]:
+        return await self._call("GET", "")
+
+    async def account(self, account_address, ledger_version: Optional[int] = None) -> Dict[str, str]:
+        return await self._call("GET", f"accounts/{account_address}")
+
+    async def account_sequence_number(self, account_address, ledger_version: Optional[int] = None) -> int:
+        return int((await self.account(account_address))["sequence_number"])
+
+    async def view_function(self, function: str, type_arguments: List[str], arguments: List[Any], ledger_version: Optional[int] = None) -> List[Any]:
+        query = {} if ledger_version is None else {"ledger_version": [str(ledger_version)]}
+        body = json.dumps({"function": function, "type_arguments": type_arguments, "arguments": arguments})
+        return await self._call("POST", "view", body.encode(), query)
+
+    async def view(self, function: str, type_arguments: List[str], arguments: List[Any], ledger_version: Optional[int] = None) -> bytes:
+        return json.dumps(await self.view_function(function, type_arguments, arguments, ledger_version)).encode()
+
+    async def submit_bcs_transaction(self, signed_transaction: SignedTransaction) -> str:
+        return (await self._call("POST", "transactions", signed_transaction.bytes()))["hash"]
+
+    async def transaction_by_hash(self, txn_hash: str) -> Dict[str, Any]:
+        return await self._call("GET", f"transactions/by_hash/{txn_hash}")
+
+    async def transactions(self, limit: Optional[int] = None, start: Optional[int] = None) -> List[dict]:
+        return await self._call("GET", "transactions", query=_page_query(limit, start))
+
+    async def transactions_by_account(self, account_address, limit: Optional[int] = None, start: Optional[int] = None) -> List[dict]:
+        return await self._call("GET", f"accounts/{account_address}/transactions", query=_page_query(limit, start))
+
+    async def transaction_pending(self, txn_hash: str) -> bool:
+        try:
+            return (await self.transaction_by_hash(txn_hash))["type"] == "pending_transaction"
+        except ApiError as e:
+            if e.status_code == 404:
+                return True
+            raise
+
+    async def wait_for_transaction(self, txn_hash: str) -> None:
+        """与 RestClient 相同的语义，但按 commit_delay 的量级轮询而不是每秒一次"""
+        deadline = time.monotonic() + self.client_config.transaction_wait_in_seconds
+        interval = max(self.node.config.commit_delay / 4, 0.001)
+        while await self.transaction_pending(txn_hash):
+            assert time.monotonic() < deadline, f"transaction {txn_hash} timed out"
+            await asyncio.sleep(interval)
+        transaction = await self.transaction_by_hash(txn_hash)
+        assert transaction.get("success"), f"{json.dumps(transaction)} - {txn_hash}"
+
+
+class EmulatorEventSource:
+    """EventIndexer 的事件源：直接读取模拟节点的事件日志"""
+
+    def __init__(self, node: EmulatedFullnode, event_types: Sequence[str] = KV_EVENTS):
+        self.node = node
+        self.event_types = frozenset(event_types)
+
+    async def fetch(self, after: Tuple[int, int], limit: int) -> List[Dict[str, Any]]:
+        start = bisect.bisect_right(self.node._event_keys, tuple(after))
+        events = []
+        for event in self.node.events[start:]:
+            if len(events) >= limit:
+                break
+            if event["type"] in self.event_types:
+                events.append(dict(event))
+        return events
+
+    async def close(self):
+        pass
+
+
+async def _serve_forever(args):
+    state = ContractState(args.deployer) if args.deployer else None
+    node = EmulatedFullnode(StubConfig(args.latency_ms, commit_delay=args.commit_delay), state)
+    base_url = await node.start(args.host, args.port)
+    print(f"🚀 truepass emulator listening on {base_url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await node.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the in-memory truepass contract emulator over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--deployer", help="address allowed to call deployer-only functions (default: contract address)")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--commit-delay", type=float, default=0.0)
+    try:
+        asyncio.run(_serve_forever(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
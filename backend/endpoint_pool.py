@@ -0,0 +1,475 @@
+"""
+多全节点端点池
+按最近延迟与错误率为每个节点打分，把请求路由到当前最优节点；读请求在超过该节点
+p95 延迟后向另一节点发出对冲请求，写请求在节点故障时切换节点而不会重复上链
+"""
+
+import asyncio
+import hashlib
+import time
+from collections import deque
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional
+import httpx
+from aptos_sdk.client import ApiError, RestClient
+
+# 每个节点保留的最近延迟样本数（用于 p95）
+DEFAULT_LATENCY_WINDOW = 100
+# 延迟与错误率的指数滑动平均系数
+DEFAULT_EWMA_ALPHA = 0.2
+# 样本不足时的对冲等待时间（秒）
+DEFAULT_HEDGE_DELAY = 0.25
+# 连续失败多少次后暂停路由到该节点，以及暂停时长（秒，随连续失败次数翻倍）
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_COOLDOWN = 5.0
+MAX_COOLDOWN = 60.0
+# 错误率对得分的放大系数
+ERROR_PENALTY = 10.0
+# 计算对冲阈值所需的最少样本数
+MIN_HEDGE_SAMPLES = 20
+# 最多记住多少笔交易的接收节点（通过共享轮询器确认的交易不会从中移除）
+MAX_ACCEPTED_TRACKED = 10_000
+
+# 交易哈希前缀：sha3_256("APTOS::Transaction")，UserTransaction 变体为 0
+_TRANSACTION_PREFIX = hashlib.sha3_256(b"APTOS::Transaction").digest() + b"\x00"
+
+
+def transaction_hash(signed_transaction: bytes) -> str:
+    """根据 SignedTransaction 的 BCS 字节在本地计算交易哈希"""
+    return "0x" + hashlib.sha3_256(_TRANSACTION_PREFIX + signed_transaction).hexdigest()
+
+
+async def post_signed_transaction(rest_client: RestClient, signed_transaction: bytes) -> str:
+    """提交已签名交易的 BCS 字节，返回交易哈希"""
+    response = await rest_client.client.post(
+        f"{rest_client.base_url}/transactions",
+        headers={"Content-Type": "application/x.aptos.signed_transaction+bcs"},
+        content=signed_transaction,
+    )
+    if response.status_code >= 400:
+        raise ApiError(response.text, response.status_code)
+    return response.json()["hash"]
+
+
+async def post_view(
+    rest_client: RestClient,
+    function: str,
+    type_arguments: List[str],
+    arguments: List[Any],
+    ledger_version: Optional[int] = None,
+) -> List[Any]:
+    """调用 view 函数，指定 ledger_version 时在该账本版本上执行"""
+    params = {} if ledger_version is None else {"ledger_version": str(ledger_version)}
+    response = await rest_client.client.post(
+        f"{rest_client.base_url}/view",
+        params=params,
+        json={"function": function, "type_arguments": type_arguments, "arguments": arguments},
+    )
+    if response.status_code >= 400:
+        raise ApiError(response.text, response.status_code)
+    return response.json()
+
+
+@asynccontextmanager
+async def stream_view_response(
+    rest_client: RestClient,
+    function: str,
+    type_arguments: List[str],
+    arguments: List[Any],
+    ledger_version: Optional[int] = None,
+) -> AsyncIterator[httpx.Response]:
+    """流式调用 view 函数，产出已检查状态码、响应体尚未读取的响应"""
+    params = {} if ledger_version is None else {"ledger_version": str(ledger_version)}
+    async with rest_client.client.stream(
+        "POST",
+        f"{rest_client.base_url}/view",
+        params=params,
+        json={"function": function, "type_arguments": type_arguments, "arguments": arguments},
+    ) as response:
+        if response.status_code >= 400:
+            raise ApiError((await response.aread()).decode(errors="replace"), response.status_code)
+        yield response
+
+
+def is_node_failure(error: BaseException) -> bool:
+    """网络错误、5xx 与限流视为节点故障，可以换节点重试；其他错误是请求本身的问题"""
+    if isinstance(error, httpx.TransportError):
+        return True
+    if isinstance(error, ApiError):
+        status = getattr(error, "status_code", None)
+        return status is not None and (status >= 500 or status == 429)
+    return False
+
+
+def is_version_unavailable(error: BaseException) -> bool:
+    """节点还没有（或已裁剪）请求的账本版本：其他节点可能有，换节点重试而不计为故障"""
+    if not isinstance(error, ApiError) or getattr(error, "status_code", None) not in (404, 410):
+        return False
+    return "version_not_found" in str(error) or "version_pruned" in str(error)
+
+
+def is_pinned_read_retryable(error: BaseException) -> bool:
+    return is_node_failure(error) or is_version_unavailable(error)
+
+
+class Endpoint:
+    """单个全节点及其健康状态"""
+
+    def __init__(self, url: str, client: RestClient, window: int = DEFAULT_LATENCY_WINDOW):
+        self.url = url
+        self.client = client
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.samples = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        # 该节点报告过的最新账本版本
+        self.ledger_version: Optional[int] = None
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self.cooldown_until
+
+    def score(self) -> float:
+        """越小越好：平均延迟按错误率放大，并计入在途请求"""
+        latency = self.latency if self.latency is not None else 0.0
+        return (latency + 0.001 * self.in_flight) * (1 + ERROR_PENALTY * self.error_rate)
+
+    def p95(self) -> Optional[float]:
+        if len(self.samples) < MIN_HEDGE_SAMPLES:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def record_success(self, seconds: float, alpha: float = DEFAULT_EWMA_ALPHA):
+        self.requests += 1
+        self.samples.append(seconds)
+        self.latency = seconds if self.latency is None else self.latency + alpha * (seconds - self.latency)
+        self.error_rate -= alpha * self.error_rate
+        self.consecutive_failures = 0
+
+    def record_failure(
+        self,
+        alpha: float = DEFAULT_EWMA_ALPHA,
+        threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        cooldown: float = DEFAULT_COOLDOWN,
+    ):
+        self.requests += 1
+        self.failures += 1
+        self.error_rate += alpha * (1 - self.error_rate)
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= threshold:
+            backoff = cooldown * 2 ** (self.consecutive_failures - threshold)
+            self.cooldown_until = time.monotonic() + min(backoff, MAX_COOLDOWN)
+
+    def stats(self) -> dict:
+        return {
+            "latency_ms": round(self.latency * 1000, 3) if self.latency is not None else None,
+            "p95_ms": round(self.p95() * 1000, 3) if self.p95() is not None else None,
+            "error_rate": round(self.error_rate, 4),
+            "available": self.available,
+            "requests": self.requests,
+            "failures": self.failures,
+            "ledger_version": self.ledger_version,
+        }
+
+
+class EndpointPool:
+    """
+    可替代 RestClient 使用的多节点池。
+
+    只实现 TruePassClient、TransactionPipeline 与 GasEstimator 用到的方法：
+    幂等的读请求（含交易模拟）可对冲，submit_bcs_transaction 只在节点故障时
+    换节点重发同一笔已签名交易——相同的发送者和序列号最多上链一次，重发前还会
+    先按本地计算的哈希确认交易是否已被接收。
+    """
+
+    def __init__(
+        self,
+        urls: Iterable[str],
+        session: Optional[httpx.AsyncClient] = None,
+        hedge: bool = True,
+        hedge_delay: float = DEFAULT_HEDGE_DELAY,
+    ):
+        self.endpoints: List[Endpoint] = []
+        for url in urls:
+            client = RestClient(url)
+            if session is not None:
+                client.client = session
+            self.endpoints.append(Endpoint(url, client))
+        if not self.endpoints:
+            raise ValueError("EndpointPool needs at least one node URL")
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+        self.client_config = self.endpoints[0].client.client_config
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+        # 交易哈希 -> 接收该交易的节点，等待确认时优先查询它（其他节点可能尚未同步）
+        self._accepted_by: Dict[str, Endpoint] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self.endpoints[0].client.client
+
+    @client.setter
+    def client(self, session: httpx.AsyncClient):
+        for endpoint in self.endpoints:
+            endpoint.client.client = session
+
+    @property
+    def base_url(self) -> str:
+        return self.best().url
+
+    def ranked(self, exclude: Iterable[Endpoint] = ()) -> List[Endpoint]:
+        """按得分排序的候选节点；暂停中的节点排在最后，全部暂停时仍然可用"""
+        excluded = set(map(id, exclude))
+        candidates = [endpoint for endpoint in self.endpoints if id(endpoint) not in excluded]
+        return sorted(candidates, key=lambda endpoint: (not endpoint.available, endpoint.score()))
+
+    def best(self, exclude: Iterable[Endpoint] = ()) -> Optional[Endpoint]:
+        ranked = self.ranked(exclude)
+        return ranked[0] if ranked else None
+
+    def at_version(self, ledger_version: int) -> Optional[Endpoint]:
+        """已知同步到 ledger_version 的最优节点（例如提供该版本号的节点），没有时返回 None"""
+        for endpoint in self.ranked():
+            if endpoint.ledger_version is not None and endpoint.ledger_version >= ledger_version:
+                return endpoint
+        return None
+
+    def _endpoint_of(self, client: RestClient) -> Optional[Endpoint]:
+        for endpoint in self.endpoints:
+            if endpoint.client is client:
+                return endpoint
+        return None
+
+    async def _call(self, endpoint: Endpoint, call: Callable[[RestClient], Any]) -> Any:
+        endpoint.in_flight += 1
+        started = time.perf_counter()
+        try:
+            result = await call(endpoint.client)
+        except Exception as e:
+            if is_node_failure(e):
+                endpoint.record_failure()
+            else:
+                endpoint.record_success(time.perf_counter() - started)
+            raise
+        finally:
+            endpoint.in_flight -= 1
+        endpoint.record_success(time.perf_counter() - started)
+        return result
+
+    async def read(
+        self,
+        call: Callable[[RestClient], Any],
+        hedge: Optional[bool] = None,
+        prefer: Optional[Endpoint] = None,
+        retryable: Callable[[BaseException], bool] = is_node_failure,
+    ) -> Any:
+        """
+        在最优节点上执行幂等请求。
+
+        超过该节点 p95 延迟仍未返回时向次优节点发出一次对冲请求，先成功者胜出；
+        retryable 的错误（默认为节点故障）依次切换到其余节点，其他错误直接抛出。
+        """
+        hedge = self.hedge if hedge is None else hedge
+        primary = prefer if prefer is not None and prefer.available else self.best()
+        tried = [primary]
+        tasks = {asyncio.ensure_future(self._call(primary, call)): primary}
+        delay = (primary.p95() or self.hedge_delay) if hedge and len(self.endpoints) > 1 else None
+        last_error: Optional[BaseException] = None
+        hedged: Optional[Endpoint] = None
+        try:
+            while tasks:
+                done, _ = await asyncio.wait(tasks, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # 只对冲一次
+                    delay = None
+                    backup = self.best(tried)
+                    if backup is not None:
+                        self.hedges += 1
+                        hedged = backup
+                        tried.append(backup)
+                        tasks[asyncio.ensure_future(self._call(backup, call))] = backup
+                    continue
+                for task in done:
+                    endpoint = tasks.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        if endpoint is hedged:
+                            self.hedge_wins += 1
+                        return task.result()
+                    if not retryable(error):
+                        raise error
+                    last_error = error
+                if not tasks:
+                    backup = self.best(tried)
+                    if backup is not None:
+                        self.failovers += 1
+                        tried.append(backup)
+                        tasks[asyncio.ensure_future(self._call(backup, call))] = backup
+            raise last_error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _known(self, tx_hash: str) -> bool:
+        """交易是否已被任一节点接收"""
+        try:
+            await self.read(lambda client: client.transaction_by_hash(tx_hash), hedge=False)
+            return True
+        except Exception:
+            return False
+
+    async def submit_signed_bytes(self, signed_transaction: bytes) -> str:
+        """按得分顺序提交同一笔已签名交易，节点故障时换节点重发"""
+        tx_hash = transaction_hash(signed_transaction)
+        last_error: Optional[BaseException] = None
+        for attempt, endpoint in enumerate(self.ranked()):
+            if attempt:
+                self.failovers += 1
+            try:
+                tx_hash = await self._call(endpoint, lambda client: post_signed_transaction(client, signed_transaction))
+                self._accepted_by[tx_hash] = endpoint
+                if len(self._accepted_by) > MAX_ACCEPTED_TRACKED:
+                    del self._accepted_by[next(iter(self._accepted_by))]
+                return tx_hash
+            except Exception as e:
+                # 请求可能已经到达节点：若交易已被接收则直接返回，避免重复提交
+                if (attempt or is_node_failure(e)) and await self._known(tx_hash):
+                    return tx_hash
+                if not is_node_failure(e):
+                    raise
+                last_error = e
+        raise last_error
+
+    async def submit_bcs_transaction(self, signed_transaction) -> str:
+        return await self.submit_signed_bytes(signed_transaction.bytes())
+
+    async def wait_for_transaction(self, tx_hash: str):
+        return await self.read(
+            lambda client: client.wait_for_transaction(tx_hash),
+            hedge=False,
+            prefer=self._accepted_by.pop(tx_hash, None),
+        )
+
+    async def create_bcs_transaction(self, sender, payload, sequence_number: Optional[int] = None):
+        return await self.read(
+            lambda client: client.create_bcs_transaction(sender, payload, sequence_number), hedge=False
+        )
+
+    async def view_function(self, function: str, type_arguments: List[str], arguments: List[Any]):
+        return await self.read(lambda client: client.view_function(function, type_arguments, arguments))
+
+    async def view_at(self, function: str, type_arguments: List[str], arguments: List[Any], ledger_version: int):
+        """在固定账本版本上执行 view：优先发往已同步到该版本的节点，落后的节点换节点重试"""
+        return await self.read(
+            lambda client: post_view(client, function, type_arguments, arguments, ledger_version),
+            prefer=self.at_version(ledger_version),
+            retryable=is_pinned_read_retryable,
+        )
+
+    @asynccontextmanager
+    async def stream_view(
+        self,
+        function: str,
+        type_arguments: List[str],
+        arguments: List[Any],
+        ledger_version: Optional[int] = None,
+    ) -> AsyncIterator[httpx.Response]:
+        """
+        在最优节点（固定版本时优先已同步到该版本的节点）上流式调用 view。
+        拿到响应前的节点故障（固定版本时还包括版本不可用）依次换节点重试；响应体只能
+        消费一次，因此不对冲，开始读取后的错误直接抛出
+        """
+        retryable = is_node_failure if ledger_version is None else is_pinned_read_retryable
+        candidates = self.ranked()
+        prefer = None if ledger_version is None else self.at_version(ledger_version)
+        if prefer is not None and prefer.available:
+            candidates.remove(prefer)
+            candidates.insert(0, prefer)
+        last_error: Optional[BaseException] = None
+        for attempt, endpoint in enumerate(candidates):
+            if attempt:
+                self.failovers += 1
+            stack = AsyncExitStack()
+            endpoint.in_flight += 1
+            started = time.perf_counter()
+            try:
+                response = await stack.enter_async_context(
+                    stream_view_response(endpoint.client, function, type_arguments, arguments, ledger_version)
+                )
+            except Exception as e:
+                endpoint.in_flight -= 1
+                await stack.aclose()
+                if is_node_failure(e):
+                    endpoint.record_failure()
+                else:
+                    endpoint.record_success(time.perf_counter() - started)
+                if not retryable(e):
+                    raise
+                last_error = e
+                continue
+            try:
+                async with stack:
+                    yield response
+            except Exception as e:
+                if is_node_failure(e):
+                    endpoint.record_failure()
+                else:
+                    endpoint.record_success(time.perf_counter() - started)
+                raise
+            else:
+                endpoint.record_success(time.perf_counter() - started)
+            finally:
+                endpoint.in_flight -= 1
+            return
+        raise last_error
+
+    async def info(self):
+        async def call(client: RestClient):
+            info = await client.info()
+            # 记录各节点的账本版本，固定版本的读取据此选择节点
+            endpoint = self._endpoint_of(client)
+            version = int(info["ledger_version"])
+            if endpoint is not None and (endpoint.ledger_version is None or version > endpoint.ledger_version):
+                endpoint.ledger_version = version
+            return info
+        return await self.read(call)
+
+    async def account(self, address, ledger_version: Optional[int] = None):
+        return await self.read(lambda client: client.account(address, ledger_version))
+
+    async def account_sequence_number(self, address, ledger_version: Optional[int] = None) -> int:
+        return await self.read(lambda client: client.account_sequence_number(address, ledger_version))
+
+    async def chain_id(self) -> int:
+        return await self.read(lambda client: client.chain_id())
+
+    async def transaction_by_hash(self, tx_hash: str):
+        return await self.read(lambda client: client.transaction_by_hash(tx_hash))
+
+    async def transactions(self, limit: Optional[int] = None, start: Optional[int] = None):
+        return await self.read(lambda client: client.transactions(limit, start), hedge=False)
+
+    async def transactions_by_account(self, account_address, limit: Optional[int] = None, start: Optional[int] = None):
+        return await self.read(
+            lambda client: client.transactions_by_account(account_address, limit, start), hedge=False
+        )
+
+    async def simulate_transaction(self, transaction, sender, estimate_gas_usage: bool = False):
+        return await self.read(
+            lambda client: client.simulate_transaction(transaction, sender, estimate_gas_usage)
+        )
+
+    def stats(self) -> dict:
+        return {
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "failovers": self.failovers,
+            "endpoints": {endpoint.url: endpoint.stats() for endpoint in self.endpoints},
+        }
@@ -0,0 +1,289 @@
+"""
+键值事件索引器
+从保存的游标处持续拉取 truepass 的 DatabaseChange / KeyDeleted 事件，写入本地 SQLite，
+在本地提供键查询、前缀扫描和修改历史
+"""
+
+import asyncio
+import sqlite3
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import httpx
+from abi import CONTRACT_ADDRESS, MODULE_NAME
+
+DEFAULT_INDEXER_URL = "https://api.testnet.aptoslabs.com/v1/graphql"
+DATABASE_CHANGE_EVENT = f"{CONTRACT_ADDRESS}::{MODULE_NAME}::DatabaseChange"
+KEY_DELETED_EVENT = f"{CONTRACT_ADDRESS}::{MODULE_NAME}::KeyDeleted"
+# 索引器消费的事件类型
+KV_EVENTS = (DATABASE_CHANGE_EVENT, KEY_DELETED_EVENT)
+
+# 每页拉取的事件数与追尾模式的轮询间隔（秒）
+DEFAULT_PAGE_SIZE = 500
+DEFAULT_POLL_INTERVAL = 2.0
+
+_EVENTS_QUERY = """
+query DatabaseChanges($types: [String!]!, $version: bigint!, $index: bigint!, $limit: Int!) {
+  events(
+    where: {
+      indexed_type: {_in: $types}
+      _or: [
+        {transaction_version: {_gt: $version}}
+        {transaction_version: {_eq: $version}, event_index: {_gt: $index}}
+      ]
+    }
+    order_by: [{transaction_version: asc}, {event_index: asc}]
+    limit: $limit
+  ) {
+    transaction_version
+    event_index
+    indexed_type
+    data
+  }
+}
+"""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    account TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS kv_history (
+    version INTEGER NOT NULL,
+    event_index INTEGER NOT NULL,
+    account TEXT NOT NULL,
+    key TEXT NOT NULL,
+    old_value TEXT NOT NULL,
+    new_value TEXT NOT NULL,
+    deleted INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (version, event_index)
+);
+CREATE INDEX IF NOT EXISTS kv_history_key ON kv_history (key, version);
+CREATE INDEX IF NOT EXISTS kv_history_account ON kv_history (account, version);
+CREATE TABLE IF NOT EXISTS cursor (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    version INTEGER NOT NULL,
+    event_index INTEGER NOT NULL
+);
+"""
+
+
+class IndexerEventSource:
+    """通过 Aptos Indexer GraphQL API 按 (version, event_index) 顺序分页读取事件"""
+
+    def __init__(
+        self,
+        indexer_url: str = DEFAULT_INDEXER_URL,
+        event_types: Sequence[str] = KV_EVENTS,
+        session: Optional[httpx.AsyncClient] = None,
+    ):
+        self.indexer_url = indexer_url
+        self.event_types = list(event_types)
+        self._owns_session = session is None
+        self.session = session if session is not None else httpx.AsyncClient(timeout=30.0)
+
+    async def fetch(self, after: Tuple[int, int], limit: int) -> List[Dict[str, Any]]:
+        """返回游标之后的最多 limit 个事件，每个事件包含 type、version、event_index 与事件字段"""
+        version, index = after
+        response = await self.session.post(
+            self.indexer_url,
+            json={
+                "query": _EVENTS_QUERY,
+                "variables": {
+                    "types": self.event_types,
+                    "version": version,
+                    "index": index,
+                    "limit": limit,
+                },
+            },
+        )
+        response.raise_for_status()
+        body = response.json()
+        if body.get("errors"):
+            raise RuntimeError(f"indexer query failed: {body['errors']}")
+        return [
+            dict(
+                event["data"],
+                type=event["indexed_type"],
+                version=int(event["transaction_version"]),
+                event_index=int(event["event_index"]),
+            )
+            for event in body["data"]["events"]
+        ]
+
+    async def close(self):
+        if self._owns_session:
+            await self.session.aclose()
+
+
+def _prefix_upper_bound(prefix: str) -> Optional[str]:
+    """
+    前缀扫描的上界：最后一个字符加一（全部为最大码点时没有上界）。
+    跳过代理区 U+D800–U+DFFF：单独的代理字符无法编码为 UTF-8，sqlite3 会拒绝
+    """
+    while prefix and prefix[-1] == chr(0x10FFFF):
+        prefix = prefix[:-1]
+    if not prefix:
+        return None
+    code = ord(prefix[-1]) + 1
+    if 0xD800 <= code <= 0xDFFF:
+        code = 0xE000
+    return prefix[:-1] + chr(code)
+
+
+class EventIndexer:
+    """
+    把 DatabaseChange / KeyDeleted 事件镜像到本地 SQLite。
+
+    每页事件与游标在同一个 SQLite 事务中提交，重启后从游标继续；重复应用同一事件
+    是幂等的。删除只由 KeyDeleted 事件表示，把键设为空字符串的 DatabaseChange 仍是
+    写入。合约加入 KeyDeleted 之前，delete_key 发出的是 new_value 为空的 DatabaseChange：
+    legacy_deletes_before 设为升级交易的版本时，早于该版本的这类事件按删除处理。
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        source: Optional[IndexerEventSource] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        legacy_deletes_before: Optional[int] = None,
+    ):
+        self.db_path = db_path
+        self.source = source if source is not None else IndexerEventSource()
+        self.page_size = page_size
+        self.legacy_deletes_before = legacy_deletes_before
+        self.db = sqlite3.connect(db_path)
+        self.db.executescript(_SCHEMA)
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(kv_history)")}
+        if "deleted" not in columns:
+            # 旧版本创建的数据库：补上删除标记列（当时空值即删除）
+            self.db.execute("ALTER TABLE kv_history ADD COLUMN deleted INTEGER NOT NULL DEFAULT 0")
+            self.db.execute("UPDATE kv_history SET deleted = 1 WHERE new_value = ''")
+        self.db.execute("INSERT OR IGNORE INTO cursor (id, version, event_index) VALUES (0, -1, -1)")
+        self.db.commit()
+
+    @property
+    def cursor(self) -> Tuple[int, int]:
+        """已应用的最后一个事件的 (version, event_index)，尚未同步时为 (-1, -1)"""
+        return tuple(self.db.execute("SELECT version, event_index FROM cursor WHERE id = 0").fetchone())
+
+    def is_delete(self, event: Dict[str, Any]) -> bool:
+        if event.get("type") == KEY_DELETED_EVENT:
+            return True
+        return (
+            self.legacy_deletes_before is not None
+            and event["version"] < self.legacy_deletes_before
+            and event.get("new_value") == ""
+        )
+
+    def apply(self, events: List[Dict[str, Any]]):
+        """应用一页已按顺序排列的事件并推进游标"""
+        if not events:
+            return
+        with self.db:
+            for event in events:
+                deleted = self.is_delete(event)
+                inserted = self.db.execute(
+                    "INSERT OR IGNORE INTO kv_history "
+                    "(version, event_index, account, key, old_value, new_value, deleted) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        event["version"],
+                        event["event_index"],
+                        event["account"],
+                        event["key"],
+                        event["old_value"],
+                        "" if deleted else event["new_value"],
+                        int(deleted),
+                    ),
+                ).rowcount
+                if not inserted:
+                    continue
+                if deleted:
+                    self.db.execute(
+                        "DELETE FROM kv WHERE key = ? AND version <= ?",
+                        (event["key"], event["version"]),
+                    )
+                else:
+                    self.db.execute(
+                        "INSERT INTO kv (key, value, version, account) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT (key) DO UPDATE SET value = excluded.value, "
+                        "version = excluded.version, account = excluded.account "
+                        "WHERE excluded.version >= kv.version",
+                        (event["key"], event["new_value"], event["version"], event["account"]),
+                    )
+            last = events[-1]
+            self.db.execute(
+                "UPDATE cursor SET version = ?, event_index = ? WHERE id = 0",
+                (last["version"], last["event_index"]),
+            )
+
+    async def sync(self, max_pages: Optional[int] = None) -> int:
+        """分页追赶到最新事件，返回本次应用的事件数"""
+        applied = 0
+        pages = 0
+        while max_pages is None or pages < max_pages:
+            events = await self.source.fetch(self.cursor, self.page_size)
+            self.apply(events)
+            applied += len(events)
+            pages += 1
+            if len(events) < self.page_size:
+                break
+        return applied
+
+    async def run(self, poll_interval: float = DEFAULT_POLL_INTERVAL):
+        """持续追尾新事件，直到任务被取消"""
+        while True:
+            try:
+                await self.sync()
+            except Exception as e:
+                print(f"❌ Error syncing events: {e}")
+            await asyncio.sleep(poll_interval)
+
+    def get(self, key: str) -> Optional[str]:
+        row = self.db.execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def scan_prefix(self, prefix: str, limit: Optional[int] = None) -> List[Tuple[str, str]]:
+        """按键排序返回以 prefix 开头的键值对"""
+        upper = _prefix_upper_bound(prefix)
+        sql = "SELECT key, value FROM kv WHERE key >= ?"
+        params: list = [prefix]
+        if upper is not None:
+            sql += " AND key < ?"
+            params.append(upper)
+        sql += " ORDER BY key"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self.db.execute(sql, params).fetchall()
+
+    def history(
+        self,
+        key: Optional[str] = None,
+        account: Optional[str] = None,
+        since_version: Optional[int] = None,
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+        """查询修改历史（谁在哪个版本把什么改成了什么，deleted 表示删除），按版本倒序"""
+        clauses, params = [], []
+        if key is not None:
+            clauses.append("key = ?")
+            params.append(key)
+        if account is not None:
+            clauses.append("account = ?")
+            params.append(account)
+        if since_version is not None:
+            clauses.append("version >= ?")
+            params.append(since_version)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self.db.execute(
+            "SELECT version, event_index, account, key, old_value, new_value, deleted FROM kv_history "
+            f"{where} ORDER BY version DESC, event_index DESC LIMIT ?",
+            params + [limit],
+        ).fetchall()
+        columns = ("version", "event_index", "account", "key", "old_value", "new_value", "deleted")
+        return [dict(zip(columns, row), deleted=bool(row[6])) for row in rows]
+
+    async def close(self):
+        await self.source.close()
+        self.db.close()
@@ -0,0 +1,160 @@
+"""
+Gas 估算
+提交前通过模拟交易估算 gas 用量，按 (entry 函数, 参数大小档位) 缓存估算结果，
+加上安全余量作为 max_gas_amount；模拟或链上结果偏离估算时自动刷新
+"""
+
+import asyncio
+import math
+import time
+from typing import Dict, Optional, Tuple
+from aptos_sdk.account import Account
+from aptos_sdk.transactions import RawTransaction, TransactionPayload
+
+DEFAULT_GAS_MARGIN = 0.2
+DEFAULT_MIN_GAS = 20
+DEFAULT_DRIFT_TOLERANCE = 0.25
+DEFAULT_ESTIMATE_TTL = 600.0
+# 每个缓存项每确认多少笔交易抽查一次链上 gas 用量
+DEFAULT_VERIFY_EVERY = 8
+
+
+class GasEstimate:
+    __slots__ = ("gas_units", "gas_unit_price", "created_at", "confirmations")
+
+    def __init__(self, gas_units: int, gas_unit_price: int):
+        self.gas_units = gas_units
+        self.gas_unit_price = gas_unit_price
+        self.created_at = time.monotonic()
+        self.confirmations = 0
+
+
+class GasEstimator:
+    """按函数与参数大小档位缓存的 gas 估算器"""
+
+    def __init__(
+        self,
+        margin: float = DEFAULT_GAS_MARGIN,
+        min_gas: int = DEFAULT_MIN_GAS,
+        drift_tolerance: float = DEFAULT_DRIFT_TOLERANCE,
+        ttl: Optional[float] = DEFAULT_ESTIMATE_TTL,
+        verify_every: int = DEFAULT_VERIFY_EVERY,
+    ):
+        self.margin = margin
+        self.min_gas = min_gas
+        self.drift_tolerance = drift_tolerance
+        self.ttl = ttl
+        self.verify_every = verify_every
+        self._estimates: Dict[Tuple[str, int], GasEstimate] = {}
+        # 进行中的模拟：同一档位的并发未命中共享一次模拟
+        self._simulating: Dict[Tuple[str, int], asyncio.Future] = {}
+        self.hits = 0
+        self.simulations = 0
+        self.failures = 0
+        self.refreshes = 0
+
+    @staticmethod
+    def key(payload: TransactionPayload) -> Tuple[str, int]:
+        """(函数名, 参数总字节数的二进制位数)，同一档位内参数大小相差不超过一倍"""
+        entry_function = payload.value
+        size = sum(len(arg) for arg in entry_function.args)
+        return (entry_function.function, size.bit_length())
+
+    def max_gas_amount(self, estimate: GasEstimate) -> int:
+        return max(self.min_gas, math.ceil(estimate.gas_units * (1 + self.margin)))
+
+    def cached(self, payload: TransactionPayload) -> Optional[GasEstimate]:
+        key = self.key(payload)
+        estimate = self._estimates.get(key)
+        if estimate is not None and self.ttl and time.monotonic() - estimate.created_at > self.ttl:
+            del self._estimates[key]
+            self.refreshes += 1
+            return None
+        return estimate
+
+    async def estimate(self, rest_client, account: Account, payload: TransactionPayload) -> Optional[GasEstimate]:
+        """
+        返回缓存的估算，未命中时模拟一次（同一档位的并发未命中共享这次模拟）；
+        模拟失败或请求出错时返回 None（使用默认 gas 设置）
+        """
+        estimate = self.cached(payload)
+        if estimate is not None:
+            self.hits += 1
+            return estimate
+        key = self.key(payload)
+        simulation = self._simulating.get(key)
+        if simulation is None:
+            simulation = asyncio.ensure_future(self.simulate(rest_client, account, payload))
+            self._simulating[key] = simulation
+            simulation.add_done_callback(lambda done: self._simulating.pop(key, None))
+        return await asyncio.shield(simulation)
+
+    async def simulate(self, rest_client, account: Account, payload: TransactionPayload) -> Optional[GasEstimate]:
+        """模拟一次交易并更新缓存；模拟失败或请求出错时返回 None，不影响交易本身的提交"""
+        self.simulations += 1
+        try:
+            # 模拟必须使用账户当前的链上序列号，流水线中的后续序列号会被拒绝。
+            # max_gas_amount 沿用客户端配置：模拟时更高的上限可能超出账户余额而被拒绝
+            sequence_number = await rest_client.account_sequence_number(account.address())
+            raw_transaction = await rest_client.create_bcs_transaction(account, payload, sequence_number)
+            result = (await rest_client.simulate_transaction(raw_transaction, account, estimate_gas_usage=True))[0]
+        except Exception:
+            self.failures += 1
+            return None
+        if not result.get("success"):
+            self.failures += 1
+            return None
+        simulated = GasEstimate(int(result["gas_used"]), int(result["gas_unit_price"]))
+        key = self.key(payload)
+        previous = self._estimates.get(key)
+        if previous is not None and self._drifted(previous.gas_units, simulated.gas_units):
+            self.refreshes += 1
+        self._estimates[key] = simulated
+        return simulated
+
+    def apply(self, raw_transaction: RawTransaction, estimate: Optional[GasEstimate]) -> RawTransaction:
+        """把估算写入原始交易的 max_gas_amount 与 gas_unit_price"""
+        if estimate is not None:
+            raw_transaction.max_gas_amount = self.max_gas_amount(estimate)
+            raw_transaction.gas_unit_price = estimate.gas_unit_price
+        return raw_transaction
+
+    def _drifted(self, estimated: int, observed: int) -> bool:
+        return estimated > 0 and abs(observed - estimated) / estimated > self.drift_tolerance
+
+    def forget(self, payload: TransactionPayload):
+        """交易失败（例如 gas 不足）后丢弃估算，下次重新模拟"""
+        if self._estimates.pop(self.key(payload), None) is not None:
+            self.refreshes += 1
+
+    async def after_commit(
+        self, rest_client, payload: TransactionPayload, tx_hash: str, gas_used: Optional[int] = None
+    ):
+        """
+        按抽查频率比对链上 gas 用量，偏离超过容差时丢弃估算（抽查失败不影响交易结果）。
+        已知 gas_used（例如来自确认轮询结果）时每笔都比对，不再额外查询。
+        """
+        key = self.key(payload)
+        estimate = self._estimates.get(key)
+        if estimate is None:
+            return
+        estimate.confirmations += 1
+        if gas_used is None:
+            if estimate.confirmations % self.verify_every:
+                return
+            try:
+                transaction = await rest_client.transaction_by_hash(tx_hash)
+            except Exception:
+                return
+            gas_used = int(transaction.get("gas_used", 0))
+        if self._drifted(estimate.gas_units, gas_used):
+            self.forget(payload)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._estimates),
+            "hits": self.hits,
+            "simulations": self.simulations,
+            "failures": self.failures,
+            "refreshes": self.refreshes,
+        }
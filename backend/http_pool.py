@@ -0,0 +1,124 @@
+"""
+HTTP 连接池
+封装一个 httpx.AsyncClient，可以被多个 TruePassClient（例如每个签名账户一个）共享
+"""
+
+import importlib.util
+import sys
+from typing import Any, Optional
+import httpx
+
+# 默认连接池参数
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+DEFAULT_TIMEOUT = 60.0
+
+
+class HttpPool:
+    """
+    共享的 HTTP 会话。
+
+    自己创建的池由创建者负责关闭；TruePassClient 只关闭它自己创建的池，
+    传入的共享池不会被客户端关闭。
+    """
+
+    def __init__(
+        self,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: Optional[float] = DEFAULT_KEEPALIVE_EXPIRY,
+        http2: bool = True,
+        timeout: float = DEFAULT_TIMEOUT,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        # 自定义传输层（如进程内的合约模拟器）不经过网络，不需要 HTTP/2
+        if transport is not None:
+            http2 = False
+        if http2 and importlib.util.find_spec("h2") is None:
+            # HTTP/2 需要可选依赖 h2（pip install httpx[http2]）
+            print("⚠️  h2 is not installed, falling back to HTTP/1.1", file=sys.stderr)
+            http2 = False
+        self.http2 = http2
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        # 不设置连接池等待超时：并发请求排队等待空闲连接
+        self.session = httpx.AsyncClient(
+            http2=http2,
+            limits=self.limits,
+            timeout=httpx.Timeout(timeout, pool=None),
+            transport=transport,
+        )
+
+    def attach(self, rest_client: Any) -> Optional[httpx.AsyncClient]:
+        """
+        让 rest_client 的请求经由本池发出。SDK 在原会话上设置的请求头（x-aptos-client，
+        配置了 api_key 时的 Authorization）保留在该客户端自己的 ClientSession 上，
+        不写入共享会话；返回被替换的原会话，由调用方负责关闭
+        """
+        previous = getattr(rest_client, "client", None)
+        if isinstance(previous, ClientSession) and previous.session is self.session:
+            return None
+        headers = {}
+        if isinstance(previous, (httpx.AsyncClient, ClientSession)):
+            headers = {name: value for name, value in previous.headers.items() if self.session.headers.get(name) != value}
+        rest_client.client = ClientSession(self.session, headers)
+        return previous if isinstance(previous, httpx.AsyncClient) and previous is not self.session else None
+
+    @property
+    def closed(self) -> bool:
+        return self.session.is_closed
+
+    async def close(self):
+        if not self.session.is_closed:
+            await self.session.aclose()
+
+    async def __aenter__(self) -> "HttpPool":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+
+class ClientSession:
+    """
+    共享会话上单个客户端的视图。
+
+    请求经由共享会话（及其连接池）发出，并附带该客户端自己的请求头；多个客户端
+    使用不同的 Authorization 时互不覆盖。aclose() 不关闭共享会话（由 HttpPool 负责）。
+    """
+
+    def __init__(self, session: httpx.AsyncClient, headers: Optional[dict] = None):
+        self.session = session
+        self.headers = httpx.Headers(headers)
+
+    def _headers(self, headers) -> httpx.Headers:
+        merged = httpx.Headers(self.headers)
+        if headers:
+            merged.update(headers)
+        return merged
+
+    async def request(self, method: str, url, *, headers=None, **kwargs) -> httpx.Response:
+        return await self.session.request(method, url, headers=self._headers(headers), **kwargs)
+
+    async def get(self, url, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    def stream(self, method: str, url, *, headers=None, **kwargs):
+        return self.session.stream(method, url, headers=self._headers(headers), **kwargs)
+
+    @property
+    def is_closed(self) -> bool:
+        return self.session.is_closed
+
+    async def aclose(self):
+        pass
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.session, name)
@@ -0,0 +1,191 @@
+"""
+键值写入合并
+在一个时间窗口（或攒满一定数量的键）内缓冲 set_key_value / delete_key 写入，
+同一个键只保留净变化，窗口结束后以批量交易提交
+"""
+
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+# 默认的合并窗口（秒）与单次刷新最多包含的键数
+DEFAULT_COALESCE_WINDOW = 0.05
+DEFAULT_MAX_PENDING_KEYS = 256
+
+SET_FUNCTION = "set_key_value"
+DELETE_FUNCTION = "delete_key"
+BATCH_SET_FUNCTION = "batch_set_key_value"
+BATCH_DELETE_FUNCTION = "batch_delete_key"
+
+
+class _PendingWrite:
+    """一个键在窗口内的净写入：value 为 None 表示最后一次写入是删除"""
+
+    __slots__ = ("value", "written", "futures")
+
+    def __init__(self):
+        self.value: Optional[str] = None
+        # 窗口内最近一次 set 的值（没有 set 时为 None）
+        self.written: Optional[str] = None
+        self.futures: List[asyncio.Future] = []
+
+
+class KeyValueWriter:
+    """
+    单个账户的键值写入合并器。
+
+    set() / delete() 立即返回一个 Future，在覆盖这次写入的交易确认后解析为
+    交易哈希；被同一窗口内后续写入覆盖的调用共享后者的交易，交易失败时所有
+    相关 Future 都会抛出同一个异常。
+
+    每次刷新最后一次写入为 set 的键合并为一笔 batch_set_key_value；窗口内先 set
+    后 delete 的键也写入这笔交易，再由一笔 batch_delete_key 删除，因此无论键在窗口
+    之前是否存在，结果都与逐条提交一致。窗口内只有删除的键可能本来就不存在（删除会
+    中止），逐个提交 delete_key，失败只影响该键。交易经账户流水线按刷新顺序提交。
+    """
+
+    def __init__(
+        self,
+        client,
+        account,
+        window: float = DEFAULT_COALESCE_WINDOW,
+        max_pending_keys: int = DEFAULT_MAX_PENDING_KEYS,
+    ):
+        if max_pending_keys < 1:
+            raise ValueError("max_pending_keys must be >= 1")
+        self.client = client
+        self.account = account
+        self.window = window
+        self.max_pending_keys = max_pending_keys
+        self._pending: Dict[str, _PendingWrite] = {}
+        self._flush_lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+        self._in_flight: set = set()
+        self.writes = 0
+        self.coalesced = 0
+        self.transactions = 0
+        self.flushes = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def set(self, key: str, value: str) -> asyncio.Future:
+        """写入键值，返回确认 Future"""
+        return await self._write(key, value)
+
+    async def delete(self, key: str) -> asyncio.Future:
+        """删除键，返回确认 Future"""
+        return await self._write(key, None)
+
+    async def _write(self, key: str, value: Optional[str]) -> asyncio.Future:
+        if not isinstance(key, str):
+            raise TypeError(f"key must be str, got {type(key).__name__}")
+        future = asyncio.get_running_loop().create_future()
+        self.writes += 1
+        write = self._pending.pop(key, None)
+        if write is None:
+            write = _PendingWrite()
+        else:
+            self.coalesced += 1
+        write.value = value
+        if value is not None:
+            write.written = value
+        write.futures.append(future)
+        # 移到末尾，使刷新顺序与最后一次写入的顺序一致
+        self._pending[key] = write
+        if len(self._pending) >= self.max_pending_keys:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.ensure_future(self._flush_later())
+        return future
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.window)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self):
+        """立即提交所有缓冲的写入（不等待确认）"""
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+            self._timer = None
+        async with self._flush_lock:
+            pending, self._pending = self._pending, {}
+            if not pending:
+                return
+            self.flushes += 1
+            # 先 set 后 delete 的键：先随 set 批量写入，保证随后的删除不会因键不存在而中止
+            recreated = [key for key, write in pending.items() if write.value is None and write.written is not None]
+            written = [(key, write.written if write.value is None else write.value)
+                       for key, write in pending.items() if write.written is not None]
+            set_confirmation = None
+            if written:
+                keys, values = [key for key, _ in written], [value for _, value in written]
+                if len(keys) == 1:
+                    set_confirmation = await self._submit(SET_FUNCTION, keys[0], values[0])
+                else:
+                    set_confirmation = await self._submit(BATCH_SET_FUNCTION, keys, values)
+                self._settle([write for write in pending.values() if write.value is not None], [set_confirmation])
+            if recreated:
+                if len(recreated) == 1:
+                    delete_confirmation = await self._submit(DELETE_FUNCTION, recreated[0])
+                else:
+                    delete_confirmation = await self._submit(BATCH_DELETE_FUNCTION, recreated)
+                self._settle([pending[key] for key in recreated], [set_confirmation, delete_confirmation])
+            for key, write in pending.items():
+                if write.written is None:
+                    self._settle([write], [await self._submit(DELETE_FUNCTION, key)])
+
+    async def _submit(self, function_name: str, *args) -> asyncio.Future:
+        """提交一笔交易，返回确认 Future（提交失败时返回带有该异常的 Future）"""
+        try:
+            confirmation = await self.client.submit_entry_nowait(function_name, self.account, *args)
+        except Exception as e:
+            confirmation = asyncio.get_running_loop().create_future()
+            confirmation.set_exception(e)
+            return confirmation
+        self.transactions += 1
+        return confirmation
+
+    def _settle(self, writes: List[_PendingWrite], confirmations: List[asyncio.Future]):
+        """所有交易都确认后以最后一笔的哈希解析这些写入的 Future，任一失败时全部抛出该异常"""
+        futures = [future for write in writes for future in write.futures]
+        if not futures:
+            return
+        task = asyncio.ensure_future(self._resolve(futures, confirmations))
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    @staticmethod
+    async def _resolve(futures: List[asyncio.Future], confirmations: List[asyncio.Future]):
+        try:
+            for confirmation in confirmations:
+                tx_hash = await asyncio.shield(confirmation)
+        except asyncio.CancelledError:
+            for future in futures:
+                future.cancel()
+            raise
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future in futures:
+            if not future.done():
+                future.set_result(tx_hash)
+
+    async def close(self):
+        """提交剩余写入并等待所有交易确认"""
+        await self.flush()
+        if self._in_flight:
+            await asyncio.wait(set(self._in_flight))
+
+    def stats(self) -> dict:
+        return {
+            "writes": self.writes,
+            "coalesced": self.coalesced,
+            "transactions": self.transactions,
+            "flushes": self.flushes,
+            "pending": len(self._pending),
+            "in_flight": len(self._in_flight),
+        }
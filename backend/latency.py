@@ -0,0 +1,130 @@
+"""
+延迟统计工具
+"""
+
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """最近秩百分位数，sorted_values 必须已排序，q 取 0-100"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies: Iterable[float]) -> Dict[str, float]:
+    """把一组延迟（秒）汇总为毫秒单位的 count / mean / p50 / p90 / p99 / max"""
+    values = sorted(latencies)
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values) * 1000, 3),
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p90_ms": round(percentile(values, 90) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3),
+    }
+
+
+class LatencyHistogram:
+    """
+    HDR 风格的对数-线性直方图。
+
+    以微秒为单位记录，在整个量程内保持 significant_digits 位有效数字的精度；
+    内存只与实际出现的桶数有关，可以合并多个直方图（例如按时间窗口统计后汇总）。
+    """
+
+    def __init__(self, significant_digits: int = 3):
+        if not 1 <= significant_digits <= 5:
+            raise ValueError("significant_digits must be between 1 and 5")
+        self.significant_digits = significant_digits
+        self._sub_bits = math.ceil(math.log2(2 * 10 ** significant_digits))
+        self._sub_count = 1 << self._sub_bits
+        self._half = self._sub_count >> 1
+        self._counts: Dict[int, int] = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us: Optional[int] = None
+        self.max_us = 0
+
+    def _index(self, value: int) -> int:
+        if value < self._sub_count:
+            return value
+        shift = value.bit_length() - self._sub_bits
+        return self._sub_count + (shift - 1) * self._half + ((value >> shift) - self._half)
+
+    def _highest(self, index: int) -> int:
+        """桶内的最大值（与 HDR 一样报告等价范围的上界）"""
+        if index < self._sub_count:
+            return index
+        offset = index - self._sub_count
+        shift = offset // self._half + 1
+        mantissa = offset % self._half + self._half
+        return ((mantissa + 1) << shift) - 1
+
+    def record(self, seconds: float):
+        value = max(0, int(seconds * 1_000_000))
+        index = self._index(value)
+        self._counts[index] = self._counts.get(index, 0) + 1
+        self.count += 1
+        self.total_us += value
+        self.max_us = max(self.max_us, value)
+        self.min_us = value if self.min_us is None else min(self.min_us, value)
+
+    def merge(self, other: "LatencyHistogram"):
+        if other.significant_digits != self.significant_digits:
+            raise ValueError("cannot merge histograms with different precision")
+        for index, count in other._counts.items():
+            self._counts[index] = self._counts.get(index, 0) + count
+        self.count += other.count
+        self.total_us += other.total_us
+        self.max_us = max(self.max_us, other.max_us)
+        if other.min_us is not None:
+            self.min_us = other.min_us if self.min_us is None else min(self.min_us, other.min_us)
+
+    def percentile(self, q: float) -> float:
+        """q 百分位（秒），q 取 0-100"""
+        if not self.count:
+            return 0.0
+        target = max(1, math.ceil(q / 100 * self.count))
+        seen = 0
+        for index in sorted(self._counts):
+            seen += self._counts[index]
+            if seen >= target:
+                return min(self._highest(index), self.max_us) / 1_000_000
+        return self.max_us / 1_000_000
+
+    def summary(self) -> Dict[str, float]:
+        """与 summarize() 相同的毫秒单位字段，另加 p99.9"""
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_us / self.count / 1000, 3),
+            "p50_ms": round(self.percentile(50) * 1000, 3),
+            "p90_ms": round(self.percentile(90) * 1000, 3),
+            "p99_ms": round(self.percentile(99) * 1000, 3),
+            "p999_ms": round(self.percentile(99.9) * 1000, 3),
+            "max_ms": round(self.max_us / 1000, 3),
+        }
+
+    def distribution(self, ticks_per_half: int = 2) -> List[Tuple[float, float, int]]:
+        """HDR 风格的百分位分布：[(百分位, 延迟毫秒, 累计计数)]，越靠近 100% 取点越密"""
+        rows = []
+        if not self.count:
+            return rows
+        q = 0.0
+        while True:
+            value = self.percentile(q)
+            rows.append((round(q, 6), round(value * 1000, 3), min(self.count, max(1, math.ceil(q / 100 * self.count)))))
+            if q >= 100.0 or value * 1_000_000 >= self.max_us:
+                break
+            # 每把剩余比例减半，取 ticks_per_half 个点
+            remaining = 100.0 - q
+            q = min(100.0, q + remaining / 2 / ticks_per_half) if remaining > 1e-4 else 100.0
+        if rows[-1][0] < 100.0:
+            rows.append((100.0, round(self.max_us / 1000, 3), self.count))
+        return rows
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+TruePass 开环负载生成器
+按目标到达率（泊松或匀速）发起 view / entry 函数的混合调用，请求的发出不依赖
+前一个请求完成；延迟从计划发出时刻算起（避免协调遗漏），按秒报告提供与实际
+完成的吞吐，结束时输出 HDR 风格的延迟分布
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from aptos_sdk.account import Account
+from blockchain_client import TruePassClient
+from account_pool import AccountPool, load_keys
+from http_pool import HttpPool
+from latency import LatencyHistogram
+from stub_node import StubConfig, StubFullnode
+
+DEFAULT_RATE = 200.0
+DEFAULT_DURATION = 10.0
+DEFAULT_ACCOUNTS = 64
+DEFAULT_MIX = "get_status=40,get_message=20,is_whitelisted=10,get_number=5,set_message=15,set_key_value=10"
+# 在途请求超过此数时丢弃新到达的请求（计入 dropped），保持开环
+DEFAULT_MAX_OUTSTANDING = 10_000
+# 负载结束后等待在途请求完成的最长时间（秒）
+DEFAULT_DRAIN_TIMEOUT = 30.0
+# httpx 连接池每分配一次连接的开销与连接数的平方成正比，连接不宜过多；
+# 并发请求数默认等于连接数，HTTP/2 节点上同一连接可以承载多个并发请求，可以调高
+DEFAULT_CONNECTIONS = 8
+# 键值操作使用的键数量（键越少热点越集中）
+DEFAULT_KEY_SPACE = 1000
+
+
+class LoadContext:
+    """
+    操作生成参数时使用的共享状态。
+
+    slots 限制同时发出的 HTTP 请求数：超出的请求在这里排队（排队时间计入延迟），
+    而不是全部堆进 httpx 连接池——后者每次分配连接都要扫描全部排队请求与连接，
+    排队上千时客户端自身会先于节点成为瓶颈。
+    """
+
+    def __init__(
+        self,
+        client: TruePassClient,
+        accounts: List[Account],
+        key_space: int,
+        seed: Optional[int],
+        concurrency: int,
+    ):
+        self.client = client
+        self.slots = asyncio.Semaphore(concurrency)
+        self.accounts = accounts
+        # 写操作由账户池路由到在途交易最少的合格账户
+        self.pool = AccountPool(client, accounts)
+        self.addresses = [str(account.address()) for account in accounts]
+        self.key_space = key_space
+        self.random = random.Random(seed)
+
+    def address(self) -> str:
+        return self.random.choice(self.addresses)
+
+    def key(self) -> str:
+        return f"key-{self.random.randrange(self.key_space)}"
+
+
+# 操作：(上下文, 请求序号) -> 在请求完成（写操作为上链确认）时结束的协程
+Operation = Callable[[LoadContext, int], Awaitable[object]]
+
+
+def _view(function_name: str, make_args: Callable[[LoadContext], list] = lambda ctx: []) -> Operation:
+    async def run(ctx: LoadContext, i: int):
+        async with ctx.slots:
+            return await ctx.client.call_view(function_name, *make_args(ctx))
+    return run
+
+
+def _write(function_name: str, make_args: Callable[[LoadContext, int], list] = lambda ctx, i: []) -> Operation:
+    async def run(ctx: LoadContext, i: int):
+        async with ctx.slots:
+            confirmation = await ctx.pool.submit(function_name, *make_args(ctx, i))
+        # 等待确认不占用请求槽位，确认由共享轮询器批量完成
+        return await confirmation
+    return run
+
+
+OPERATIONS: Dict[str, Operation] = {
+    "get_status": _view("get_status", lambda ctx: [ctx.address()]),
+    "get_message": _view("get_message", lambda ctx: [ctx.address()]),
+    "get_number": _view("get_number"),
+    "is_whitelisted": _view("is_whitelisted", lambda ctx: [ctx.address()]),
+    "get_whitelist": _view("get_whitelist"),
+    "get_all_keys": _view("get_all_keys"),
+    "key_exists": _view("key_exists", lambda ctx: [ctx.key()]),
+    "get_key_value": _view("get_key_value", lambda ctx: [ctx.key()]),
+    "set_message": _write("set_message", lambda ctx, i: [f"load-{i}"]),
+    "set_status_true": _write("set_status_true"),
+    "init_status": _write("init_status"),
+    "update_status": _write("update_status", lambda ctx, i: [ctx.address(), i % 2 == 0]),
+    "set_key_value": _write("set_key_value", lambda ctx, i: [ctx.key(), f"value-{i}"]),
+    "delete_key": _write("delete_key", lambda ctx, i: [ctx.key()]),
+}
+
+
+def parse_mix(text: str) -> List[Tuple[str, float]]:
+    """解析 "name=weight,..." 形式的操作比例"""
+    mix = []
+    for item in text.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"unknown operation {name!r}")
+        mix.append((name, float(weight) if weight else 1.0))
+    if not mix or sum(weight for _, weight in mix) <= 0:
+        raise ValueError("operation mix is empty")
+    return mix
+
+
+class _Window:
+    __slots__ = ("offered", "completed", "errors", "dropped", "histogram")
+
+    def __init__(self):
+        self.offered = 0
+        self.completed = 0
+        self.errors = 0
+        self.dropped = 0
+        self.histogram = LatencyHistogram()
+
+
+class LoadGenerator:
+    """
+    开环负载：到达时刻预先按到达过程计算，每个请求在自己的计划时刻作为独立任务
+    发出。客户端跟不上时在途请求增多、延迟上升，而不是降低发送速率；在途请求
+    达到 max_outstanding 后新请求被丢弃并计数。
+    """
+
+    def __init__(
+        self,
+        ctx: LoadContext,
+        mix: List[Tuple[str, float]],
+        rate: float,
+        duration: float,
+        arrival: str = "poisson",
+        max_outstanding: int = DEFAULT_MAX_OUTSTANDING,
+        interval: float = 1.0,
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        if arrival not in ("poisson", "uniform"):
+            raise ValueError("arrival must be 'poisson' or 'uniform'")
+        self.ctx = ctx
+        self.names = [name for name, _ in mix]
+        self.weights = [weight for _, weight in mix]
+        self.rate = rate
+        self.duration = duration
+        self.arrival = arrival
+        self.max_outstanding = max_outstanding
+        self.interval = interval
+        self.histograms = {name: LatencyHistogram() for name in self.names}
+        self.errors = {name: 0 for name in self.names}
+        self.error_samples: Dict[str, str] = {}
+        self.windows: List[_Window] = []
+        self.dropped = 0
+        self.timed_out = 0
+        self._outstanding: set = set()
+        self._started = 0.0
+        self.elapsed = 0.0
+
+    def _window(self, at: float) -> _Window:
+        index = max(0, int((at - self._started) / self.interval))
+        while len(self.windows) <= index:
+            self.windows.append(_Window())
+        return self.windows[index]
+
+    async def _issue(self, name: str, i: int, scheduled: float):
+        try:
+            await OPERATIONS[name](self.ctx, i)
+        except Exception as e:
+            self.errors[name] += 1
+            self.error_samples.setdefault(name, f"{type(e).__name__}: {e}")
+            self._window(time.perf_counter()).errors += 1
+            return
+        finished = time.perf_counter()
+        latency = finished - scheduled
+        self.histograms[name].record(latency)
+        window = self._window(finished)
+        window.completed += 1
+        window.histogram.record(latency)
+
+    async def run(self, drain_timeout: float = DEFAULT_DRAIN_TIMEOUT, report=None):
+        rng = self.ctx.random
+        loop_time = time.perf_counter
+        self._started = loop_time()
+        deadline = self._started + self.duration
+        next_at = self._started
+        reporter = asyncio.ensure_future(self._report(report)) if report is not None else None
+        i = 0
+        try:
+            while next_at < deadline:
+                delay = next_at - loop_time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                # 事件循环落后时补发所有已到时刻的请求，保持平均到达率
+                now = loop_time()
+                while next_at <= now and next_at < deadline:
+                    window = self._window(next_at)
+                    window.offered += 1
+                    if len(self._outstanding) >= self.max_outstanding:
+                        self.dropped += 1
+                        window.dropped += 1
+                    else:
+                        name = rng.choices(self.names, self.weights)[0]
+                        task = asyncio.ensure_future(self._issue(name, i, next_at))
+                        self._outstanding.add(task)
+                        task.add_done_callback(self._outstanding.discard)
+                    i += 1
+                    gap = rng.expovariate(self.rate) if self.arrival == "poisson" else 1.0 / self.rate
+                    next_at += gap
+            if self._outstanding:
+                done, pending = await asyncio.wait(set(self._outstanding), timeout=drain_timeout)
+                self.timed_out = len(pending)
+                for task in pending:
+                    task.cancel()
+        finally:
+            if reporter is not None:
+                reporter.cancel()
+        self.elapsed = loop_time() - self._started
+
+    async def _report(self, report):
+        index = 0
+        while True:
+            await asyncio.sleep(self._started + (index + 1) * self.interval + 0.05 - time.perf_counter())
+            if index < len(self.windows):
+                report(index, self.windows[index], len(self._outstanding))
+            index += 1
+
+    def result(self) -> dict:
+        total = LatencyHistogram()
+        for histogram in self.histograms.values():
+            total.merge(histogram)
+        offered = sum(window.offered for window in self.windows)
+        completed = total.count
+        # 实际吞吐只统计负载期间完成的请求，负载结束后的排空阶段不计入
+        windows_in_load = int(self.duration / self.interval)
+        completed_in_load = sum(window.completed for window in self.windows[:windows_in_load])
+        return {
+            "offered": offered,
+            "completed": completed,
+            "errors": sum(self.errors.values()),
+            "dropped": self.dropped,
+            "timed_out": self.timed_out,
+            "offered_per_s": round(offered / self.duration, 2),
+            "achieved_per_s": round(completed_in_load / (windows_in_load * self.interval), 2) if windows_in_load else 0.0,
+            "latency": total.summary(),
+            "distribution": total.distribution(),
+            "operations": {
+                name: dict(self.histograms[name].summary(), errors=self.errors[name])
+                for name in self.names
+            },
+            "error_samples": self.error_samples,
+            "timeline": [
+                dict(
+                    second=round(index * self.interval, 3),
+                    offered=window.offered,
+                    completed=window.completed,
+                    errors=window.errors,
+                    dropped=window.dropped,
+                    **{k: v for k, v in window.histogram.summary().items() if k in ("p50_ms", "p99_ms")},
+                )
+                for index, window in enumerate(self.windows)
+            ],
+        }
+
+
+def _print_window(interval: float):
+    def report(index: int, window: _Window, outstanding: int):
+        summary = window.histogram.summary()
+        print(
+            f"t={index * interval:>6.1f}s  offered={window.offered / interval:>8.1f}/s  "
+            f"achieved={window.completed / interval:>8.1f}/s  errors={window.errors:<5} "
+            f"dropped={window.dropped:<5} outstanding={outstanding:<6} "
+            f"p50={summary.get('p50_ms', 0):.2f}ms  p99={summary.get('p99_ms', 0):.2f}ms",
+            file=sys.stderr,
+        )
+    return report
+
+
+def _print_result(result: dict):
+    print(
+        f"\n📊 offered {result['offered_per_s']}/s, achieved {result['achieved_per_s']}/s "
+        f"({result['completed']} ok, {result['errors']} errors, {result['dropped']} dropped, "
+        f"{result['timed_out']} unfinished)"
+    )
+    print(f"{'operation':<16} {'count':>8} {'errors':>7} {'p50 ms':>9} {'p99 ms':>9} {'p99.9 ms':>9} {'max ms':>9}")
+    for name, stats in result["operations"].items():
+        print(
+            f"{name:<16} {stats['count']:>8} {stats['errors']:>7} {stats.get('p50_ms', 0):>9.2f} "
+            f"{stats.get('p99_ms', 0):>9.2f} {stats.get('p999_ms', 0):>9.2f} {stats.get('max_ms', 0):>9.2f}"
+        )
+    for name, sample in result["error_samples"].items():
+        print(f"❌ {name}: {sample}")
+    print(f"\n{'percentile':>12} {'latency ms':>12} {'count':>10}")
+    for q, value, count in result["distribution"]:
+        print(f"{q:>12.4f} {value:>12.3f} {count:>10}")
+
+
+def _load_accounts(path: Optional[str], count: int) -> List[Account]:
+    """从文件读取私钥（每行一个），不足 count 个时补充随机生成的账户"""
+    accounts = load_keys(path) if path else []
+    while len(accounts) < count:
+        accounts.append(Account.generate())
+    return accounts
+
+
+async def run_load(args, mix: List[Tuple[str, float]]) -> dict:
+    stub = None
+    node_urls = [url.strip() for url in (args.node_url or "").split(",") if url.strip()]
+    accounts = _load_accounts(args.keys, args.accounts)
+    if not node_urls:
+        # 替身节点把全部负载账户视为已加入白名单
+        stub = StubFullnode(
+            StubConfig(args.latency_ms, args.jitter_ms, args.error_rate, commit_delay=args.commit_delay, seed=args.seed),
+            view_results={"get_whitelist": [[str(account.address()) for account in accounts]]},
+        )
+        node_urls = [await stub.start()]
+    try:
+        async with HttpPool(max_connections=args.connections, max_keepalive_connections=args.connections) as pool:
+            async with TruePassClient(
+                node_urls[0],
+                node_urls=node_urls if len(node_urls) > 1 else None,
+                http_pool=pool,
+                max_in_flight=args.max_in_flight,
+            ) as client:
+                generator = LoadGenerator(
+                    LoadContext(client, accounts, args.key_space, args.seed, args.concurrency or args.connections),
+                    mix,
+                    args.rate,
+                    args.duration,
+                    args.arrival,
+                    args.max_outstanding,
+                    args.interval,
+                )
+                print(
+                    f"🚀 {args.arrival} arrivals at {args.rate}/s for {args.duration}s over {len(accounts)} accounts "
+                    f"against {'stub' if stub is not None else ', '.join(node_urls)}",
+                    file=sys.stderr,
+                )
+                await generator.run(args.drain_timeout, _print_window(args.interval))
+                result = generator.result()
+                if client.confirmations is not None:
+                    result["confirmations"] = client.confirmations.stats()
+                submitted = [signer.submitted for signer in generator.ctx.pool.signers.values()]
+                result["signers"] = {"count": len(submitted), "min_submitted": min(submitted), "max_submitted": max(submitted)}
+    finally:
+        if stub is not None:
+            await stub.stop()
+    result["meta"] = {
+        "node_url": "stub" if stub is not None else node_urls,
+        "rate": args.rate,
+        "duration_s": args.duration,
+        "arrival": args.arrival,
+        "accounts": len(accounts),
+        "mix": dict(mix),
+        "timestamp": int(time.time()),
+    }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Open-loop load generator for TruePass")
+    parser.add_argument("--node-url", help="comma-separated node URLs (default: start a local stub fullnode)")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="target arrivals per second")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION, help="seconds of load")
+    parser.add_argument("--arrival", choices=("poisson", "uniform"), default="poisson")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="operation weights, e.g. get_status=80,set_message=20")
+    parser.add_argument("--accounts", type=int, default=DEFAULT_ACCOUNTS, help="number of sending accounts")
+    parser.add_argument("--keys", help="file with one private key per line (needed for writes on a real node)")
+    parser.add_argument("--key-space", type=int, default=DEFAULT_KEY_SPACE, help="distinct keys for key-value ops")
+    parser.add_argument("--max-outstanding", type=int, default=DEFAULT_MAX_OUTSTANDING)
+    parser.add_argument("--max-in-flight", type=int, default=32, help="pipelined transactions per account")
+    parser.add_argument("--connections", type=int, default=DEFAULT_CONNECTIONS, help="HTTP connection pool size")
+    parser.add_argument("--concurrency", type=int, help="max concurrent HTTP requests (default: --connections)")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds per timeline window")
+    parser.add_argument("--drain-timeout", type=float, default=DEFAULT_DRAIN_TIMEOUT)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="stub latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--commit-delay", type=float, default=0.0, help="stub seconds before a transaction commits")
+    parser.add_argument("--output", help="write the full result as JSON")
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    result = asyncio.run(run_load(args, mix))
+    _print_result(result)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"✅ Results written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+客户端指标
+按 (操作, 阶段) 记录延迟直方图，统计调用次数、按类型的错误数和 HTTP 字节数，
+可导出为 Prometheus 文本格式或快照字典，并可通过钩子把 span 转发给外部 tracer
+"""
+
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import httpx
+
+# 直方图桶上界（秒），最后一个桶为 +Inf
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+# span 钩子：(操作, 阶段, 开始时间戳, 耗时秒数, 异常或 None)
+SpanHook = Callable[[str, str, float, float, Optional[BaseException]], None]
+
+
+class Histogram:
+    """固定桶直方图"""
+
+    __slots__ = ("bounds", "counts", "sum", "count", "max")
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Prometheus 风格的累计桶 [(le, count)]"""
+        total = 0
+        buckets = []
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            total += count
+            buckets.append(("+Inf" if bound == float("inf") else repr(bound), total))
+        return buckets
+
+    def quantile(self, q: float) -> float:
+        """在桶内线性插值估计分位数（q 取 0-1），不超过观测到的最大值"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        lower = 0.0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= target:
+                if i == len(self.bounds):
+                    return self.max
+                upper = min(self.bounds[i], self.max)
+                return min(lower + (upper - lower) * (target - seen) / count, self.max)
+            seen += count
+            if i < len(self.bounds):
+                lower = self.bounds[i]
+        return self.max
+
+
+class _Timer:
+    __slots__ = ("metrics", "operation", "phase", "start", "wall_start")
+
+    def __init__(self, metrics: "Metrics", operation: str, phase: str):
+        self.metrics = metrics
+        self.operation = operation
+        self.phase = phase
+
+    def __enter__(self):
+        self.wall_start = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.observe(
+            self.operation, self.phase, time.perf_counter() - self.start, self.wall_start, exc
+        )
+        return False
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _CountingStream(httpx.AsyncByteStream):
+    """包装响应体流，按读取到的原始字节数计入 received"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, metrics: "Metrics"):
+        self._stream = stream
+        self._metrics = metrics
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            self._metrics.record_bytes("received", len(chunk))
+            yield chunk
+
+    async def aclose(self):
+        await self._stream.aclose()
+
+
+class Metrics:
+    """进程内指标注册表"""
+
+    def __init__(
+        self,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        span_hook: Optional[SpanHook] = None,
+        namespace: str = "truepass",
+    ):
+        self.buckets = tuple(buckets)
+        self.span_hook = span_hook
+        self.namespace = namespace
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.calls: Dict[Tuple[str, str], int] = {}
+        self.errors: Dict[Tuple[str, str], int] = {}
+        self.bytes: Dict[str, int] = {"sent": 0, "received": 0}
+        self._sessions = set()
+
+    def timer(self, operation: str, phase: str) -> _Timer:
+        """计时上下文管理器，退出时记录耗时并调用 span 钩子"""
+        return _Timer(self, operation, phase)
+
+    def observe(
+        self,
+        operation: str,
+        phase: str,
+        seconds: float,
+        start: Optional[float] = None,
+        error: Optional[BaseException] = None,
+    ):
+        key = (operation, phase)
+        histogram = self.latency.get(key)
+        if histogram is None:
+            histogram = self.latency[key] = Histogram(self.buckets)
+        histogram.observe(seconds)
+        if self.span_hook is not None:
+            self.span_hook(operation, phase, start if start is not None else time.time() - seconds, seconds, error)
+
+    def record_call(self, operation: str, kind: str):
+        key = (operation, kind)
+        self.calls[key] = self.calls.get(key, 0) + 1
+
+    def record_error(self, operation: str, error: BaseException):
+        key = (operation, type(error).__name__)
+        self.errors[key] = self.errors.get(key, 0) + 1
+
+    def record_bytes(self, direction: str, count: int):
+        self.bytes[direction] = self.bytes.get(direction, 0) + count
+
+    def instrument_session(self, session):
+        """
+        在 httpx 会话上挂载事件钩子统计收发字节（同一会话只挂一次）：发送按请求的
+        Content-Length，接收按实际读到的响应体字节（分块与流式响应同样计入）
+        """
+        if id(session) in self._sessions:
+            return
+        self._sessions.add(id(session))
+
+        async def on_request(request):
+            self.record_bytes("sent", int(request.headers.get("content-length", 0)))
+
+        async def on_response(response):
+            response.stream = _CountingStream(response.stream, self)
+
+        session.event_hooks["request"].append(on_request)
+        session.event_hooks["response"].append(on_response)
+
+    def snapshot(self) -> dict:
+        """当前指标的字典快照（延迟单位为毫秒）"""
+        latency: Dict[str, Dict[str, dict]] = {}
+        for (operation, phase), histogram in self.latency.items():
+            latency.setdefault(operation, {})[phase] = {
+                "count": histogram.count,
+                "mean_ms": round(histogram.sum / histogram.count * 1000, 3) if histogram.count else 0.0,
+                "p50_ms": round(histogram.quantile(0.5) * 1000, 3),
+                "p99_ms": round(histogram.quantile(0.99) * 1000, 3),
+            }
+        calls: Dict[str, Dict[str, int]] = {}
+        for (operation, kind), count in self.calls.items():
+            calls.setdefault(operation, {})[kind] = count
+        errors: Dict[str, Dict[str, int]] = {}
+        for (operation, error_type), count in self.errors.items():
+            errors.setdefault(operation, {})[error_type] = count
+        return {"calls": calls, "errors": errors, "bytes": dict(self.bytes), "latency": latency}
+
+    def prometheus(self) -> str:
+        """Prometheus 文本格式"""
+        ns = self.namespace
+        lines = [
+            f"# HELP {ns}_phase_seconds Latency of TruePassClient call phases.",
+            f"# TYPE {ns}_phase_seconds histogram",
+        ]
+        for (operation, phase), histogram in sorted(self.latency.items()):
+            labels = f'operation="{_escape(operation)}",phase="{_escape(phase)}"'
+            for le, count in histogram.cumulative():
+                lines.append(f'{ns}_phase_seconds_bucket{{{labels},le="{le}"}} {count}')
+            lines.append(f"{ns}_phase_seconds_sum{{{labels}}} {histogram.sum!r}")
+            lines.append(f"{ns}_phase_seconds_count{{{labels}}} {histogram.count}")
+        lines += [f"# HELP {ns}_calls_total Client calls.", f"# TYPE {ns}_calls_total counter"]
+        for (operation, kind), count in sorted(self.calls.items()):
+            lines.append(f'{ns}_calls_total{{operation="{_escape(operation)}",kind="{_escape(kind)}"}} {count}')
+        lines += [f"# HELP {ns}_errors_total Client errors by type.", f"# TYPE {ns}_errors_total counter"]
+        for (operation, error_type), count in sorted(self.errors.items()):
+            lines.append(f'{ns}_errors_total{{operation="{_escape(operation)}",type="{_escape(error_type)}"}} {count}')
+        lines += [f"# HELP {ns}_http_bytes_total HTTP body bytes.", f"# TYPE {ns}_http_bytes_total counter"]
+        for direction, count in sorted(self.bytes.items()):
+            lines.append(f'{ns}_http_bytes_total{{direction="{_escape(direction)}"}} {count}')
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,97 @@
+"""
+view 结果的流式解码
+增量解析形如 [["a", "b", ...]] 的 view 响应体（单个返回值且为字符串元素的 vector），
+逐个产出元素；缓冲区只保留一个未完整到达的元素，峰值内存与结果大小无关
+"""
+
+import json
+import re
+from typing import List
+from call_plans import CallError, CallPlan, MoveType, STRING_TYPE, parse_type
+
+# 在 JSON 中以字符串表示、可以流式解码的 vector 元素类型
+STREAMABLE_ELEMENT_TYPES = {"address", STRING_TYPE, "u64", "u128", "u256", "vector<u8>"}
+
+_OPEN = re.compile(rb"\s*\[\s*\[")
+_EMPTY = re.compile(rb"\s*\]")
+_ITEM = re.compile(rb'\s*"((?:[^"\\]|\\.)*)"\s*([,\]])', re.DOTALL)
+_CLOSE = re.compile(rb"\s*\]\s*")
+
+_START, _FIRST_ITEM, _ITEMS, _TAIL, _DONE = range(5)
+
+
+def stream_element_type(plan: CallPlan) -> MoveType:
+    """view 函数唯一返回值的元素类型，不能流式解码时抛出 CallError"""
+    if len(plan.return_types) != 1:
+        raise CallError(f"{plan.name} must return exactly one value to be streamed")
+    type_name = plan.return_types[0].name
+    if not (type_name.startswith("vector<") and type_name.endswith(">")):
+        raise CallError(f"{plan.name} returns {type_name}, not a vector")
+    element = type_name[len("vector<"):-1]
+    if element not in STREAMABLE_ELEMENT_TYPES:
+        raise CallError(f"cannot stream vector<{element}> returned by {plan.name}")
+    return parse_type(element)
+
+
+class StringVectorDecoder:
+    """[[字符串, ...]] 的增量解码器：feed() 每次返回新解析出的元素（JSON 解码后的字符串）"""
+
+    def __init__(self):
+        self._buffer = b""
+        self._state = _START
+        self.count = 0
+
+    def feed(self, chunk: bytes) -> List[str]:
+        buffer = self._buffer + chunk if self._buffer else chunk
+        position = 0
+        items: List[str] = []
+        while True:
+            if self._state == _START:
+                match = _OPEN.match(buffer, position)
+                if match is None:
+                    break
+                self._state = _FIRST_ITEM
+            elif self._state == _FIRST_ITEM:
+                match = _EMPTY.match(buffer, position)
+                if match is not None:
+                    self._state = _TAIL
+                else:
+                    match = self._item(buffer, position, items)
+                    if match is None:
+                        break
+            elif self._state == _ITEMS:
+                match = self._item(buffer, position, items)
+                if match is None:
+                    break
+            elif self._state == _TAIL:
+                match = _CLOSE.match(buffer, position)
+                if match is None:
+                    break
+                self._state = _DONE
+            else:
+                if buffer[position:].strip():
+                    raise ValueError("unexpected data after the view result")
+                position = len(buffer)
+                break
+            position = match.end()
+        self._buffer = buffer[position:]
+        self.count += len(items)
+        return items
+
+    def _item(self, buffer: bytes, position: int, items: List[str]):
+        match = _ITEM.match(buffer, position)
+        if match is None:
+            # 下一个非空白字符不是字符串开头时说明响应格式不符，而不是数据未到齐
+            rest = buffer[position:].lstrip()
+            if rest and rest[:1] != b'"':
+                raise ValueError(f"expected a string element, got {rest[:20]!r}")
+            return None
+        raw = match.group(1)
+        items.append(json.loads(b'"' + raw + b'"') if b"\\" in raw else raw.decode())
+        self._state = _TAIL if match.group(2) == b"]" else _ITEMS
+        return match
+
+    def close(self):
+        """响应结束时调用，结构不完整时抛出 ValueError"""
+        if self._state != _DONE:
+            raise ValueError("view result ended before the vector was complete")
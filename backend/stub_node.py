@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+本地 Aptos 全节点替身
+只实现 TruePassClient 用到的接口（节点信息、账户、view、交易提交/模拟、按哈希与按账户查询），
+可配置注入延迟和错误率，用于基准测试和压测，不做任何链上语义校验
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+from http import HTTPStatus
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+CHAIN_ID = 4
+
+# 各 view 函数的默认返回值（按函数名匹配）
+DEFAULT_VIEW_RESULTS = {
+    "get_status": [False],
+    "get_message": [""],
+    "get_number": ["0"],
+    "is_whitelisted": [False],
+    "get_whitelist": [[]],
+    "get_all_keys": [[]],
+    "key_exists": [False],
+    "get_key_value": [""],
+    "get_whitelist_page": [[], "0"],
+    "get_keys_page": [[], "0"],
+    "get_entries_page": [[], [], "0"],
+    "pending_migration": ["0", "0"],
+}
+
+
+class StubConfig:
+    """
+    注入的延迟与错误率，endpoint_overrides 按接口名
+    （info/account/account_transactions/view/submit/simulate/transaction/transactions）覆盖
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        commit_delay: float = 0.0,
+        endpoint_overrides: Optional[Dict[str, dict]] = None,
+        seed: Optional[int] = None,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.commit_delay = commit_delay
+        self.endpoint_overrides = endpoint_overrides or {}
+        self.random = random.Random(seed)
+
+    def _get(self, endpoint: str, name: str):
+        return self.endpoint_overrides.get(endpoint, {}).get(name, getattr(self, name))
+
+    def delay(self, endpoint: str) -> float:
+        latency = self._get(endpoint, "latency_ms")
+        jitter = self._get(endpoint, "jitter_ms")
+        return max(0.0, latency + self.random.uniform(-jitter, jitter)) / 1000
+
+    def should_fail(self, endpoint: str) -> bool:
+        rate = self._get(endpoint, "error_rate")
+        return rate > 0 and self.random.random() < rate
+
+
+class StubFullnode:
+    """基于 asyncio 的最小 HTTP/1.1 服务器，支持 keep-alive"""
+
+    def __init__(self, config: Optional[StubConfig] = None, view_results: Optional[Dict[str, list]] = None):
+        self.config = config or StubConfig()
+        self.view_results = dict(DEFAULT_VIEW_RESULTS, **(view_results or {}))
+        self.sequence_numbers: Dict[str, int] = {}
+        # 交易哈希 -> (提交时间, 版本号, gas 用量)
+        self.transactions: Dict[str, Tuple[float, int, int]] = {}
+        # 发送者 -> {序列号: 交易哈希}
+        self.account_transactions: Dict[str, Dict[int, str]] = {}
+        # 版本号 -> 交易哈希
+        self.versions: Dict[int, str] = {}
+        self.version = 0
+        self.requests: Dict[str, int] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.base_url = ""
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        self._server = await asyncio.start_server(self._serve, host, port)
+        port = self._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{host}:{port}/v1"
+        return self.base_url
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "StubFullnode":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                url = urlsplit(target)
+                status, payload = await self._dispatch(method, url.path, body, parse_qs(url.query))
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\nConnection: keep-alive\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method: str, path: str, body: bytes, query: Optional[dict] = None) -> Tuple[int, object]:
+        parts = [part for part in path.split("/") if part][1:]  # 去掉 v1 前缀
+        if not parts:
+            endpoint = "info"
+        elif parts[0] == "accounts" and parts[-1] == "transactions":
+            endpoint = "account_transactions"
+        elif parts[0] == "accounts":
+            endpoint = "account"
+        elif parts[0] == "view":
+            endpoint = "view"
+        elif parts[0] == "transactions" and method == "POST" and parts[-1] == "simulate":
+            endpoint = "simulate"
+        elif parts[0] == "transactions" and method == "POST":
+            endpoint = "submit"
+        elif parts == ["transactions"]:
+            endpoint = "transactions"
+        elif parts[0] == "transactions":
+            endpoint = "transaction"
+        else:
+            return 404, {"message": f"unknown endpoint {path}"}
+        self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+
+        delay = self.config.delay(endpoint)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.config.should_fail(endpoint):
+            return self.config.error_status, {"message": "injected error", "error_code": "internal_error"}
+        return getattr(self, f"_handle_{endpoint}")(parts, body, query or {})
+
+    def _handle_info(self, parts, body, query):
+        return 200, {"chain_id": CHAIN_ID, "ledger_version": str(self.version)}
+
+    def _handle_account(self, parts, body, query):
+        address = parts[1]
+        return 200, {
+            "sequence_number": str(self.sequence_numbers.get(address, 0)),
+            "authentication_key": address,
+        }
+
+    def _handle_view(self, parts, body, query):
+        request = json.loads(body or b"{}")
+        function_name = request.get("function", "").rsplit("::", 1)[-1]
+        result = self.view_results.get(function_name, [])
+        if callable(result):
+            # 可调用的返回值按请求参数计算（如分页 view）
+            result = result(*request.get("arguments", []))
+        return 200, result
+
+    def _handle_submit(self, parts, body, query):
+        tx_hash = "0x" + hashlib.sha3_256(body).hexdigest()
+        # 交易 BCS 以 32 字节发送者地址和 8 字节小端序列号开头
+        sender = "0x" + body[:32].hex()
+        sequence_number = int.from_bytes(body[32:40], "little")
+        self.sequence_numbers[sender] = self.sequence_numbers.get(sender, 0) + 1
+        self.version += 1
+        self._record_transaction(tx_hash, sender, sequence_number, self.gas_used(body))
+        return 202, {"hash": tx_hash, "type": "pending_transaction"}
+
+    def _record_transaction(self, tx_hash: str, sender: str, sequence_number: int, gas_used: int):
+        """登记在当前版本上链的交易"""
+        self.transactions[tx_hash] = (time.monotonic(), self.version, gas_used)
+        self.account_transactions.setdefault(sender, {})[sequence_number] = tx_hash
+        self.versions[self.version] = tx_hash
+
+    def _handle_simulate(self, parts, body, query):
+        # gas 用量随交易大小增长，便于测试按参数大小分档的估算
+        return 200, [{
+            "success": True,
+            "vm_status": "Executed successfully",
+            "gas_used": str(self.gas_used(body)),
+            "gas_unit_price": "100",
+        }]
+
+    @staticmethod
+    def gas_used(body: bytes) -> int:
+        return 5 + len(body) // 16
+
+    def _committed(self, tx_hash: str) -> Optional[dict]:
+        submitted_at, version, gas_used = self.transactions[tx_hash]
+        if time.monotonic() - submitted_at < self.config.commit_delay:
+            return None
+        return {
+            "type": "user_transaction",
+            "hash": tx_hash,
+            "version": str(version),
+            "success": True,
+            "vm_status": "Executed successfully",
+            "gas_used": str(gas_used),
+        }
+
+    def _handle_transaction(self, parts, body, query):
+        tx_hash = parts[-1]
+        if tx_hash not in self.transactions:
+            return 404, {"message": f"transaction {tx_hash} not found", "error_code": "transaction_not_found"}
+        transaction = self._committed(tx_hash)
+        if transaction is None:
+            return 200, {"type": "pending_transaction", "hash": tx_hash}
+        return 200, transaction
+
+    def _handle_account_transactions(self, parts, body, query):
+        # 只返回从 start 开始连续已上链的交易
+        sent = self.account_transactions.get(parts[1], {})
+        start = int(query.get("start", ["0"])[0])
+        limit = int(query.get("limit", ["25"])[0])
+        transactions = []
+        for sequence_number in range(start, start + limit):
+            tx_hash = sent.get(sequence_number)
+            transaction = None if tx_hash is None else self._committed(tx_hash)
+            if transaction is None:
+                break
+            transaction["sequence_number"] = str(sequence_number)
+            transactions.append(transaction)
+        return 200, transactions
+
+    def _handle_transactions(self, parts, body, query):
+        # 按版本号列出交易，未指定 start 时返回最新的 limit 笔；同样只返回连续已上链的交易
+        limit = int(query.get("limit", ["25"])[0])
+        start = int(query.get("start", [str(max(self.version - limit + 1, 1))])[0])
+        transactions = []
+        for version in range(start, min(start + limit, self.version + 1)):
+            tx_hash = self.versions.get(version)
+            transaction = None if tx_hash is None else self._committed(tx_hash)
+            if transaction is None:
+                break
+            transactions.append(transaction)
+        return 200, transactions
+
+
+async def _serve_forever(args):
+    config = StubConfig(args.latency_ms, args.jitter_ms, args.error_rate, commit_delay=args.commit_delay)
+    node = StubFullnode(config)
+    base_url = await node.start(args.host, args.port)
+    print(f"🚀 Stub fullnode listening on {base_url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await node.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Aptos fullnode REST API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--commit-delay", type=float, default=0.0)
+    try:
+        asyncio.run(_serve_forever(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
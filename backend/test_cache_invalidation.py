@@ -0,0 +1,105 @@
+"""
+写后读缓存一致性：客户端自己的写交易确认后，受影响的 view 缓存必须失效
+（使用进程内的合约模拟器，不需要网络）
+"""
+
+import asyncio
+from aptos_sdk.account import Account
+from emulator import ContractState, EmulatedFullnode
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def make_client():
+    deployer = Account.generate()
+    node = EmulatedFullnode(state=ContractState(str(deployer.address())))
+    return deployer, node.client(cache_size=1024, cache_ttl=60.0)
+
+
+def test_key_value_writes_invalidate_reads():
+    async def scenario():
+        deployer, client = make_client()
+        async with client:
+            await client.submit_entry("init_whitelist", deployer)
+            await client.submit_entry("init_database", deployer)
+            await client.submit_entry("add_to_whitelist", deployer, deployer.address())
+
+            await client.submit_entry("set_key_value", deployer, "k", "v1")
+            assert await client.call_view("get_key_value", "k") == "v1"
+            assert await client.call_view("key_exists", "x") is False
+            assert await client.call_view("get_all_keys") == ["k"]
+
+            await client.submit_entry("set_key_value", deployer, "k", "v2")
+            await client.submit_entry("batch_set_key_value", deployer, ["x"], ["1"])
+            assert await client.call_view("get_key_value", "k") == "v2"
+            assert await client.call_view("key_exists", "x") is True
+            assert await client.call_view("get_all_keys") == ["k", "x"]
+
+            await client.submit_entry("delete_key", deployer, "k")
+            assert await client.call_view("key_exists", "k") is False
+            assert await client.call_view("get_keys_page", 0, 10) == (["x"], 1)
+    run(scenario())
+
+
+def test_whitelist_writes_invalidate_reads():
+    async def scenario():
+        deployer, client = make_client()
+        member, other = Account.generate().address(), Account.generate().address()
+        async with client:
+            await client.submit_entry("init_whitelist", deployer)
+            await client.submit_entry("add_to_whitelist", deployer, member)
+            assert await client.call_view("is_whitelisted", member) is True
+            assert await client.call_view("is_whitelisted", other) is False
+            assert len(await client.call_view("get_whitelist")) == 1
+
+            await client.submit_entry("remove_from_whitelist", deployer, member)
+            await client.submit_entry("batch_add_to_whitelist", deployer, [other])
+            assert await client.call_view("is_whitelisted", member) is False
+            assert await client.call_view("is_whitelisted", other) is True
+            assert await client.call_view("get_whitelist") == [str(other)]
+    run(scenario())
+
+
+def test_status_writes_invalidate_reads():
+    async def scenario():
+        _, client = make_client()
+        account = Account.generate()
+        async with client:
+            await client.submit_entry("init_status", account)
+            assert await client.call_view("get_status", account.address()) is False
+            await client.submit_entry("set_status_true", account)
+            assert await client.call_view("get_status", account.address()) is True
+            await client.submit_entry("update_status", account, account.address(), False)
+            assert await client.call_view("get_status", account.address()) is False
+    run(scenario())
+
+
+def test_read_in_flight_during_write_is_not_cached():
+    async def scenario():
+        deployer, client = make_client()
+        async with client:
+            await client.submit_entry("init_whitelist", deployer)
+            await client.submit_entry("init_database", deployer)
+            await client.submit_entry("add_to_whitelist", deployer, deployer.address())
+            await client.submit_entry("set_key_value", deployer, "k", "v1")
+
+            # 读取已拿到 v1 但尚未写回缓存时，写交易确认并失效缓存
+            fetch_view, fetched, release = client._fetch_view, asyncio.Event(), asyncio.Event()
+
+            async def slow_fetch_view(*args, **kwargs):
+                result = await fetch_view(*args, **kwargs)
+                fetched.set()
+                await release.wait()
+                return result
+
+            client._fetch_view = slow_fetch_view
+            read = asyncio.ensure_future(client.call_view("get_key_value", "k"))
+            await fetched.wait()
+            client._fetch_view = fetch_view
+            await client.submit_entry("set_key_value", deployer, "k", "v2")
+            release.set()
+            assert await read == "v1"
+            assert await client.call_view("get_key_value", "k") == "v2"
+    run(scenario())
@@ -0,0 +1,71 @@
+"""
+键值写入合并：合并后的批量交易与逐条提交的链上结果一致
+（使用进程内的合约模拟器，不需要网络）
+"""
+
+import asyncio
+import pytest
+from aptos_sdk.account import Account
+from emulator import ContractState, EmulatedFullnode
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+async def setup(client, deployer):
+    await client.submit_entry("init_whitelist", deployer)
+    await client.submit_entry("init_database", deployer)
+    await client.submit_entry("add_to_whitelist", deployer, deployer.address())
+
+
+def make_client():
+    deployer = Account.generate()
+    node = EmulatedFullnode(state=ContractState(str(deployer.address())))
+    return deployer, node.client()
+
+
+def test_set_then_delete_of_new_key_succeeds():
+    async def scenario():
+        deployer, client = make_client()
+        async with client:
+            await setup(client, deployer)
+            writer = client.kv_writer(deployer, window=60.0)
+            set_future = await writer.set("new", "v")
+            delete_future = await writer.delete("new")
+            await writer.flush()
+            assert (await set_future) == (await delete_future)
+            assert await client.call_view("key_exists", "new") is False
+    run(scenario())
+
+
+def test_set_then_delete_of_existing_key_deletes_it():
+    async def scenario():
+        deployer, client = make_client()
+        async with client:
+            await setup(client, deployer)
+            await client.submit_entry("set_key_value", deployer, "old", "v0")
+            writer = client.kv_writer(deployer, window=60.0)
+            futures = [await writer.set("old", "v1"), await writer.delete("old"), await writer.set("other", "x")]
+            await writer.flush()
+            await asyncio.gather(*futures)
+            assert await client.call_view("key_exists", "old") is False
+            assert await client.call_view("get_key_value", "other") == "x"
+    run(scenario())
+
+
+def test_sets_are_batched_and_missing_delete_fails_alone():
+    async def scenario():
+        deployer, client = make_client()
+        async with client:
+            await setup(client, deployer)
+            writer = client.kv_writer(deployer, window=60.0)
+            sets = [await writer.set(f"k{i}", str(i)) for i in range(5)]
+            missing = await writer.delete("missing")
+            await writer.flush()
+            assert len(set(await asyncio.gather(*sets))) == 1
+            with pytest.raises(Exception):
+                await missing
+            assert writer.transactions == 2
+            assert await client.call_view("get_all_keys") == [f"k{i}" for i in range(5)]
+    run(scenario())
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+TruePass 守护进程的轻量命令行前端
+只依赖标准库（不导入 aptos_sdk），把一条命令经 Unix socket 发给 cli.py --daemon 并打印结果
+
+示例：
+    python tpctl.py get_status address=0x1
+    python tpctl.py set_message message=hello
+    python tpctl.py call get_key_value '["k"]'
+    python tpctl.py --no-cache get_key_value key=k
+    python tpctl.py stats
+"""
+
+import json
+import os
+import socket
+import sys
+import tempfile
+
+SOCKET_ENV = "TRUEPASS_SOCKET"
+
+USAGE = """usage: tpctl.py [--socket PATH] [--no-cache] OP [NAME=VALUE ...]
+       tpctl.py [--socket PATH] [--no-cache] call OP [JSON_ARGS]
+
+OP is any ABI function (get_status, set_message, ...) or a daemon command:
+ping, load_account private_key=..., accounts, stats, invalidate_cache, shutdown.
+Values are parsed as JSON when possible, otherwise passed as strings.
+
+When the daemon runs with --cache-size, view results may be served from its
+cache: writes made through the daemon invalidate the affected entries, but
+writes by other clients stay hidden until the cache TTL expires. --no-cache
+(or use_cache=false) reads from the node for this request."""
+
+
+def default_socket_path() -> str:
+    """守护进程默认的 socket 路径（可用 TRUEPASS_SOCKET 环境变量覆盖）"""
+    return os.environ.get(SOCKET_ENV) or os.path.join(tempfile.gettempdir(), f"truepass-{os.getuid()}.sock")
+
+
+def _value(text: str):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def build_request(argv):
+    """把命令行参数转换为一条 JSON 请求"""
+    if not argv:
+        raise ValueError("missing OP")
+    if argv[0] == "call":
+        if len(argv) < 2:
+            raise ValueError("call needs a function name")
+        request = {"op": argv[1]}
+        if len(argv) > 2:
+            request["args"] = json.loads(argv[2])
+        return request
+    request = {"op": argv[0]}
+    for item in argv[1:]:
+        name, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"expected NAME=VALUE, got {item!r}")
+        request[name] = _value(value)
+    return request
+
+
+def send(request: dict, socket_path: str = None, timeout: float = 120.0) -> dict:
+    """发送一条请求并读取一行响应"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path or default_socket_path())
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            if chunk.endswith(b"\n"):
+                break
+    return json.loads(b"".join(chunks))
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    socket_path = None
+    use_cache = True
+    while argv[:1] in (["--socket"], ["--no-cache"]):
+        if argv[0] == "--no-cache":
+            use_cache, argv = False, argv[1:]
+            continue
+        if len(argv) < 2:
+            print(USAGE, file=sys.stderr)
+            return 2
+        socket_path, argv = argv[1], argv[2:]
+    if not argv or argv[0] in ("-h", "--help"):
+        print(USAGE, file=sys.stderr)
+        return 0 if argv else 2
+    try:
+        request = build_request(argv)
+        if not use_cache:
+            request["use_cache"] = False
+    except ValueError as e:
+        print(f"❌ {e}\n{USAGE}", file=sys.stderr)
+        return 2
+    try:
+        response = send(request, socket_path)
+    except OSError as e:
+        print(f"❌ Cannot reach daemon at {socket_path or default_socket_path()}: {e}", file=sys.stderr)
+        print("   Start it with: python cli.py --daemon", file=sys.stderr)
+        return 2
+    if not response.get("ok"):
+        print(f"❌ {response.get('error')}", file=sys.stderr)
+        return 1
+    print(json.dumps(response.get("result"), default=str))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""
+流水线交易提交
+在本地分配序列号并缓存 chain id，每个账户最多保持 N 笔在途交易
+"""
+
+import asyncio
+import contextlib
+import time
+from typing import Optional, Set
+from aptos_sdk.account import Account
+from aptos_sdk.transactions import (
+    RawTransaction,
+    SignedTransaction,
+    TransactionPayload,
+)
+from metrics import Metrics
+from gas import GasEstimator
+from confirmations import ConfirmationPoller
+
+# 每个账户默认允许的在途交易数
+DEFAULT_MAX_IN_FLIGHT = 8
+
+# RestClient 没有 client_config 时使用的默认交易参数
+DEFAULT_MAX_GAS_AMOUNT = 100_000
+DEFAULT_GAS_UNIT_PRICE = 100
+DEFAULT_EXPIRATION_TTL = 600
+
+
+class TransactionPipeline:
+    """
+    单个账户的交易流水线。
+
+    submit() 只负责签名和提交，返回一个在交易确认后完成的 Future，调用方可以
+    稍后再 await 它。序列号在本地递增，提交或确认失败后会在所有在途交易结束后
+    从链上重新同步。
+    """
+
+    def __init__(
+        self,
+        rest_client,
+        account: Account,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        metrics: Optional[Metrics] = None,
+        gas_estimator: Optional[GasEstimator] = None,
+        poller: Optional[ConfirmationPoller] = None,
+    ):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be >= 1")
+        self.rest_client = rest_client
+        self.account = account
+        self.max_in_flight = max_in_flight
+        self.metrics = metrics
+        self.gas_estimator = gas_estimator
+        # 共享确认轮询器；未传入时每笔交易单独调用 wait_for_transaction
+        self.poller = poller
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._lock = asyncio.Lock()
+        self._in_flight: Set[asyncio.Task] = set()
+        self._next_sequence_number: Optional[int] = None
+        self._chain_id: Optional[int] = None
+
+        config = getattr(rest_client, "client_config", None)
+        self.max_gas_amount = getattr(config, "max_gas_amount", DEFAULT_MAX_GAS_AMOUNT)
+        self.gas_unit_price = getattr(config, "gas_unit_price", DEFAULT_GAS_UNIT_PRICE)
+        self.expiration_ttl = getattr(config, "expiration_ttl", DEFAULT_EXPIRATION_TTL)
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    @property
+    def next_sequence_number(self) -> Optional[int]:
+        return self._next_sequence_number
+
+    def _timer(self, operation: str, phase: str):
+        if self.metrics is None:
+            return contextlib.nullcontext()
+        return self.metrics.timer(operation, phase)
+
+    def _record_error(self, operation: str, error: BaseException):
+        if self.metrics is not None:
+            self.metrics.record_error(operation, error)
+
+    def invalidate(self):
+        """标记序列号需要重新同步"""
+        self._next_sequence_number = None
+
+    async def _resync(self, operation: str):
+        """等待在途交易结束后从链上读取序列号"""
+        if self._in_flight:
+            await asyncio.wait(set(self._in_flight))
+        with self._timer(operation, "sequence_number"):
+            if self._chain_id is None:
+                self._chain_id = int(await self.rest_client.chain_id())
+            self._next_sequence_number = int(
+                await self.rest_client.account_sequence_number(self.account.address())
+            )
+
+    def _sign(self, payload: TransactionPayload, sequence_number: int, estimate=None) -> SignedTransaction:
+        raw_transaction = RawTransaction(
+            self.account.address(),
+            sequence_number,
+            payload,
+            self.max_gas_amount,
+            self.gas_unit_price,
+            int(time.time()) + self.expiration_ttl,
+            self._chain_id,
+        )
+        if self.gas_estimator is not None:
+            self.gas_estimator.apply(raw_transaction, estimate)
+        return SignedTransaction(raw_transaction, self.account.sign_transaction(raw_transaction))
+
+    async def submit(self, payload: TransactionPayload) -> asyncio.Future:
+        """提交交易，返回在确认后解析为交易哈希的 Future"""
+        operation = getattr(payload.value, "function", "transaction")
+        if self.metrics is not None:
+            self.metrics.record_call(operation, "write")
+        await self._slots.acquire()
+        try:
+            async with self._lock:
+                if self._next_sequence_number is None:
+                    await self._resync(operation)
+                sequence_number = self._next_sequence_number
+                estimate = None
+                if self.gas_estimator is not None:
+                    with self._timer(operation, "estimate_gas"):
+                        estimate = await self.gas_estimator.estimate(self.rest_client, self.account, payload)
+                with self._timer(operation, "sign"):
+                    signed_transaction = self._sign(payload, sequence_number, estimate)
+                with self._timer(operation, "submit"):
+                    tx_hash = await self.rest_client.submit_bcs_transaction(signed_transaction)
+                # 提交期间若有确认失败触发了重新同步，则保持未同步状态
+                if self._next_sequence_number == sequence_number:
+                    self._next_sequence_number = sequence_number + 1
+        except Exception as e:
+            self._record_error(operation, e)
+            self.invalidate()
+            self._slots.release()
+            raise
+
+        task = asyncio.ensure_future(self._confirm(operation, payload, tx_hash, sequence_number))
+        self._in_flight.add(task)
+        task.add_done_callback(self._on_done)
+        return task
+
+    async def _confirm(self, operation: str, payload: TransactionPayload, tx_hash: str, sequence_number: int) -> str:
+        gas_used = None
+        try:
+            with self._timer(operation, "wait"):
+                if self.poller is not None:
+                    confirmation = await self.poller.wait(tx_hash, self.account.address(), sequence_number)
+                    gas_used = confirmation.gas_used
+                else:
+                    await self.rest_client.wait_for_transaction(tx_hash)
+        except Exception as e:
+            self._record_error(operation, e)
+            self.invalidate()
+            if self.gas_estimator is not None:
+                self.gas_estimator.forget(payload)
+            raise
+        if self.gas_estimator is not None:
+            await self.gas_estimator.after_commit(self.rest_client, payload, tx_hash, gas_used)
+        return tx_hash
+
+    def _on_done(self, task: asyncio.Task):
+        self._in_flight.discard(task)
+        self._slots.release()
+
+    async def drain(self):
+        """等待所有在途交易确认（忽略单笔失败）"""
+        if self._in_flight:
+            await asyncio.wait(set(self._in_flight))
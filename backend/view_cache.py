@@ -0,0 +1,117 @@
+"""
+view 函数结果缓存
+有容量上限的 LRU + TTL 缓存，键为 (函数名, 参数元组)
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# 默认缓存容量与过期时间（秒）
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_CACHE_TTL = 5.0
+
+_MISSING = object()
+
+
+class ViewCache:
+    """LRU + TTL 缓存，记录命中、未命中、淘汰与过期次数"""
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE, ttl: Optional[float] = DEFAULT_CACHE_TTL):
+        if max_size < 1:
+            raise ValueError("max_size must be >= 1")
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, Tuple[Hashable, ...]], Tuple[float, Any]]" = OrderedDict()
+        # 失效代数：clear() 递增全局代数，失效某函数（或其某个键）递增该函数的代数
+        self._generation = 0
+        self._function_generations: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def make_key(function_name: str, arguments) -> Tuple[str, Tuple[Hashable, ...]]:
+        return (function_name, tuple(arguments))
+
+    @staticmethod
+    def make_pinned_key(function_name: str, arguments, ledger_version: int) -> Tuple[Tuple[str, int], Tuple[Hashable, ...]]:
+        """固定账本版本的键：第一项为 (函数名, 版本)"""
+        return ((function_name, ledger_version), tuple(arguments))
+
+    @staticmethod
+    def function_of(key) -> str:
+        return key[0][0] if isinstance(key[0], tuple) else key[0]
+
+    def generation(self, function_name: str) -> int:
+        """函数当前的失效代数；读取前记录，写回时比较，可以发现读取期间发生的失效"""
+        return self._generation + self._function_generations.get(function_name, 0)
+
+    def _bump(self, function_name: str):
+        self._function_generations[function_name] = self._function_generations.get(function_name, 0) + 1
+
+    def get(self, key, default: Any = _MISSING) -> Any:
+        """查找缓存，未命中或已过期时返回 default"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        expires_at, value = entry
+        if expires_at and expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value: Any, ttl: Optional[float] = _MISSING, generation: Optional[int] = None) -> bool:
+        """
+        写入缓存；ttl 为 None 或 0 表示永不过期。传入读取前记录的 generation 时，
+        若此后该函数被失效过则不写入（值可能是失效前读到的旧值），返回 False
+        """
+        if generation is not None and generation != self.generation(self.function_of(key)):
+            return False
+        if ttl is _MISSING:
+            ttl = self.ttl
+        expires_at = time.monotonic() + ttl if ttl else 0.0
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return True
+
+    def invalidate(self, key) -> bool:
+        self._bump(self.function_of(key))
+        return self._entries.pop(key, None) is not None
+
+    def invalidate_function(self, function_name: str) -> int:
+        """删除某个函数的全部缓存项（包括固定账本版本的结果）"""
+        self._bump(function_name)
+        keys = [
+            key for key in self._entries
+            if key[0] == function_name or (isinstance(key[0], tuple) and key[0][0] == function_name)
+        ]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+
+    def clear(self):
+        self._generation += 1
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
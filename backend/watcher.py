@@ -0,0 +1,330 @@
+"""
+状态/消息监视
+监视大量地址的 get_status / get_message，只输出发生变化的值：每轮按版本扫描新上链交易的写集，
+只有 AddressStatusHolder / MessageHolder 被写入或删除的地址才在新版本上重新查询；
+轮询间隔随变化频率自适应
+"""
+
+import asyncio
+import math
+import sys
+import time
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from aptos_sdk.account_address import AccountAddress
+from aptos_sdk.client import ApiError
+from abi import CONTRACT_ADDRESS, MODULE_NAME
+from blockchain_client import TruePassClient, DEFAULT_BATCH_CONCURRENCY
+from endpoint_pool import is_node_failure
+
+MODULE_ID = f"{CONTRACT_ADDRESS}::{MODULE_NAME}"
+
+# 可监视的字段：字段名 -> (view 函数, 保存该字段的资源类型)
+FIELDS = {
+    "status": ("get_status", f"{MODULE_ID}::AddressStatusHolder"),
+    "message": ("get_message", f"{MODULE_ID}::MessageHolder"),
+}
+
+# 轮询间隔范围（秒）；一轮没有变化时间隔按 backoff 放大，有变化时按 backoff 缩小
+DEFAULT_MIN_WATCH_INTERVAL = 0.5
+DEFAULT_MAX_WATCH_INTERVAL = 10.0
+DEFAULT_WATCH_BACKOFF = 1.5
+
+# 按版本列出交易时每页的交易数（节点的上限为 100）
+DEFAULT_SCAN_PAGE_SIZE = 100
+
+# 查询因节点故障失败后的重试等待（秒），每次连续失败翻倍，不超过最大轮询间隔
+DEFAULT_RETRY_DELAY = 1.0
+
+# 查询确定性失败（如地址没有对应资源，view 中止）时记录的值
+MISSING = None
+
+_MISSING = object()
+
+
+def normalize_address(address: Any) -> str:
+    """统一地址格式，使输入与交易写集中的地址可以直接比较"""
+    return str(AccountAddress.from_str_relaxed(str(address)))
+
+
+async def iter_transaction_pages(
+    rest_client, after: int, target: int, page_size: int = DEFAULT_SCAN_PAGE_SIZE
+) -> AsyncIterator[List[dict]]:
+    """
+    按版本逐页列出 (after, target] 内已上链的交易。节点返回的页不满时停止
+    （其余版本尚不能读取）；交易已被裁剪时节点返回 410，以 ApiError 抛出
+    """
+    scanned = after
+    while scanned < target:
+        limit = min(page_size, target - scanned)
+        transactions = await rest_client.transactions(limit=limit, start=scanned + 1)
+        if transactions:
+            scanned = int(transactions[-1]["version"])
+            yield transactions
+        if len(transactions) < limit:
+            break
+
+
+class Change:
+    """
+    一个地址的某个字段在 version 上的新值。initial 表示首次读取（old 为 None）；
+    old / new 为 MISSING 表示当时没有可读的值（资源不存在）
+    """
+
+    __slots__ = ("address", "field", "old", "new", "version", "initial")
+
+    def __init__(self, address: str, field: str, old: Any, new: Any, version: int, initial: bool = False):
+        self.address = address
+        self.field = field
+        self.old = old
+        self.new = new
+        self.version = version
+        self.initial = initial
+
+    def to_json(self) -> dict:
+        return {
+            "address": self.address,
+            "field": self.field,
+            "old": self.old,
+            "new": self.new,
+            "version": self.version,
+            "initial": self.initial,
+        }
+
+    def __repr__(self) -> str:
+        return f"Change({self.address}, {self.field}, {self.old!r} -> {self.new!r}, version={self.version})"
+
+
+class AddressWatcher:
+    """
+    增量监视一组地址的状态与消息。
+
+    第一轮在当前账本版本上查询全部地址作为基线；之后每轮从上次检查的版本之后按版本
+    列出交易，收集写集中被写入或删除的监视字段资源，只在扫描到的最新版本上重新查询
+    这些地址，输出与已知值不同的结果。两轮之间的版本跨度大到扫描交易所需的请求数
+    超过全量查询时，改为全量查询；交易已被节点裁剪时同样如此。查询确定性失败（4xx，
+    如地址没有对应资源）时记为 MISSING，与其他值一样只在写集涉及时重新查询；节点故障
+    等暂时性错误按 retry_delay 指数退避重试。新加入的地址在下一轮查询，默认只建立
+    基线、不输出变化（emit_initial 为 True 时输出 initial 的 Change）。
+    """
+
+    def __init__(
+        self,
+        client: TruePassClient,
+        addresses: Iterable[str] = (),
+        fields: Sequence[str] = ("status", "message"),
+        min_interval: float = DEFAULT_MIN_WATCH_INTERVAL,
+        max_interval: float = DEFAULT_MAX_WATCH_INTERVAL,
+        backoff: float = DEFAULT_WATCH_BACKOFF,
+        page_size: int = DEFAULT_SCAN_PAGE_SIZE,
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        emit_initial: bool = False,
+        retry_delay: float = DEFAULT_RETRY_DELAY,
+    ):
+        unknown = [field for field in fields if field not in FIELDS]
+        if unknown or not fields:
+            raise ValueError(f"fields must be a non-empty subset of {sorted(FIELDS)}")
+        self.client = client
+        self.fields = tuple(dict.fromkeys(fields))
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.page_size = page_size
+        self.concurrency = concurrency
+        self.emit_initial = emit_initial
+        self.retry_delay = retry_delay
+        # 资源类型 -> 字段名，只包含监视的字段
+        self._resources = {FIELDS[field][1]: field for field in self.fields}
+        # 地址 -> {字段: 已知值}
+        self._values: Dict[str, Dict[str, Any]] = {}
+        # 下一轮需要查询的地址与字段（新加入或上次查询失败）
+        self._pending: Dict[str, Set[str]] = {}
+        # 暂时性失败的 (地址, 字段) -> (连续失败次数, 下次重试的 time.monotonic())
+        self._retries: Dict[Tuple[str, str], Tuple[int, float]] = {}
+        # 已检查到的账本版本，None 表示尚未建立基线
+        self.version: Optional[int] = None
+        self.checked_at: Optional[float] = None
+        self.interval = min_interval
+        self.rounds = 0
+        self.scan_requests = 0
+        self.scanned_transactions = 0
+        self.queries = 0
+        self.query_errors = 0
+        self.full_refreshes = 0
+        self.changes = 0
+        self.add(addresses)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, address: str) -> bool:
+        return normalize_address(address) in self._values
+
+    def add(self, addresses: Iterable[str]):
+        """加入要监视的地址，在下一轮查询"""
+        for address in addresses:
+            address = normalize_address(address)
+            if address not in self._values:
+                self._values[address] = {}
+                self._pending[address] = set(self.fields)
+
+    def remove(self, addresses: Iterable[str]):
+        for address in addresses:
+            address = normalize_address(address)
+            self._values.pop(address, None)
+            self._pending.pop(address, None)
+            for field in self.fields:
+                self._retries.pop((address, field), None)
+
+    def values(self, address: str) -> Dict[str, Any]:
+        """地址各字段的已知值（尚未查询到的字段不包含在内）"""
+        return dict(self._values.get(normalize_address(address), {}))
+
+    async def poll(self) -> List[Change]:
+        """检查一轮，返回自上一轮以来发生的变化"""
+        self.rounds += 1
+        target = await self.client.ledger_version()
+        if self.version is None:
+            version, dirty = target, self._everything()
+        elif target <= self.version:
+            version, dirty = self.version, {}
+        elif self._scan_cost(target) > self._refresh_cost():
+            version, dirty = target, self._everything()
+        else:
+            try:
+                version, dirty = await self._scan(target)
+            except ApiError as e:
+                if e.status_code != 410:
+                    raise
+                # 需要的交易已被节点裁剪，无法增量扫描
+                version, dirty = target, self._everything()
+        pending, self._pending, now = self._pending, {}, time.monotonic()
+        for address, fields in pending.items():
+            for field in fields:
+                retry = self._retries.get((address, field))
+                if retry is not None and retry[1] > now:
+                    # 退避中，留到之后的轮次
+                    self._pending.setdefault(address, set()).add(field)
+                else:
+                    dirty.setdefault(address, set()).add(field)
+        changes = await self._query(dirty, version)
+        self.version = version
+        self.checked_at = time.monotonic()
+        if changes:
+            self.interval = max(self.interval / self.backoff, self.min_interval)
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+        self.changes += len(changes)
+        return changes
+
+    async def watch(self) -> AsyncIterator[Change]:
+        """持续轮询并逐个产出变化，直到调用方停止迭代"""
+        while True:
+            try:
+                changes = await self.poll()
+            except Exception as e:
+                print(f"❌ Error polling watched addresses: {e}", file=sys.stderr)
+                changes = []
+                self.interval = min(self.interval * self.backoff, self.max_interval)
+            for change in changes:
+                yield change
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> dict:
+        return {
+            "watched": len(self._values),
+            "version": self.version,
+            "interval": self.interval,
+            "rounds": self.rounds,
+            "scan_requests": self.scan_requests,
+            "scanned_transactions": self.scanned_transactions,
+            "queries": self.queries,
+            "query_errors": self.query_errors,
+            "retrying": len(self._retries),
+            "full_refreshes": self.full_refreshes,
+            "changes": self.changes,
+        }
+
+    def _everything(self) -> Dict[str, Set[str]]:
+        self.full_refreshes += 1
+        return {address: set(self.fields) for address in self._values}
+
+    def _scan_cost(self, target: int) -> int:
+        return math.ceil((target - self.version) / self.page_size)
+
+    def _refresh_cost(self) -> int:
+        return len(self._values) * len(self.fields)
+
+    async def _scan(self, target: int):
+        """扫描 (version, target] 的交易，返回 (扫描到的最新版本, 需要重新查询的地址与字段)"""
+        dirty: Dict[str, Set[str]] = {}
+        scanned = self.version
+        async for transactions in iter_transaction_pages(self.client.client, self.version, target, self.page_size):
+            self.scan_requests += 1
+            self.scanned_transactions += len(transactions)
+            for transaction in transactions:
+                self._collect(transaction, dirty)
+            scanned = int(transactions[-1]["version"])
+        return scanned, dirty
+
+    def _collect(self, transaction: dict, dirty: Dict[str, Set[str]]):
+        for change in transaction.get("changes", ()):
+            kind = change.get("type")
+            if kind == "write_resource":
+                resource = change.get("data", {}).get("type")
+            elif kind == "delete_resource":
+                resource = change.get("resource")
+            else:
+                continue
+            field = self._resources.get(resource)
+            if field is None:
+                continue
+            address = normalize_address(change["address"])
+            if address in self._values:
+                dirty.setdefault(address, set()).add(field)
+
+    def _retry_later(self, address: str, field: str):
+        failures = self._retries.get((address, field), (0, 0.0))[0] + 1
+        delay = min(self.retry_delay * 2 ** (failures - 1), self.max_interval)
+        self._retries[(address, field)] = (failures, time.monotonic() + delay)
+        self._pending.setdefault(address, set()).add(field)
+
+    async def _query(self, dirty: Dict[str, Set[str]], version: int) -> List[Change]:
+        changes = []
+        for field in self.fields:
+            addresses = [address for address, fields in dirty.items() if field in fields]
+            if not addresses:
+                continue
+            self.queries += len(addresses)
+            results = self.client.view_many(
+                FIELDS[field][0],
+                ([address] for address in addresses),
+                self.concurrency,
+                ordered=False,
+                use_cache=False,
+                ledger_version=version,
+            )
+            async for result in results:
+                address = result.args[0]
+                known = self._values.get(address)
+                if known is None:
+                    # 查询期间已被移除
+                    continue
+                if result.ok:
+                    value = result.value
+                elif is_node_failure(result.error):
+                    self.query_errors += 1
+                    self._retry_later(address, field)
+                    continue
+                else:
+                    # 确定性失败：重试也得到同样的结果，直到写集涉及该地址
+                    self.query_errors += 1
+                    value = MISSING
+                self._retries.pop((address, field), None)
+                old = known.get(field, _MISSING)
+                known[field] = value
+                if old is _MISSING:
+                    if self.emit_initial:
+                        changes.append(Change(address, field, None, value, version, initial=True))
+                elif old != value:
+                    changes.append(Change(address, field, old, value, version))
+        return changes
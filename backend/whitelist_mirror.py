@@ -0,0 +1,287 @@
+"""
+本地白名单镜像
+从 get_whitelist 流式加载全部地址，之后按版本扫描新上链交易中成功的白名单增删，
+在本地以微秒级完成 is_whitelisted 判断，并报告镜像落后链上多少
+"""
+
+import asyncio
+import hashlib
+import heapq
+import time
+from typing import Any, List, Optional, Set
+from aptos_sdk.account_address import AccountAddress
+from aptos_sdk.client import ApiError
+from blockchain_client import TruePassClient
+from watcher import MODULE_ID, DEFAULT_SCAN_PAGE_SIZE, iter_transaction_pages
+
+# 每个地址占用的字节数
+ENTRY_SIZE = 32
+
+# Bloom 过滤器每个条目的位数与哈希次数（约 0.8% 误判率，误判时回退到二分查找）
+DEFAULT_BLOOM_BITS_PER_ENTRY = 10
+DEFAULT_BLOOM_HASHES = 7
+
+# 增删暂存集合超过该条目数（或有序数组的 1/64）时合并进有序数组
+DEFAULT_COMPACT_THRESHOLD = 4096
+
+# 两次同步之间的版本跨度超过该值时重新加载整个白名单，而不是逐页扫描交易
+DEFAULT_MAX_SCAN_VERSIONS = 100_000
+
+# 追尾模式的同步间隔（秒）
+DEFAULT_SYNC_INTERVAL = 1.0
+
+# 改变白名单成员的 entry 函数：函数 ID -> (是否加入, 参数是否为地址列表)
+WHITELIST_FUNCTIONS = {
+    f"{MODULE_ID}::add_to_whitelist": (True, False),
+    f"{MODULE_ID}::batch_add_to_whitelist": (True, True),
+    f"{MODULE_ID}::remove_from_whitelist": (False, False),
+    f"{MODULE_ID}::batch_remove_from_whitelist": (False, True),
+}
+
+
+def address_key(address: Any) -> bytes:
+    """地址的 32 字节表示（接受带或不带 0x 的长/短格式字符串、bytes 与 AccountAddress）"""
+    if isinstance(address, (bytes, bytearray)):
+        key = bytes(address)
+    elif isinstance(address, AccountAddress):
+        key = address.address
+    else:
+        text = str(address)
+        if text.startswith(("0x", "0X")):
+            text = text[2:]
+        key = bytes.fromhex(text.rjust(ENTRY_SIZE * 2, "0"))
+    if len(key) != ENTRY_SIZE:
+        raise ValueError(f"address must be {ENTRY_SIZE} bytes: {address!r}")
+    return key
+
+
+class BloomFilter:
+    """固定大小的 Bloom 过滤器，位置由 blake2b 摘要双重哈希得到"""
+
+    def __init__(self, capacity: int, bits_per_entry: int = DEFAULT_BLOOM_BITS_PER_ENTRY, hashes: int = DEFAULT_BLOOM_HASHES):
+        self.size = max(64, capacity * bits_per_entry)
+        self.hashes = hashes
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: bytes):
+        digest = int.from_bytes(hashlib.blake2b(key, digest_size=16).digest(), "little")
+        first, step = digest & 0xFFFFFFFFFFFFFFFF, (digest >> 64) | 1
+        size = self.size
+        return [(first + i * step) % size for i in range(self.hashes)]
+
+    def add(self, key: bytes):
+        bits = self.bits
+        for position in self._positions(key):
+            bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: bytes) -> bool:
+        bits = self.bits
+        for position in self._positions(key):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+class WhitelistMirror:
+    """
+    白名单的本地只读副本。
+
+    地址按 32 字节紧密排列在一个有序 bytes 中（每个地址 32 字节，外加约 1.25 字节的
+    Bloom 过滤器），查询先经过 Bloom 过滤器，可能命中时再二分查找。链上增删先记入
+    两个小集合，累积到阈值后合并进有序数组并重建过滤器，单次更新不需要移动整个数组。
+
+    load() 在固定账本版本上加载 get_whitelist；sync() 扫描此后上链的交易，按版本顺序
+    应用执行成功的 add/remove（含批量）调用，并推进已镜像的版本。跨度过大或交易已被
+    节点裁剪时重新加载。staleness() 报告镜像版本、落后的版本数与距上次同步的时间。
+    """
+
+    def __init__(
+        self,
+        client: TruePassClient,
+        page_size: int = DEFAULT_SCAN_PAGE_SIZE,
+        max_scan_versions: int = DEFAULT_MAX_SCAN_VERSIONS,
+        compact_threshold: int = DEFAULT_COMPACT_THRESHOLD,
+        bloom_bits_per_entry: int = DEFAULT_BLOOM_BITS_PER_ENTRY,
+        bloom_hashes: int = DEFAULT_BLOOM_HASHES,
+    ):
+        self.client = client
+        self.page_size = page_size
+        self.max_scan_versions = max_scan_versions
+        self.compact_threshold = compact_threshold
+        self.bloom_bits_per_entry = bloom_bits_per_entry
+        self.bloom_hashes = bloom_hashes
+        # 有序、无重复的 32 字节地址
+        self._entries = b""
+        self._bloom = BloomFilter(0, bloom_bits_per_entry, bloom_hashes)
+        # 尚未合并进有序数组的增删（两者互斥）
+        self._added: Set[bytes] = set()
+        self._removed: Set[bytes] = set()
+        # 已镜像的账本版本，None 表示尚未加载
+        self.version: Optional[int] = None
+        # 最近一次观察到的链上账本版本与同步完成时间（time.monotonic()）
+        self.ledger_version: Optional[int] = None
+        self.synced_at: Optional[float] = None
+        self.loads = 0
+        self.scan_requests = 0
+        self.scanned_transactions = 0
+        self.applied_changes = 0
+        self.compactions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries) // ENTRY_SIZE + len(self._added) - len(self._removed)
+
+    def __contains__(self, address: Any) -> bool:
+        return self.contains(address)
+
+    def contains(self, address: Any) -> bool:
+        """本地判断地址是否在白名单中（与 is_whitelisted 在镜像版本上的结果一致）"""
+        key = address_key(address)
+        if key in self._removed:
+            return False
+        if key in self._added:
+            return True
+        if key not in self._bloom:
+            return False
+        return self._search(key)
+
+    def _search(self, key: bytes) -> bool:
+        entries = self._entries
+        low, high = 0, len(entries) // ENTRY_SIZE
+        while low < high:
+            middle = (low + high) // 2
+            offset = middle * ENTRY_SIZE
+            probe = entries[offset:offset + ENTRY_SIZE]
+            if probe < key:
+                low = middle + 1
+            elif probe > key:
+                high = middle
+            else:
+                return True
+        return False
+
+    def addresses(self) -> List[str]:
+        """镜像中的全部地址（按字节序）"""
+        self.compact()
+        entries = self._entries
+        return ["0x" + entries[offset:offset + ENTRY_SIZE].hex() for offset in range(0, len(entries), ENTRY_SIZE)]
+
+    async def load(self, ledger_version: Optional[int] = None) -> int:
+        """在指定账本版本（默认当前版本）上加载整个白名单，返回地址数"""
+        if ledger_version is None:
+            ledger_version = await self.client.ledger_version()
+        keys = [address_key(address) async for address in self.client.iter_whitelist(ledger_version)]
+        self._rebuild(sorted(set(keys)))
+        self.version = ledger_version
+        self.ledger_version = max(self.ledger_version or 0, ledger_version)
+        self.synced_at = time.monotonic()
+        self.loads += 1
+        return len(self)
+
+    async def sync(self) -> int:
+        """追赶到链上当前版本，返回本次应用的成员变化数（重新加载时返回地址数）"""
+        target = await self.client.ledger_version()
+        self.ledger_version = target
+        if self.version is None or target - self.version > self.max_scan_versions:
+            return await self.load(target)
+        applied = 0
+        try:
+            async for transactions in iter_transaction_pages(self.client.client, self.version, target, self.page_size):
+                self.scan_requests += 1
+                self.scanned_transactions += len(transactions)
+                for transaction in transactions:
+                    applied += self.apply(transaction)
+                # 每页处理完即推进版本，中途失败时下次从这里继续
+                self.version = int(transactions[-1]["version"])
+        except ApiError as e:
+            if e.status_code != 410:
+                raise
+            # 需要的交易已被节点裁剪，只能重新加载
+            return await self.load(target)
+        if self.version >= target:
+            self.synced_at = time.monotonic()
+        return applied
+
+    async def run(self, sync_interval: float = DEFAULT_SYNC_INTERVAL):
+        """持续同步，直到任务被取消"""
+        while True:
+            try:
+                await self.sync()
+            except Exception as e:
+                print(f"❌ Error syncing whitelist mirror: {e}")
+            await asyncio.sleep(sync_interval)
+
+    def apply(self, transaction: dict) -> int:
+        """应用一笔已上链交易中的白名单增删，返回改变的成员数"""
+        if not transaction.get("success", False):
+            return 0
+        payload = transaction.get("payload") or {}
+        function = WHITELIST_FUNCTIONS.get(payload.get("function"))
+        if function is None:
+            return 0
+        adding, batched = function
+        arguments = payload.get("arguments") or []
+        if not arguments:
+            return 0
+        changed = 0
+        for address in (arguments[0] if batched else arguments[:1]):
+            if self._set(address_key(address), adding):
+                changed += 1
+        self.applied_changes += changed
+        if len(self._added) + len(self._removed) > max(self.compact_threshold, len(self._entries) // ENTRY_SIZE // 64):
+            self.compact()
+        return changed
+
+    def _set(self, key: bytes, present: bool) -> bool:
+        if self.contains(key) == present:
+            return False
+        if present:
+            if key in self._removed:
+                self._removed.discard(key)
+            else:
+                self._added.add(key)
+        elif key in self._added:
+            self._added.discard(key)
+        else:
+            self._removed.add(key)
+        return True
+
+    def compact(self):
+        """把暂存的增删合并进有序数组并重建 Bloom 过滤器"""
+        if not self._added and not self._removed:
+            return
+        entries, removed = self._entries, self._removed
+        slices = (entries[offset:offset + ENTRY_SIZE] for offset in range(0, len(entries), ENTRY_SIZE))
+        kept = (key for key in slices if key not in removed)
+        self._rebuild(list(heapq.merge(kept, sorted(self._added))))
+        self.compactions += 1
+
+    def _rebuild(self, keys: List[bytes]):
+        self._entries = b"".join(keys)
+        self._added, self._removed = set(), set()
+        bloom = BloomFilter(len(keys), self.bloom_bits_per_entry, self.bloom_hashes)
+        for key in keys:
+            bloom.add(key)
+        self._bloom = bloom
+
+    def staleness(self) -> dict:
+        """镜像版本、最近观察到的链上版本、落后的版本数与距上次完整同步的秒数"""
+        lag = None if self.version is None or self.ledger_version is None else max(self.ledger_version - self.version, 0)
+        age = None if self.synced_at is None else time.monotonic() - self.synced_at
+        return {"version": self.version, "ledger_version": self.ledger_version, "lag_versions": lag, "age_seconds": age}
+
+    def is_stale(self, max_age: float) -> bool:
+        """尚未加载，或距上次追赶到链上版本已超过 max_age 秒"""
+        return self.synced_at is None or time.monotonic() - self.synced_at > max_age
+
+    def stats(self) -> dict:
+        return dict(
+            self.staleness(),
+            entries=len(self),
+            pending=len(self._added) + len(self._removed),
+            memory_bytes=len(self._entries) + len(self._bloom.bits),
+            loads=self.loads,
+            scan_requests=self.scan_requests,
+            scanned_transactions=self.scanned_transactions,
+            applied_changes=self.applied_changes,
+            compactions=self.compactions,
+        )
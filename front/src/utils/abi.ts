@@ -1,12 +1,142 @@
 // Auto-generated ABI for truepass contract
-// Generated from: 0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4
+// Generated from: 0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass
 // Network: testnet
 
+export const ABI_HASH = "f68f06703d89fd8558b1a3d865abf905ef1dc253db7ca3e8fa8fdc5238889ebd";
+
 export const ABI = {
   "address": "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4",
   "name": "truepass",
   "friends": [],
   "exposed_functions": [
+    {
+      "name": "add_to_whitelist",
+      "visibility": "public",
+      "is_entry": true,
+      "is_view": false,
+      "generic_type_params": [],
+      "params": [
+        "signer",
+        "address"
+      ],
+      "return": []
+    },
+    {
+      "name": "batch_add_to_whitelist",
+      "visibility": "public",
+      "is_entry": true,
+      "is_view": false,
+      "generic_type_params": [],
+      "params": [
+        "signer",
+        "vector<address>"
+      ],
+      "return": []
+    },
+    {
+      "name": "batch_delete_key",
+      "visibility": "public",
+      "is_entry": true,
+      "is_view": false,
+      "generic_type_params": [],
+      "params": [
+        "signer",
+        "vector<0x1::string::String>"
+      ],
+      "return": []
+    },
+    {
+      "name": "batch_remove_from_whitelist",
+      "visibility": "public",
+      "is_entry": true,
+      "is_view": false,
+      "generic_type_params": [],
+      "params": [
+        "signer",
+        "vector<address>"
+      ],
+      "return": []
+    },
+    {
+      "name": "batch_set_key_value",
+      "visibility": "public",
+      "is_entry": true,
+      "is_view": false,
+      "generic_type_params": [],
+      "params": [
+        "signer",
+        "vector<0x1::string::String>",
+        "vector<0x1::string::String>"
+      ],
+      "return": []
+    },
+    {
+      "name": "delete_key",
+      "visibility": "public",
+      "is_entry": true,
+      "is_view": false,
+      "generic_type_params": [],
+      "params": [
+        "signer",
+        "0x1::string::String"
+      ],
+      "return": []
+    },
+    {
+      "name": "get_all_keys",
+      "visibility": "public",
+      "is_entry": false,
+      "is_view": true,
+      "generic_type_params": [],
+      "params": [],
+      "return": [
+        "vector<0x1::string::String>"
+      ]
+    },
+    {
+      "name": "get_entries_page",
+      "visibility": "public",
+      "is_entry": false,
+      "is_view": true,
+      "generic_type_params": [],
+      "params": [
+        "u64",
+        "u64"
+      ],
+      "return": [
+        "vector<0x1::string::String>",
+        "vector<0x1::string::String>",
+        "u64"
+      ]
+    },
+    {
+      "name": "get_key_value",
+      "visibility": "public",
+      "is_entry": false,
+      "is_view": true,
+      "generic_type_params": [],
+      "params": [
+        "0x1::string::String"
+      ],
+      "return": [
+        "0x1::string::String"
+      ]
+    },
+    {
+      "name": "get_keys_page",
+      "visibility": "public",
+      "is_entry": false,
+      "is_view": true,
+      "generic_type_params": [],
+      "params": [
+        "u64",
+        "u64"
+      ],
+      "return": [
+        "vector<0x1::string::String>",
+        "u64"
+      ]
+    },
     {
       "name": "get_message",
       "visibility": "public",
@@ -44,6 +174,43 @@ export const ABI = {
         "bool"
       ]
     },
+    {
+      "name": "get_whitelist",
+      "visibility": "public",
+      "is_entry": false,
+      "is_view": true,
+      "generic_type_params": [],
+      "params": [],
+      "return": [
+        "vector<address>"
+      ]
+    },
+    {
+      "name": "get_whitelist_page",
+      "visibility": "public",
+      "is_entry": false,
+      "is_view": true,
+      "generic_type_params": [],
+      "params": [
+        "u64",
+        "u64"
+      ],
+      "return": [
+        "vector<address>",
+        "u64"
+      ]
+    },
+    {
+      "name": "init_database",
+      "visibility": "public",
+      "is_entry": true,
+      "is_view": false,
+      "generic_type_params": [],
+      "params": [
+        "signer"
+      ],
+      "return": []
+    },
     {
       "name": "init_status",
       "visibility": "public",
@@ -55,6 +222,104 @@ export const ABI = {
       ],
       "return": []
     },
+    {
+      "name": "init_whitelist",
+      "visibility": "public",
+      "is_entry": true,
+      "is_view": false,
+      "generic_type_params": [],
+      "params": [
+        "signer"
+      ],
+      "return": []
+    },
+    {
+      "name": "is_whitelisted",
+      "visibility": "public",
+      "is_entry": false,
+      "is_view": true,
+      "generic_type_params": [],
+      "params": [
+        "address"
+      ],
+      "return": [
+        "bool"
+      ]
+    },
+    {
+      "name": "key_exists",
+      "visibility": "public",
+      "is_entry": false,
+      "is_view": true,
+      "generic_type_params": [],
+      "params": [
+        "0x1::string::String"
+      ],
+      "return": [
+        "bool"
+      ]
+    },
+    {
+      "name": "migrate_database",
+      "visibility": "public",
+      "is_entry": true,
+      "is_view": false,
+      "generic_type_params": [],
+      "params": [
+        "signer",
+        "u64"
+      ],
+      "return": []
+    },
+    {
+      "name": "migrate_whitelist",
+      "visibility": "public",
+      "is_entry": true,
+      "is_view": false,
+      "generic_type_params": [],
+      "params": [
+        "signer",
+        "u64"
+      ],
+      "return": []
+    },
+    {
+      "name": "pending_migration",
+      "visibility": "public",
+      "is_entry": false,
+      "is_view": true,
+      "generic_type_params": [],
+      "params": [],
+      "return": [
+        "u64",
+        "u64"
+      ]
+    },
+    {
+      "name": "remove_from_whitelist",
+      "visibility": "public",
+      "is_entry": true,
+      "is_view": false,
+      "generic_type_params": [],
+      "params": [
+        "signer",
+        "address"
+      ],
+      "return": []
+    },
+    {
+      "name": "set_key_value",
+      "visibility": "public",
+      "is_entry": true,
+      "is_view": false,
+      "generic_type_params": [],
+      "params": [
+        "signer",
+        "0x1::string::String",
+        "0x1::string::String"
+      ],
+      "return": []
+    },
     {
       "name": "set_message",
       "visibility": "public",
@@ -107,6 +372,136 @@ export const ABI = {
         }
       ]
     },
+    {
+      "name": "DatabaseChange",
+      "is_native": false,
+      "is_event": true,
+      "abilities": [
+        "drop",
+        "store"
+      ],
+      "generic_type_params": [],
+      "fields": [
+        {
+          "name": "account",
+          "type": "address"
+        },
+        {
+          "name": "key",
+          "type": "0x1::string::String"
+        },
+        {
+          "name": "old_value",
+          "type": "0x1::string::String"
+        },
+        {
+          "name": "new_value",
+          "type": "0x1::string::String"
+        }
+      ]
+    },
+    {
+      "name": "IndexedValue",
+      "is_native": false,
+      "is_event": false,
+      "abilities": [
+        "drop",
+        "store"
+      ],
+      "generic_type_params": [],
+      "fields": [
+        {
+          "name": "value",
+          "type": "0x1::string::String"
+        },
+        {
+          "name": "position",
+          "type": "u64"
+        }
+      ]
+    },
+    {
+      "name": "KeyDeleted",
+      "is_native": false,
+      "is_event": true,
+      "abilities": [
+        "drop",
+        "store"
+      ],
+      "generic_type_params": [],
+      "fields": [
+        {
+          "name": "account",
+          "type": "address"
+        },
+        {
+          "name": "key",
+          "type": "0x1::string::String"
+        },
+        {
+          "name": "old_value",
+          "type": "0x1::string::String"
+        }
+      ]
+    },
+    {
+      "name": "KeyValueDatabase",
+      "is_native": false,
+      "is_event": false,
+      "abilities": [
+        "key"
+      ],
+      "generic_type_params": [],
+      "fields": [
+        {
+          "name": "data",
+          "type": "vector<0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass::KeyValuePair>"
+        }
+      ]
+    },
+    {
+      "name": "KeyValueIndex",
+      "is_native": false,
+      "is_event": false,
+      "abilities": [
+        "key"
+      ],
+      "generic_type_params": [],
+      "fields": [
+        {
+          "name": "entries",
+          "type": "0x1::table::Table<0x1::string::String, 0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass::IndexedValue>"
+        },
+        {
+          "name": "keys",
+          "type": "0x1::table::Table<u64, 0x1::string::String>"
+        },
+        {
+          "name": "length",
+          "type": "u64"
+        }
+      ]
+    },
+    {
+      "name": "KeyValuePair",
+      "is_native": false,
+      "is_event": false,
+      "abilities": [
+        "drop",
+        "store"
+      ],
+      "generic_type_params": [],
+      "fields": [
+        {
+          "name": "key",
+          "type": "0x1::string::String"
+        },
+        {
+          "name": "value",
+          "type": "0x1::string::String"
+        }
+      ]
+    },
     {
       "name": "MessageChange",
       "is_native": false,
@@ -145,6 +540,44 @@ export const ABI = {
           "type": "0x1::string::String"
         }
       ]
+    },
+    {
+      "name": "Whitelist",
+      "is_native": false,
+      "is_event": false,
+      "abilities": [
+        "key"
+      ],
+      "generic_type_params": [],
+      "fields": [
+        {
+          "name": "allowed_addresses",
+          "type": "vector<address>"
+        }
+      ]
+    },
+    {
+      "name": "WhitelistIndex",
+      "is_native": false,
+      "is_event": false,
+      "abilities": [
+        "key"
+      ],
+      "generic_type_params": [],
+      "fields": [
+        {
+          "name": "positions",
+          "type": "0x1::table::Table<address, u64>"
+        },
+        {
+          "name": "members",
+          "type": "0x1::table::Table<u64, address>"
+        },
+        {
+          "name": "length",
+          "type": "u64"
+        }
+      ]
     }
   ]
 } as const;
@@ -153,23 +586,76 @@ export const ABI = {
 export const CONTRACT_ADDRESS = "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4";
 export const MODULE_NAME = "truepass";
 
+export const MODULES = {
+  "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810ca0d4::truepass": ABI,
+} as const;
+
 // Type definitions
 export type ABIFunction = typeof ABI.exposed_functions[number];
 export type ABIStruct = typeof ABI.structs[number];
 
+// Lookup tables built at generation time
+export const FUNCTIONS = {
+  "add_to_whitelist": ABI.exposed_functions[0],
+  "batch_add_to_whitelist": ABI.exposed_functions[1],
+  "batch_delete_key": ABI.exposed_functions[2],
+  "batch_remove_from_whitelist": ABI.exposed_functions[3],
+  "batch_set_key_value": ABI.exposed_functions[4],
+  "delete_key": ABI.exposed_functions[5],
+  "get_all_keys": ABI.exposed_functions[6],
+  "get_entries_page": ABI.exposed_functions[7],
+  "get_key_value": ABI.exposed_functions[8],
+  "get_keys_page": ABI.exposed_functions[9],
+  "get_message": ABI.exposed_functions[10],
+  "get_number": ABI.exposed_functions[11],
+  "get_status": ABI.exposed_functions[12],
+  "get_whitelist": ABI.exposed_functions[13],
+  "get_whitelist_page": ABI.exposed_functions[14],
+  "init_database": ABI.exposed_functions[15],
+  "init_status": ABI.exposed_functions[16],
+  "init_whitelist": ABI.exposed_functions[17],
+  "is_whitelisted": ABI.exposed_functions[18],
+  "key_exists": ABI.exposed_functions[19],
+  "migrate_database": ABI.exposed_functions[20],
+  "migrate_whitelist": ABI.exposed_functions[21],
+  "pending_migration": ABI.exposed_functions[22],
+  "remove_from_whitelist": ABI.exposed_functions[23],
+  "set_key_value": ABI.exposed_functions[24],
+  "set_message": ABI.exposed_functions[25],
+  "set_status_true": ABI.exposed_functions[26],
+  "update_status": ABI.exposed_functions[27],
+} as const;
+
+export const STRUCTS = {
+  "AddressStatusHolder": ABI.structs[0],
+  "DatabaseChange": ABI.structs[1],
+  "IndexedValue": ABI.structs[2],
+  "KeyDeleted": ABI.structs[3],
+  "KeyValueDatabase": ABI.structs[4],
+  "KeyValueIndex": ABI.structs[5],
+  "KeyValuePair": ABI.structs[6],
+  "MessageChange": ABI.structs[7],
+  "MessageHolder": ABI.structs[8],
+  "Whitelist": ABI.structs[9],
+  "WhitelistIndex": ABI.structs[10],
+} as const;
+
+export const VIEW_FUNCTION_NAMES: ReadonlySet<string> = new Set(["get_all_keys", "get_entries_page", "get_key_value", "get_keys_page", "get_message", "get_number", "get_status", "get_whitelist", "get_whitelist_page", "is_whitelisted", "key_exists", "pending_migration"]);
+export const ENTRY_FUNCTION_NAMES: ReadonlySet<string> = new Set(["add_to_whitelist", "batch_add_to_whitelist", "batch_delete_key", "batch_remove_from_whitelist", "batch_set_key_value", "delete_key", "init_database", "init_status", "init_whitelist", "migrate_database", "migrate_whitelist", "remove_from_whitelist", "set_key_value", "set_message", "set_status_true", "update_status"]);
+
 // Helper functions
 export function getFunctionByName(name: string): ABIFunction | undefined {
-  return ABI.exposed_functions.find(func => func.name === name);
+  return (FUNCTIONS as Record<string, ABIFunction>)[name];
 }
 
 export function getStructByName(name: string): ABIStruct | undefined {
-  return ABI.structs.find(struct => struct.name === name);
+  return (STRUCTS as Record<string, ABIStruct>)[name];
 }
 
 export function getViewFunctions(): ABIFunction[] {
-  return ABI.exposed_functions.filter(func => func.is_view);
+  return [...VIEW_FUNCTION_NAMES].map(name => (FUNCTIONS as Record<string, ABIFunction>)[name]);
 }
 
 export function getEntryFunctions(): ABIFunction[] {
-  return ABI.exposed_functions.filter(func => func.is_entry);
+  return [...ENTRY_FUNCTION_NAMES].map(name => (FUNCTIONS as Record<string, ABIFunction>)[name]);
 }
@@ -5,6 +5,7 @@ module truepass::test_truepass {
     use std::string;
     use std::vector;
     use aptos_framework::account;
+    use aptos_std::string_utils;
 
     #[test(deployer = @truepass)]
     fun test_whitelist_initialization(deployer: signer) {
@@ -367,4 +368,329 @@ module truepass::test_truepass {
         // Non-deployer should not be able to initialize database
         truepass::init_database(user1);
     }
+
+    #[test(deployer = @truepass)]
+    fun test_batch_whitelist(deployer: signer) {
+        let deployer_addr = signer::address_of(&deployer);
+        truepass::init_whitelist(deployer);
+
+        // Add three addresses (one duplicate) in one call
+        let addrs = vector[@0x1, @0x2, @0x3, @0x2];
+        let deployer2 = account::create_signer_for_test(deployer_addr);
+        truepass::batch_add_to_whitelist(deployer2, addrs);
+        assert!(vector::length(&truepass::get_whitelist()) == 3, 1);
+        assert!(truepass::is_whitelisted(@0x3), 2);
+
+        // Remove two of them
+        let deployer3 = account::create_signer_for_test(deployer_addr);
+        truepass::batch_remove_from_whitelist(deployer3, vector[@0x1, @0x3]);
+        let whitelist = truepass::get_whitelist();
+        assert!(whitelist == vector[@0x2], 3);
+    }
+
+    #[test(user1 = @0x123)]
+    #[expected_failure(abort_code = 327681, location = truepass::truepass)]
+    fun test_unauthorized_batch_whitelist(user1: signer) {
+        truepass::batch_add_to_whitelist(user1, vector[@0x123]);
+    }
+
+    #[test(deployer = @truepass)]
+    #[expected_failure(abort_code = 393218, location = truepass::truepass)]
+    fun test_batch_remove_missing_address(deployer: signer) {
+        let deployer_addr = signer::address_of(&deployer);
+        truepass::init_whitelist(deployer);
+        let deployer2 = account::create_signer_for_test(deployer_addr);
+        truepass::batch_add_to_whitelist(deployer2, vector[@0x1]);
+
+        // @0x2 was never added, so the whole batch aborts
+        let deployer3 = account::create_signer_for_test(deployer_addr);
+        truepass::batch_remove_from_whitelist(deployer3, vector[@0x1, @0x2]);
+    }
+
+    #[test(deployer = @truepass)]
+    fun test_batch_set_and_delete(deployer: signer) {
+        let user1_addr = @0x123;
+        let deployer_addr = signer::address_of(&deployer);
+
+        // Setup
+        truepass::init_whitelist(deployer);
+        
+        let deployer2 = account::create_signer_for_test(deployer_addr);
+        truepass::add_to_whitelist(deployer2, user1_addr);
+        
+        let deployer3 = account::create_signer_for_test(deployer_addr);
+        truepass::init_database(deployer3);
+
+        // Set three pairs; the repeated key keeps its last value
+        let keys = vector[string::utf8(b"key1"), string::utf8(b"key2"), string::utf8(b"key1")];
+        let values = vector[string::utf8(b"a"), string::utf8(b"b"), string::utf8(b"c")];
+        let user1 = account::create_signer_for_test(user1_addr);
+        truepass::batch_set_key_value(user1, keys, values);
+
+        assert!(vector::length(&truepass::get_all_keys()) == 2, 1);
+        assert!(truepass::get_key_value(string::utf8(b"key1")) == string::utf8(b"c"), 2);
+        assert!(truepass::get_key_value(string::utf8(b"key2")) == string::utf8(b"b"), 3);
+
+        // Delete both keys in one call
+        let user1_2 = account::create_signer_for_test(user1_addr);
+        truepass::batch_delete_key(user1_2, vector[string::utf8(b"key1"), string::utf8(b"key2")]);
+        assert!(vector::length(&truepass::get_all_keys()) == 0, 4);
+    }
+
+    #[test(deployer = @truepass)]
+    #[expected_failure(abort_code = 65540, location = truepass::truepass)]
+    fun test_batch_set_length_mismatch(deployer: signer) {
+        let user1_addr = @0x123;
+        let deployer_addr = signer::address_of(&deployer);
+
+        // Setup
+        truepass::init_whitelist(deployer);
+        
+        let deployer2 = account::create_signer_for_test(deployer_addr);
+        truepass::add_to_whitelist(deployer2, user1_addr);
+        
+        let deployer3 = account::create_signer_for_test(deployer_addr);
+        truepass::init_database(deployer3);
+
+        let user1 = account::create_signer_for_test(user1_addr);
+        truepass::batch_set_key_value(user1, vector[string::utf8(b"key1")], vector[]);
+    }
+
+    #[test(deployer = @truepass)]
+    #[expected_failure(abort_code = 327683, location = truepass::truepass)]
+    fun test_non_whitelisted_cannot_batch_write(deployer: signer) {
+        let deployer_addr = signer::address_of(&deployer);
+        truepass::init_whitelist(deployer);
+        let deployer2 = account::create_signer_for_test(deployer_addr);
+        truepass::init_database(deployer2);
+
+        let user2 = account::create_signer_for_test(@0x456);
+        truepass::batch_set_key_value(user2, vector[string::utf8(b"key1")], vector[string::utf8(b"a")]);
+    }
+
+    #[test(deployer = @truepass)]
+    fun test_paginated_views(deployer: signer) {
+        let user1_addr = @0x123;
+        let deployer_addr = signer::address_of(&deployer);
+
+        // Setup
+        truepass::init_whitelist(deployer);
+        
+        let deployer2 = account::create_signer_for_test(deployer_addr);
+        truepass::batch_add_to_whitelist(deployer2, vector[user1_addr, @0x1, @0x2]);
+        
+        let deployer3 = account::create_signer_for_test(deployer_addr);
+        truepass::init_database(deployer3);
+
+        let keys = vector[string::utf8(b"k1"), string::utf8(b"k2"), string::utf8(b"k3")];
+        let values = vector[string::utf8(b"v1"), string::utf8(b"v2"), string::utf8(b"v3")];
+        let user1 = account::create_signer_for_test(user1_addr);
+        truepass::batch_set_key_value(user1, keys, values);
+
+        // Walk the keys two at a time
+        let (page, total) = truepass::get_keys_page(0, 2);
+        assert!(total == 3, 1);
+        assert!(page == vector[string::utf8(b"k1"), string::utf8(b"k2")], 2);
+        let (page, total) = truepass::get_keys_page(2, 2);
+        assert!(total == 3, 3);
+        assert!(page == vector[string::utf8(b"k3")], 4);
+        let (page, _) = truepass::get_keys_page(3, 2);
+        assert!(vector::length(&page) == 0, 5);
+
+        // Entries carry the matching values
+        let (page_keys, page_values, _) = truepass::get_entries_page(1, 100);
+        assert!(page_keys == vector[string::utf8(b"k2"), string::utf8(b"k3")], 6);
+        assert!(page_values == vector[string::utf8(b"v2"), string::utf8(b"v3")], 7);
+
+        // Whitelist pages
+        let (addrs, total) = truepass::get_whitelist_page(1, 10);
+        assert!(total == 3, 8);
+        assert!(addrs == vector[@0x1, @0x2], 9);
+    }
+
+    #[test]
+    fun test_paginated_views_before_init() {
+        let (keys, total) = truepass::get_keys_page(0, 10);
+        assert!(vector::length(&keys) == 0 && total == 0, 1);
+        let (addrs, total) = truepass::get_whitelist_page(0, 10);
+        assert!(vector::length(&addrs) == 0 && total == 0, 2);
+    }
+
+    #[test(deployer = @truepass)]
+    fun test_removal_keeps_pages_dense(deployer: signer) {
+        let user1_addr = @0x123;
+        let deployer_addr = signer::address_of(&deployer);
+
+        // Setup
+        truepass::init_whitelist(deployer);
+
+        let deployer2 = account::create_signer_for_test(deployer_addr);
+        truepass::batch_add_to_whitelist(deployer2, vector[user1_addr, @0x1, @0x2, @0x3]);
+
+        // Removing from the middle moves the last address into the gap
+        let deployer3 = account::create_signer_for_test(deployer_addr);
+        truepass::remove_from_whitelist(deployer3, @0x1);
+        assert!(truepass::get_whitelist() == vector[user1_addr, @0x3, @0x2], 1);
+
+        // The moved address can still be found and removed
+        let deployer4 = account::create_signer_for_test(deployer_addr);
+        truepass::remove_from_whitelist(deployer4, @0x3);
+        assert!(truepass::get_whitelist() == vector[user1_addr, @0x2], 2);
+        assert!(!truepass::is_whitelisted(@0x3), 3);
+
+        let deployer5 = account::create_signer_for_test(deployer_addr);
+        truepass::init_database(deployer5);
+
+        let keys = vector[string::utf8(b"k1"), string::utf8(b"k2"), string::utf8(b"k3")];
+        let values = vector[string::utf8(b"v1"), string::utf8(b"v2"), string::utf8(b"v3")];
+        let user1 = account::create_signer_for_test(user1_addr);
+        truepass::batch_set_key_value(user1, keys, values);
+
+        let user1_2 = account::create_signer_for_test(user1_addr);
+        truepass::delete_key(user1_2, string::utf8(b"k1"));
+        let (page_keys, page_values, total) = truepass::get_entries_page(0, 10);
+        assert!(total == 2, 4);
+        assert!(page_keys == vector[string::utf8(b"k3"), string::utf8(b"k2")], 5);
+        assert!(page_values == vector[string::utf8(b"v3"), string::utf8(b"v2")], 6);
+
+        let user1_3 = account::create_signer_for_test(user1_addr);
+        truepass::delete_key(user1_3, string::utf8(b"k3"));
+        assert!(truepass::get_all_keys() == vector[string::utf8(b"k2")], 7);
+        assert!(truepass::get_key_value(string::utf8(b"k2")) == string::utf8(b"v2"), 8);
+    }
+
+    #[test(deployer = @truepass)]
+    fun test_migration_in_chunks(deployer: signer) {
+        let user1_addr = @0x123;
+        let deployer_addr = signer::address_of(&deployer);
+
+        // State as left by the vector-backed version of the module
+        let keys = vector[string::utf8(b"k1"), string::utf8(b"k2"), string::utf8(b"k3")];
+        let values = vector[string::utf8(b"v1"), string::utf8(b"v2"), string::utf8(b"v3")];
+        truepass::init_legacy_for_test(&deployer, vector[user1_addr, @0x1, @0x2], keys, values);
+
+        // Reads see the legacy data before anything is migrated
+        assert!(truepass::is_whitelisted(@0x2), 1);
+        assert!(truepass::get_key_value(string::utf8(b"k3")) == string::utf8(b"v3"), 2);
+        let (whitelist_pending, database_pending) = truepass::pending_migration();
+        assert!(whitelist_pending == 3 && database_pending == 3, 3);
+
+        // Migrate two items at a time; order and contents are preserved throughout
+        let deployer2 = account::create_signer_for_test(deployer_addr);
+        truepass::migrate_whitelist(deployer2, 2);
+        let deployer3 = account::create_signer_for_test(deployer_addr);
+        truepass::migrate_database(deployer3, 2);
+        let (whitelist_pending, database_pending) = truepass::pending_migration();
+        assert!(whitelist_pending == 1 && database_pending == 1, 4);
+        assert!(truepass::get_whitelist() == vector[user1_addr, @0x1, @0x2], 5);
+        assert!(truepass::get_all_keys() == keys, 6);
+        let (page, total) = truepass::get_keys_page(1, 2);
+        assert!(total == 3 && page == vector[string::utf8(b"k2"), string::utf8(b"k3")], 7);
+
+        let deployer4 = account::create_signer_for_test(deployer_addr);
+        truepass::migrate_whitelist(deployer4, 2);
+        let deployer5 = account::create_signer_for_test(deployer_addr);
+        truepass::migrate_database(deployer5, 2);
+        let (whitelist_pending, database_pending) = truepass::pending_migration();
+        assert!(whitelist_pending == 0 && database_pending == 0, 8);
+        assert!(truepass::get_whitelist() == vector[user1_addr, @0x1, @0x2], 9);
+        let (page_keys, page_values, _) = truepass::get_entries_page(0, 10);
+        assert!(page_keys == keys && page_values == values, 10);
+
+        // Further calls are no-ops
+        let deployer6 = account::create_signer_for_test(deployer_addr);
+        truepass::migrate_database(deployer6, 2);
+        assert!(vector::length(&truepass::get_all_keys()) == 3, 11);
+    }
+
+    #[test(deployer = @truepass)]
+    fun test_writes_during_migration(deployer: signer) {
+        let user1_addr = @0x123;
+        let deployer_addr = signer::address_of(&deployer);
+
+        let keys = vector[string::utf8(b"k1"), string::utf8(b"k2")];
+        let values = vector[string::utf8(b"v1"), string::utf8(b"v2")];
+        truepass::init_legacy_for_test(&deployer, vector[user1_addr, @0x1], keys, values);
+
+        // Creating the indexes without moving anything yet
+        let deployer2 = account::create_signer_for_test(deployer_addr);
+        truepass::migrate_whitelist(deployer2, 0);
+        let deployer3 = account::create_signer_for_test(deployer_addr);
+        truepass::migrate_database(deployer3, 0);
+
+        // Updating a legacy key moves it into the index
+        let user1 = account::create_signer_for_test(user1_addr);
+        truepass::set_key_value(user1, string::utf8(b"k2"), string::utf8(b"new"));
+        let (_, database_pending) = truepass::pending_migration();
+        assert!(database_pending == 1, 1);
+        assert!(truepass::get_key_value(string::utf8(b"k2")) == string::utf8(b"new"), 2);
+        assert!(vector::length(&truepass::get_all_keys()) == 2, 3);
+
+        // Deleting a legacy key and removing a legacy address work without migrating them
+        let user1_2 = account::create_signer_for_test(user1_addr);
+        truepass::delete_key(user1_2, string::utf8(b"k1"));
+        assert!(!truepass::key_exists(string::utf8(b"k1")), 4);
+        let deployer4 = account::create_signer_for_test(deployer_addr);
+        truepass::remove_from_whitelist(deployer4, @0x1);
+        assert!(truepass::get_whitelist() == vector[user1_addr], 5);
+
+        // Re-adding a legacy address does not duplicate it
+        let deployer5 = account::create_signer_for_test(deployer_addr);
+        truepass::add_to_whitelist(deployer5, user1_addr);
+        assert!(truepass::get_whitelist() == vector[user1_addr], 6);
+        let (whitelist_pending, database_pending) = truepass::pending_migration();
+        assert!(whitelist_pending == 0 && database_pending == 0, 7);
+    }
+
+    #[test(user1 = @0x123)]
+    #[expected_failure(abort_code = 327681, location = truepass::truepass)]
+    fun test_unauthorized_migration(user1: signer) {
+        truepass::migrate_database(user1, 10);
+    }
+
+    #[test(deployer = @truepass)]
+    fun test_repeated_lookups_with_many_keys(deployer: signer) {
+        // Checks that reads and overwrites of one key stay correct with many keys stored
+        // and that overwriting does not grow the index. It does not measure cost: unit
+        // tests cannot read gas, so the O(1) lookup claim is UNVERIFIED. To check it,
+        // compare gas_used of simulated set_key_value / key_exists transactions against
+        // a localnet store holding e.g. 100 and 10_000 keys; the two should match.
+        let size = 500;
+        let user1_addr = @0x123;
+        let deployer_addr = signer::address_of(&deployer);
+
+        // Setup
+        truepass::init_whitelist(deployer);
+
+        let deployer2 = account::create_signer_for_test(deployer_addr);
+        truepass::add_to_whitelist(deployer2, user1_addr);
+
+        let deployer3 = account::create_signer_for_test(deployer_addr);
+        truepass::init_database(deployer3);
+
+        let keys = vector::empty<string::String>();
+        let values = vector::empty<string::String>();
+        let i = 0;
+        while (i < size) {
+            vector::push_back(&mut keys, string_utils::to_string(&i));
+            vector::push_back(&mut values, string::utf8(b"v"));
+            i = i + 1;
+        };
+        let user1 = account::create_signer_for_test(user1_addr);
+        truepass::batch_set_key_value(user1, keys, values);
+
+        // Repeatedly read and overwrite the most recently inserted key
+        let last = string_utils::to_string(&(size - 1));
+        let i = 0;
+        while (i < size) {
+            assert!(truepass::key_exists(last), 1);
+            assert!(truepass::is_whitelisted(user1_addr), 2);
+            let user1_2 = account::create_signer_for_test(user1_addr);
+            truepass::set_key_value(user1_2, last, string::utf8(b"w"));
+            i = i + 1;
+        };
+        assert!(truepass::get_key_value(last) == string::utf8(b"w"), 3);
+        let (_, total) = truepass::get_keys_page(0, 1);
+        assert!(total == size, 4);
+    }
 }
\ No newline at end of file
@@ -1,16 +1,19 @@
 module truepass::truepass {
     use std::error;
+    use std::option::{Self, Option};
     use std::signer;
     use std::string;
     use aptos_framework::event;
+    use aptos_std::table::{Self, Table};
     use std::vector;
 
-    /// Resource to store the whitelist
+    /// Legacy vector-backed whitelist. Kept so existing deployments stay upgrade-compatible;
+    /// `migrate_whitelist` drains it into `WhitelistIndex` and deletes it once empty.
     struct Whitelist has key {
         allowed_addresses: vector<address>,
     }
 
-    /// Resource for key-value database
+    /// Legacy vector-backed key-value database, drained by `migrate_database`.
     struct KeyValueDatabase has key {
         data: vector<KeyValuePair>,
     }
@@ -21,6 +24,28 @@ module truepass::truepass {
         value: string::String,
     }
 
+    /// Table-backed whitelist with constant-time membership checks, inserts and removals.
+    /// `members` holds the addresses at dense indices [0, length) so they can be paginated;
+    /// `positions` maps each address back to its index. Removal moves the last member into the gap.
+    struct WhitelistIndex has key {
+        positions: Table<address, u64>,
+        members: Table<u64, address>,
+        length: u64,
+    }
+
+    /// Table-backed key-value database, laid out like `WhitelistIndex`.
+    struct KeyValueIndex has key {
+        entries: Table<string::String, IndexedValue>,
+        keys: Table<u64, string::String>,
+        length: u64,
+    }
+
+    /// Value of a key in `KeyValueIndex` and the key's index in `keys`
+    struct IndexedValue has store, drop {
+        value: string::String,
+        position: u64,
+    }
+
 
     /// Event for database changes
     #[event]
@@ -31,204 +56,545 @@ module truepass::truepass {
         new_value: string::String,
     }
 
+    /// Event for deleted keys, so a delete is never confused with setting a key to ""
+    #[event]
+    struct KeyDeleted has drop, store {
+        account: address,
+        key: string::String,
+        old_value: string::String,
+    }
+
     /// Permission denied error
     const EPERMISSION_DENIED: u64 = 1;
     /// Key not found error
     const EKEY_NOT_FOUND: u64 = 2;
     /// Address not in whitelist
     const ENOT_WHITELISTED: u64 = 3;
+    /// Batch argument vectors have different lengths
+    const ELENGTH_MISMATCH: u64 = 4;
+
+    /// Maximum number of items returned by one page of a paginated view
+    const MAX_PAGE_SIZE: u64 = 1000;
 
 
     /// Initialize the whitelist (only callable by the deployer)
     public entry fun init_whitelist(account: signer) {
         let account_addr = signer::address_of(&account);
         assert!(account_addr == @truepass, error::permission_denied(EPERMISSION_DENIED));
-        move_to(&account, Whitelist { allowed_addresses: vector::empty() });
+        move_to(&account, new_whitelist_index());
     }
 
     /// Add an address to the whitelist (only callable by the deployer)
-    public entry fun add_to_whitelist(account: signer, addr: address) acquires Whitelist {
+    public entry fun add_to_whitelist(account: signer, addr: address) acquires Whitelist, WhitelistIndex {
         let account_addr = signer::address_of(&account);
         assert!(account_addr == @truepass, error::permission_denied(EPERMISSION_DENIED));
-        let whitelist = borrow_global_mut<Whitelist>(account_addr);
-        if (!vector::contains(&whitelist.allowed_addresses, &addr)) {
-            vector::push_back(&mut whitelist.allowed_addresses, addr);
-        }
+        let index = borrow_global_mut<WhitelistIndex>(account_addr);
+        add_address(index, addr);
+    }
+
+    /// Add several addresses to the whitelist in one transaction (only callable by the deployer)
+    public entry fun batch_add_to_whitelist(account: signer, addrs: vector<address>) acquires Whitelist, WhitelistIndex {
+        let account_addr = signer::address_of(&account);
+        assert!(account_addr == @truepass, error::permission_denied(EPERMISSION_DENIED));
+        let index = borrow_global_mut<WhitelistIndex>(account_addr);
+        let i = 0;
+        let len = vector::length(&addrs);
+        while (i < len) {
+            add_address(index, *vector::borrow(&addrs, i));
+            i = i + 1;
+        };
     }
 
     /// Remove an address from the whitelist (only callable by the deployer)
-    public entry fun remove_from_whitelist(account: signer, addr: address) acquires Whitelist {
+    public entry fun remove_from_whitelist(account: signer, addr: address) acquires Whitelist, WhitelistIndex {
         let account_addr = signer::address_of(&account);
         assert!(account_addr == @truepass, error::permission_denied(EPERMISSION_DENIED));
-        let whitelist = borrow_global_mut<Whitelist>(account_addr);
-        let (found, index) = vector::index_of(&whitelist.allowed_addresses, &addr);
-        assert!(found, error::not_found(EKEY_NOT_FOUND));
-        vector::remove(&mut whitelist.allowed_addresses, index);
+        let index = borrow_global_mut<WhitelistIndex>(account_addr);
+        remove_address(index, addr);
     }
 
-    /// Check if an address is in the whitelist
-    #[view]
-    public fun is_whitelisted(addr: address): bool acquires Whitelist {
+    /// Remove several addresses from the whitelist in one transaction (only callable by the deployer).
+    /// Aborts without changes if any address is not whitelisted.
+    public entry fun batch_remove_from_whitelist(account: signer, addrs: vector<address>) acquires Whitelist, WhitelistIndex {
+        let account_addr = signer::address_of(&account);
+        assert!(account_addr == @truepass, error::permission_denied(EPERMISSION_DENIED));
+        let index = borrow_global_mut<WhitelistIndex>(account_addr);
+        let i = 0;
+        let len = vector::length(&addrs);
+        while (i < len) {
+            remove_address(index, *vector::borrow(&addrs, i));
+            i = i + 1;
+        };
+    }
+
+    /// Move up to `max_items` addresses from the legacy whitelist into the table index
+    /// (only callable by the deployer). Creates the index on the first call, so call it with
+    /// `max_items = 0` right after upgrading, then repeat until `pending_migration` reports
+    /// nothing left. The legacy resource is deleted once it is empty.
+    public entry fun migrate_whitelist(account: signer, max_items: u64) acquires Whitelist, WhitelistIndex {
+        let account_addr = signer::address_of(&account);
+        assert!(account_addr == @truepass, error::permission_denied(EPERMISSION_DENIED));
+        if (!exists<WhitelistIndex>(account_addr)) {
+            move_to(&account, new_whitelist_index());
+        };
+        if (!exists<Whitelist>(account_addr)) {
+            return
+        };
+        let legacy = &mut borrow_global_mut<Whitelist>(account_addr).allowed_addresses;
+        let count = vector::length(legacy);
+        if (count > max_items) {
+            count = max_items;
+        };
+        // Keep the remaining addresses in order so pages stay stable while migrating
+        let rest = vector::trim(legacy, count);
+        vector::reverse(legacy);
+        let index = borrow_global_mut<WhitelistIndex>(account_addr);
+        while (!vector::is_empty(legacy)) {
+            index_address(index, vector::pop_back(legacy));
+        };
+        *legacy = rest;
+        let done = vector::is_empty(legacy);
+        if (done) {
+            let Whitelist { allowed_addresses: _ } = move_from<Whitelist>(account_addr);
+        };
+    }
+
+    fun new_whitelist_index(): WhitelistIndex {
+        WhitelistIndex { positions: table::new(), members: table::new(), length: 0 }
+    }
+
+    fun add_address(index: &mut WhitelistIndex, addr: address) acquires Whitelist {
+        // An address lives either in the legacy vector or in the index, never both
+        take_legacy_address(addr);
+        index_address(index, addr);
+    }
+
+    fun index_address(index: &mut WhitelistIndex, addr: address) {
+        if (!table::contains(&index.positions, addr)) {
+            table::add(&mut index.positions, addr, index.length);
+            table::add(&mut index.members, index.length, addr);
+            index.length = index.length + 1;
+        }
+    }
+
+    fun remove_address(index: &mut WhitelistIndex, addr: address) acquires Whitelist {
+        if (take_legacy_address(addr)) {
+            return
+        };
+        assert!(table::contains(&index.positions, addr), error::not_found(EKEY_NOT_FOUND));
+        let position = table::remove(&mut index.positions, addr);
+        let last = index.length - 1;
+        let moved = table::remove(&mut index.members, last);
+        if (position != last) {
+            *table::borrow_mut(&mut index.members, position) = moved;
+            *table::borrow_mut(&mut index.positions, moved) = position;
+        };
+        index.length = last;
+    }
+
+    /// Remove `addr` from the legacy whitelist if it is still there (linear, only while migrating)
+    fun take_legacy_address(addr: address): bool acquires Whitelist {
         if (!exists<Whitelist>(@truepass)) {
             return false
         };
-        let whitelist = borrow_global<Whitelist>(@truepass);
-        vector::contains(&whitelist.allowed_addresses, &addr)
+        let legacy = &mut borrow_global_mut<Whitelist>(@truepass).allowed_addresses;
+        let (found, i) = vector::index_of(legacy, &addr);
+        if (found) {
+            vector::remove(legacy, i);
+        };
+        found
+    }
+
+    /// Check if an address is in the whitelist
+    #[view]
+    public fun is_whitelisted(addr: address): bool acquires Whitelist, WhitelistIndex {
+        if (exists<WhitelistIndex>(@truepass)
+            && table::contains(&borrow_global<WhitelistIndex>(@truepass).positions, addr)) {
+            return true
+        };
+        exists<Whitelist>(@truepass)
+            && vector::contains(&borrow_global<Whitelist>(@truepass).allowed_addresses, &addr)
     }
 
     /// Get all whitelisted addresses
     #[view]
-    public fun get_whitelist(): vector<address> acquires Whitelist {
-        if (!exists<Whitelist>(@truepass)) {
-            return vector::empty()
+    public fun get_whitelist(): vector<address> acquires Whitelist, WhitelistIndex {
+        let (indexed, legacy) = whitelist_lengths();
+        whitelist_range(0, indexed + legacy, indexed)
+    }
+
+    /// Get up to `limit` whitelisted addresses starting at index `start`, and the total count.
+    /// The next page starts at `start + length(page)`; iteration is done once that reaches the total.
+    #[view]
+    public fun get_whitelist_page(start: u64, limit: u64): (vector<address>, u64) acquires Whitelist, WhitelistIndex {
+        let (indexed, legacy) = whitelist_lengths();
+        let len = indexed + legacy;
+        (whitelist_range(start, page_end(start, limit, len), indexed), len)
+    }
+
+    /// Number of addresses in the index and in the legacy vector
+    fun whitelist_lengths(): (u64, u64) acquires Whitelist, WhitelistIndex {
+        let indexed = if (exists<WhitelistIndex>(@truepass)) {
+            borrow_global<WhitelistIndex>(@truepass).length
+        } else {
+            0
+        };
+        let legacy = if (exists<Whitelist>(@truepass)) {
+            vector::length(&borrow_global<Whitelist>(@truepass).allowed_addresses)
+        } else {
+            0
         };
-        let whitelist = borrow_global<Whitelist>(@truepass);
-        whitelist.allowed_addresses
+        (indexed, legacy)
+    }
+
+    /// Addresses at [start, end): indexed addresses first, then any not yet migrated
+    fun whitelist_range(start: u64, end: u64, indexed: u64): vector<address> acquires Whitelist, WhitelistIndex {
+        let page = vector::empty<address>();
+        let i = start;
+        while (i < end) {
+            let addr = if (i < indexed) {
+                *table::borrow(&borrow_global<WhitelistIndex>(@truepass).members, i)
+            } else {
+                *vector::borrow(&borrow_global<Whitelist>(@truepass).allowed_addresses, i - indexed)
+            };
+            vector::push_back(&mut page, addr);
+            i = i + 1;
+        };
+        page
     }
 
     /// Initialize the key-value database (only callable by the deployer)
     public entry fun init_database(account: signer) {
         let account_addr = signer::address_of(&account);
         assert!(account_addr == @truepass, error::permission_denied(EPERMISSION_DENIED));
-        move_to(&account, KeyValueDatabase { data: vector::empty() });
+        move_to(&account, new_key_value_index());
+    }
+
+    /// Move up to `max_items` pairs from the legacy database into the table index
+    /// (only callable by the deployer). Works like `migrate_whitelist`.
+    public entry fun migrate_database(account: signer, max_items: u64) acquires KeyValueDatabase, KeyValueIndex {
+        let account_addr = signer::address_of(&account);
+        assert!(account_addr == @truepass, error::permission_denied(EPERMISSION_DENIED));
+        if (!exists<KeyValueIndex>(account_addr)) {
+            move_to(&account, new_key_value_index());
+        };
+        if (!exists<KeyValueDatabase>(account_addr)) {
+            return
+        };
+        let legacy = &mut borrow_global_mut<KeyValueDatabase>(account_addr).data;
+        let count = vector::length(legacy);
+        if (count > max_items) {
+            count = max_items;
+        };
+        let rest = vector::trim(legacy, count);
+        vector::reverse(legacy);
+        let index = borrow_global_mut<KeyValueIndex>(account_addr);
+        while (!vector::is_empty(legacy)) {
+            let KeyValuePair { key, value } = vector::pop_back(legacy);
+            index_value(index, key, value);
+        };
+        *legacy = rest;
+        let done = vector::is_empty(legacy);
+        if (done) {
+            let KeyValueDatabase { data: _ } = move_from<KeyValueDatabase>(account_addr);
+        };
+    }
+
+    /// Number of whitelist addresses and key-value pairs still waiting to be migrated
+    #[view]
+    public fun pending_migration(): (u64, u64) acquires Whitelist, WhitelistIndex, KeyValueDatabase, KeyValueIndex {
+        let (_, whitelist) = whitelist_lengths();
+        let (_, database) = database_lengths();
+        (whitelist, database)
+    }
+
+    fun new_key_value_index(): KeyValueIndex {
+        KeyValueIndex { entries: table::new(), keys: table::new(), length: 0 }
     }
 
     /// Add or update a key-value pair (only callable by whitelisted addresses)
-    public entry fun set_key_value(account: signer, key: string::String, value: string::String) acquires KeyValueDatabase, Whitelist {
+    public entry fun set_key_value(
+        account: signer,
+        key: string::String,
+        value: string::String
+    ) acquires KeyValueDatabase, KeyValueIndex, Whitelist, WhitelistIndex {
         let account_addr = signer::address_of(&account);
         assert!(is_whitelisted(account_addr), error::permission_denied(ENOT_WHITELISTED));
         
-        let database = borrow_global_mut<KeyValueDatabase>(@truepass);
-        let data_ref = &mut database.data;
-        
-        // Find existing key
+        let index = borrow_global_mut<KeyValueIndex>(@truepass);
+        upsert(index, account_addr, key, value);
+    }
+
+    /// Add or update several key-value pairs in one transaction (only callable by whitelisted addresses).
+    /// `keys` and `values` must have the same length; later duplicates of a key win.
+    public entry fun batch_set_key_value(
+        account: signer,
+        keys: vector<string::String>,
+        values: vector<string::String>
+    ) acquires KeyValueDatabase, KeyValueIndex, Whitelist, WhitelistIndex {
+        let account_addr = signer::address_of(&account);
+        assert!(is_whitelisted(account_addr), error::permission_denied(ENOT_WHITELISTED));
+        let len = vector::length(&keys);
+        assert!(len == vector::length(&values), error::invalid_argument(ELENGTH_MISMATCH));
+
+        let index = borrow_global_mut<KeyValueIndex>(@truepass);
         let i = 0;
-        let len = vector::length(data_ref);
-        let found = false;
-        let old_value = string::utf8(b"");
-        
         while (i < len) {
-            let pair = vector::borrow(data_ref, i);
-            if (pair.key == key) {
-                old_value = pair.value;
-                found = true;
-                break
-            };
+            upsert(index, account_addr, *vector::borrow(&keys, i), *vector::borrow(&values, i));
             i = i + 1;
         };
-        
-        if (found) {
-            // Update existing key
-            let pair_mut = vector::borrow_mut(data_ref, i);
-            pair_mut.value = value;
-        } else {
-            // Add new key-value pair
-            vector::push_back(data_ref, KeyValuePair { key, value });
+    }
+
+    fun upsert(
+        index: &mut KeyValueIndex,
+        account_addr: address,
+        key: string::String,
+        value: string::String
+    ) acquires KeyValueDatabase {
+        // A key still in the legacy vector moves into the index on its first write
+        let old_value = take_legacy_value(key);
+        let replaced = index_value(index, key, value);
+        if (option::is_some(&replaced)) {
+            old_value = replaced;
         };
-        
+
         // Emit event
         event::emit(DatabaseChange {
             account: account_addr,
             key,
-            old_value,
+            old_value: option::destroy_with_default(old_value, string::utf8(b"")),
             new_value: value,
         });
     }
 
-    /// Get the value for a given key (readable by anyone)
-    #[view]
-    public fun get_key_value(key: string::String): string::String acquires KeyValueDatabase {
-        assert!(exists<KeyValueDatabase>(@truepass), error::not_found(EKEY_NOT_FOUND));
-        let database = borrow_global<KeyValueDatabase>(@truepass);
-        let data_ref = &database.data;
-        
+    /// Insert or overwrite `key` in the index, returning the previous value
+    fun index_value(index: &mut KeyValueIndex, key: string::String, value: string::String): Option<string::String> {
+        if (table::contains(&index.entries, key)) {
+            let entry = table::borrow_mut(&mut index.entries, key);
+            let old_value = entry.value;
+            entry.value = value;
+            return option::some(old_value)
+        };
+        table::add(&mut index.entries, key, IndexedValue { value, position: index.length });
+        table::add(&mut index.keys, index.length, key);
+        index.length = index.length + 1;
+        option::none()
+    }
+
+    /// Remove `key` from the legacy database if it is still there (linear, only while migrating)
+    fun take_legacy_value(key: string::String): Option<string::String> acquires KeyValueDatabase {
+        if (!exists<KeyValueDatabase>(@truepass)) {
+            return option::none()
+        };
+        let data_ref = &mut borrow_global_mut<KeyValueDatabase>(@truepass).data;
         let i = 0;
         let len = vector::length(data_ref);
-        
         while (i < len) {
-            let pair = vector::borrow(data_ref, i);
-            if (pair.key == key) {
-                return pair.value
+            if (vector::borrow(data_ref, i).key == key) {
+                let KeyValuePair { key: _, value } = vector::remove(data_ref, i);
+                return option::some(value)
             };
             i = i + 1;
         };
-        
-        abort error::not_found(EKEY_NOT_FOUND)
+        option::none()
     }
 
-    /// Check if a key exists in the database
-    #[view]
-    public fun key_exists(key: string::String): bool acquires KeyValueDatabase {
+    /// Look up `key` in the index, then in the legacy vector while it still exists
+    fun find_value(key: string::String): Option<string::String> acquires KeyValueDatabase, KeyValueIndex {
+        if (exists<KeyValueIndex>(@truepass)) {
+            let entries = &borrow_global<KeyValueIndex>(@truepass).entries;
+            if (table::contains(entries, key)) {
+                return option::some(table::borrow(entries, key).value)
+            };
+        };
         if (!exists<KeyValueDatabase>(@truepass)) {
-            return false
+            return option::none()
         };
-        let database = borrow_global<KeyValueDatabase>(@truepass);
-        let data_ref = &database.data;
-        
+        let data_ref = &borrow_global<KeyValueDatabase>(@truepass).data;
         let i = 0;
         let len = vector::length(data_ref);
-        
         while (i < len) {
             let pair = vector::borrow(data_ref, i);
             if (pair.key == key) {
-                return true
+                return option::some(pair.value)
             };
             i = i + 1;
         };
-        
-        false
+        option::none()
+    }
+
+    /// Get the value for a given key (readable by anyone)
+    #[view]
+    public fun get_key_value(key: string::String): string::String acquires KeyValueDatabase, KeyValueIndex {
+        let value = find_value(key);
+        assert!(option::is_some(&value), error::not_found(EKEY_NOT_FOUND));
+        option::destroy_some(value)
+    }
+
+    /// Check if a key exists in the database
+    #[view]
+    public fun key_exists(key: string::String): bool acquires KeyValueDatabase, KeyValueIndex {
+        option::is_some(&find_value(key))
     }
 
     /// Get all keys in the database
     #[view]
-    public fun get_all_keys(): vector<string::String> acquires KeyValueDatabase {
-        if (!exists<KeyValueDatabase>(@truepass)) {
-            return vector::empty()
+    public fun get_all_keys(): vector<string::String> acquires KeyValueDatabase, KeyValueIndex {
+        let (indexed, legacy) = database_lengths();
+        let (keys, _) = database_range(0, indexed + legacy, indexed, false);
+        keys
+    }
+
+    /// Get up to `limit` keys starting at index `start`, and the total number of keys.
+    /// The next page starts at `start + length(page)`; iteration is done once that reaches the total.
+    #[view]
+    public fun get_keys_page(start: u64, limit: u64): (vector<string::String>, u64) acquires KeyValueDatabase, KeyValueIndex {
+        let (indexed, legacy) = database_lengths();
+        let len = indexed + legacy;
+        let (keys, _) = database_range(start, page_end(start, limit, len), indexed, false);
+        (keys, len)
+    }
+
+    /// Like `get_keys_page`, but also returns the value of each key.
+    #[view]
+    public fun get_entries_page(
+        start: u64,
+        limit: u64
+    ): (vector<string::String>, vector<string::String>, u64) acquires KeyValueDatabase, KeyValueIndex {
+        let (indexed, legacy) = database_lengths();
+        let len = indexed + legacy;
+        let (keys, values) = database_range(start, page_end(start, limit, len), indexed, true);
+        (keys, values, len)
+    }
+
+    /// Number of pairs in the index and in the legacy vector
+    fun database_lengths(): (u64, u64) acquires KeyValueDatabase, KeyValueIndex {
+        let indexed = if (exists<KeyValueIndex>(@truepass)) {
+            borrow_global<KeyValueIndex>(@truepass).length
+        } else {
+            0
         };
-        let database = borrow_global<KeyValueDatabase>(@truepass);
-        let data_ref = &database.data;
+        let legacy = if (exists<KeyValueDatabase>(@truepass)) {
+            vector::length(&borrow_global<KeyValueDatabase>(@truepass).data)
+        } else {
+            0
+        };
+        (indexed, legacy)
+    }
+
+    /// Keys (and values if `with_values`) at [start, end): indexed pairs first, then any not yet migrated
+    fun database_range(
+        start: u64,
+        end: u64,
+        indexed: u64,
+        with_values: bool
+    ): (vector<string::String>, vector<string::String>) acquires KeyValueDatabase, KeyValueIndex {
         let keys = vector::empty<string::String>();
-        
-        let i = 0;
-        let len = vector::length(data_ref);
-        
-        while (i < len) {
-            let pair = vector::borrow(data_ref, i);
-            vector::push_back(&mut keys, pair.key);
+        let values = vector::empty<string::String>();
+        let i = start;
+        while (i < end) {
+            if (i < indexed) {
+                let index = borrow_global<KeyValueIndex>(@truepass);
+                let key = *table::borrow(&index.keys, i);
+                if (with_values) {
+                    vector::push_back(&mut values, table::borrow(&index.entries, key).value);
+                };
+                vector::push_back(&mut keys, key);
+            } else {
+                let pair = vector::borrow(&borrow_global<KeyValueDatabase>(@truepass).data, i - indexed);
+                if (with_values) {
+                    vector::push_back(&mut values, pair.value);
+                };
+                vector::push_back(&mut keys, pair.key);
+            };
             i = i + 1;
         };
-        
-        keys
+        (keys, values)
+    }
+
+    /// End index (exclusive) of the page starting at `start`, capped at MAX_PAGE_SIZE items.
+    fun page_end(start: u64, limit: u64, len: u64): u64 {
+        let size = if (limit > MAX_PAGE_SIZE) { MAX_PAGE_SIZE } else { limit };
+        if (start >= len) {
+            start
+        } else if (len - start < size) {
+            len
+        } else {
+            start + size
+        }
     }
 
     /// Delete a key-value pair (only callable by whitelisted addresses)
-    public entry fun delete_key(account: signer, key: string::String) acquires KeyValueDatabase, Whitelist {
+    public entry fun delete_key(
+        account: signer,
+        key: string::String
+    ) acquires KeyValueDatabase, KeyValueIndex, Whitelist, WhitelistIndex {
         let account_addr = signer::address_of(&account);
         assert!(is_whitelisted(account_addr), error::permission_denied(ENOT_WHITELISTED));
         
-        let database = borrow_global_mut<KeyValueDatabase>(@truepass);
-        let data_ref = &mut database.data;
-        
+        let index = borrow_global_mut<KeyValueIndex>(@truepass);
+        remove_key(index, account_addr, key);
+    }
+
+    /// Delete several keys in one transaction (only callable by whitelisted addresses).
+    /// Aborts without changes if any key does not exist.
+    public entry fun batch_delete_key(
+        account: signer,
+        keys: vector<string::String>
+    ) acquires KeyValueDatabase, KeyValueIndex, Whitelist, WhitelistIndex {
+        let account_addr = signer::address_of(&account);
+        assert!(is_whitelisted(account_addr), error::permission_denied(ENOT_WHITELISTED));
+
+        let index = borrow_global_mut<KeyValueIndex>(@truepass);
         let i = 0;
-        let len = vector::length(data_ref);
-        
+        let len = vector::length(&keys);
         while (i < len) {
-            let pair = vector::borrow(data_ref, i);
-            if (pair.key == key) {
-                let removed_pair = vector::remove(data_ref, i);
-                // Emit event for deletion
-                event::emit(DatabaseChange {
-                    account: account_addr,
-                    key,
-                    old_value: removed_pair.value,
-                    new_value: string::utf8(b""),
-                });
-                return
+            remove_key(index, account_addr, *vector::borrow(&keys, i));
+            i = i + 1;
+        };
+    }
+
+    fun remove_key(index: &mut KeyValueIndex, account_addr: address, key: string::String) acquires KeyValueDatabase {
+        let old_value = take_legacy_value(key);
+        if (option::is_none(&old_value)) {
+            assert!(table::contains(&index.entries, key), error::not_found(EKEY_NOT_FOUND));
+            let IndexedValue { value, position } = table::remove(&mut index.entries, key);
+            // Move the last key into the freed slot to keep indices dense
+            let last = index.length - 1;
+            let moved = table::remove(&mut index.keys, last);
+            if (position != last) {
+                *table::borrow_mut(&mut index.keys, position) = moved;
+                let entry = table::borrow_mut(&mut index.entries, moved);
+                entry.position = position;
             };
+            index.length = last;
+            option::fill(&mut old_value, value);
+        };
+
+        // Emit event for deletion
+        event::emit(KeyDeleted {
+            account: account_addr,
+            key,
+            old_value: option::destroy_some(old_value),
+        });
+    }
+
+    /// Publish pre-upgrade vector-backed resources, for migration tests
+    #[test_only]
+    public fun init_legacy_for_test(
+        account: &signer,
+        addrs: vector<address>,
+        keys: vector<string::String>,
+        values: vector<string::String>
+    ) {
+        let data = vector::empty<KeyValuePair>();
+        let i = 0;
+        while (i < vector::length(&keys)) {
+            vector::push_back(&mut data, KeyValuePair { key: *vector::borrow(&keys, i), value: *vector::borrow(&values, i) });
             i = i + 1;
         };
-        
-        abort error::not_found(EKEY_NOT_FOUND)
+        move_to(account, Whitelist { allowed_addresses: addrs });
+        move_to(account, KeyValueDatabase { data });
     }
 
 }
\ No newline at end of file
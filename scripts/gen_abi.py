@@ -2,12 +2,18 @@
 """
 Python version of gen_abi.sh script
 Generates ABI files for both Python backend and TypeScript frontend
+
+并发获取多个模块的 ABI，按内容哈希判断是否变化，未变化时不重写文件；
+生成的 Python 模块包含按名称索引的字典和预先计算的 view/entry 集合
 """
 
+import argparse
+import hashlib
 import json
+import re
 import requests
-import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Configuration
@@ -15,24 +21,52 @@ CONTRACT_ADDRESS = "0x3680dfbdca8eacd6edcf835f5da855e6c7a5cc9e05a1f5ded8f4294810
 MODULE_NAME = "truepass"
 NETWORK = "testnet"  # or "mainnet"
 
-def fetch_abi_from_network():
+# 默认生成的模块，第一个为主模块（ABI / CONTRACT_ADDRESS / MODULE_NAME 指向它）
+DEFAULT_MODULES = [f"{CONTRACT_ADDRESS}::{MODULE_NAME}"]
+
+# 生成格式变化时递增，使旧文件的哈希失效
+GENERATOR_VERSION = 2
+
+# 已生成文件中记录的内容哈希
+_HASH_LINE = re.compile(r'ABI_HASH\s*=\s*"([0-9a-f]+)"')
+
+# 主模块的本地 Move 源码，用于检查链上 ABI 与源码是否一致。
+# 已知漂移：链上部署的模块包含状态/消息部分（init_status、set_status_true、set_message、
+# update_status、get_status、get_message、get_number 与 AddressStatusHolder、MessageHolder、
+# MessageChange），这些在 move/sources/truepass.move 中没有源码。后端依赖这些函数，
+# 所以 ABI 仍按链上模块生成，生成时列出差异而不是删除它们
+MOVE_SOURCE_DIR = Path(__file__).resolve().parent.parent / "move" / "sources"
+
+# Move 源码中的公开/entry 函数与结构体声明
+_MOVE_FUNCTION = re.compile(r"\b(?:public(?:\([^)]*\))?\s+)?(?:entry\s+)?fun\s+(\w+)")
+_MOVE_STRUCT = re.compile(r"\bstruct\s+(\w+)")
+
+def parse_module_id(module_id):
+    """把 "地址::模块名" 拆成 (地址, 模块名)"""
+    address, sep, name = module_id.rpartition("::")
+    if not sep or not address or not name:
+        raise ValueError(f"invalid module id {module_id!r}, expected <address>::<module>")
+    return address, name
+
+def fetch_abi_from_network(address=CONTRACT_ADDRESS, module_name=MODULE_NAME, node_url=None, session=None):
     """从 Aptos 网络获取最新的 ABI"""
-    url = f"https://fullnode.{NETWORK}.aptoslabs.com/v1/accounts/{CONTRACT_ADDRESS}/module/{MODULE_NAME}"
-    
+    node_url = node_url or f"https://fullnode.{NETWORK}.aptoslabs.com/v1"
+    url = f"{node_url}/accounts/{address}/module/{module_name}"
+
     try:
         print(f"Fetching ABI from: {url}")
-        response = requests.get(url, timeout=30)
+        response = (session or requests).get(url, timeout=30)
         response.raise_for_status()
-        
+
         module_data = response.json()
         abi = module_data.get("abi", {})
-        
+
         if not abi:
             raise ValueError("No ABI found in module data")
-        
-        print("✅ Successfully fetched ABI from network")
+
+        print(f"✅ Successfully fetched ABI for {address}::{module_name}")
         return abi
-        
+
     except requests.RequestException as e:
         print(f"❌ Error fetching ABI: {e}")
         return None
@@ -40,43 +74,185 @@ def fetch_abi_from_network():
         print(f"❌ Error processing ABI: {e}")
         return None
 
-def generate_python_abi(abi_data, output_path):
+def fetch_abis(module_ids, node_url=None, workers=8):
+    """并发获取多个模块的 ABI，任一模块失败时返回 None"""
+    modules = [parse_module_id(module_id) for module_id in module_ids]
+    with requests.Session() as session, ThreadPoolExecutor(max_workers=min(workers, len(modules))) as pool:
+        results = list(pool.map(
+            lambda module: fetch_abi_from_network(module[0], module[1], node_url, session),
+            modules,
+        ))
+    if any(abi is None for abi in results):
+        return None
+    return results
+
+def load_abis(path):
+    """从本地 JSON 读取 ABI：单个 ABI、模块响应（含 "abi" 字段）或它们的列表"""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    items = data if isinstance(data, list) else [data]
+    return [item.get("abi", item) for item in items]
+
+def source_drift(abi, source_dir=MOVE_SOURCE_DIR):
+    """
+    ABI 中有、本地 Move 源码中没有的函数和结构体：(函数名列表, 结构体名列表)。
+    找不到 <模块名>.move 时返回 None
+    """
+    path = Path(source_dir) / f"{abi['name']}.move"
+    try:
+        source = path.read_text(encoding="utf-8")
+    except OSError:
+        return None
+    functions = set(_MOVE_FUNCTION.findall(source))
+    structs = set(_MOVE_STRUCT.findall(source))
+    return (
+        sorted(f["name"] for f in abi.get("exposed_functions", []) if f["name"] not in functions),
+        sorted(s["name"] for s in abi.get("structs", []) if s["name"] not in structs),
+    )
+
+def report_source_drift(abi):
+    """在标准错误输出 ABI 与本地源码的差异（生成仍按 ABI 进行）"""
+    drift = source_drift(abi)
+    if drift is None or not any(drift):
+        return
+    functions, structs = drift
+    print(f"⚠️  {_module_id(abi)} ABI has items missing from move/sources/{abi['name']}.move:", file=sys.stderr)
+    if functions:
+        print(f"   functions: {', '.join(functions)}", file=sys.stderr)
+    if structs:
+        print(f"   structs: {', '.join(structs)}", file=sys.stderr)
+
+def abi_hash(abis):
+    """ABI 内容哈希（键排序后的规范 JSON），包含生成器版本"""
+    canonical = json.dumps([GENERATOR_VERSION, abis], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+def existing_hash(path):
+    """读取已生成文件中的 ABI_HASH，不存在时返回 None"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            match = _HASH_LINE.search(f.read())
+    except OSError:
+        return None
+    return match.group(1) if match else None
+
+# JSON 字符串或 true/false/null 关键字
+_JSON_TOKEN = re.compile(r'("(?:\\.|[^"\\])*")|\b(true|false|null)\b')
+_PYTHON_KEYWORDS = {"true": "True", "false": "False", "null": "None"}
+
+def to_python_literal(data, indent=4):
+    """把数据输出为 Python 字面量（JSON 格式，但 true/false/null 换成 Python 关键字）"""
+    return _JSON_TOKEN.sub(
+        lambda m: m.group(1) or _PYTHON_KEYWORDS[m.group(2)],
+        json.dumps(data, indent=indent),
+    )
+
+def _module_id(abi):
+    return f"{abi['address']}::{abi['name']}"
+
+def _index_entries(abi, key):
+    """[(名称, 在 ABI[key] 中的下标)]，按名称排序"""
+    return sorted((item["name"], i) for i, item in enumerate(abi[key]))
+
+def _python_index(variable, abi_expr, key, entries):
+    """生成按名称索引到 ABI 列表元素的字典字面量（引用同一对象，不复制定义）"""
+    lines = [f"{variable} = {{"]
+    lines += [f'    "{name}": {abi_expr}["{key}"][{i}],' for name, i in entries]
+    lines.append("}")
+    return "\n".join(lines)
+
+def _python_tuple(variable, abi_expr, key, entries):
+    lines = [f"{variable} = ("]
+    lines += [f'    {abi_expr}["{key}"][{i}],' for _, i in entries]
+    lines.append(")")
+    return "\n".join(lines)
+
+def _python_names(variable, names):
+    if not names:
+        return f"{variable} = frozenset()"
+    return f"{variable} = frozenset({{\n" + "".join(f'    "{name}",\n' for name in names) + "})"
+
+def generate_python_abi(abi_list, output_path, content_hash):
     """生成 Python ABI 文件"""
+    primary = abi_list[0]
+    functions = _index_entries(primary, "exposed_functions")
+    structs = _index_entries(primary, "structs")
+    views = [name for name, i in functions if primary["exposed_functions"][i]["is_view"]]
+    entries = [name for name, i in functions if primary["exposed_functions"][i]["is_entry"]]
+    sources = ", ".join(_module_id(abi) for abi in abi_list)
+
+    extra_modules = ""
+    qualified = [
+        f'    "{_module_id(primary)}::{name}": ABI["exposed_functions"][{i}],' for name, i in functions
+    ]
+    module_entries = [f'    "{_module_id(primary)}": ABI,']
+    for n, abi in enumerate(abi_list[1:], 1):
+        extra_modules += f"\nABI_{n} = {to_python_literal(abi)}\n"
+        module_entries.append(f'    "{_module_id(abi)}": ABI_{n},')
+        qualified += [
+            f'    "{_module_id(abi)}::{name}": ABI_{n}["exposed_functions"][{i}],'
+            for name, i in _index_entries(abi, "exposed_functions")
+        ]
+
     python_content = f'''"""
-Auto-generated ABI for {MODULE_NAME} contract
-Generated from: {CONTRACT_ADDRESS}
+Auto-generated ABI for {primary["name"]} contract
+Generated from: {sources}
 Network: {NETWORK}
 """
 
-ABI = {json.dumps(abi_data, indent=4)}
+ABI_HASH = "{content_hash}"
 
+ABI = {to_python_literal(primary)}
+{extra_modules}
 # Helper functions for easier access
-CONTRACT_ADDRESS = "{CONTRACT_ADDRESS}"
-MODULE_NAME = "{MODULE_NAME}"
+CONTRACT_ADDRESS = "{primary["address"]}"
+MODULE_NAME = "{primary["name"]}"
+
+# 生成时建好的索引，查找为 O(1)，导入时不做任何扫描
+{_python_index("FUNCTIONS", "ABI", "exposed_functions", functions)}
+
+{_python_index("STRUCTS", "ABI", "structs", structs)}
+
+{_python_names("VIEW_FUNCTION_NAMES", views)}
+
+{_python_names("ENTRY_FUNCTION_NAMES", entries)}
+
+{_python_tuple("VIEW_FUNCTIONS", "ABI", "exposed_functions", [(name, i) for name, i in functions if name in views])}
+
+{_python_tuple("ENTRY_FUNCTIONS", "ABI", "exposed_functions", [(name, i) for name, i in functions if name in entries])}
+
+# 所有生成模块：模块 ID -> ABI，"地址::模块::函数" -> 函数定义
+MODULES = {{
+{chr(10).join(module_entries)}
+}}
+
+QUALIFIED_FUNCTIONS = {{
+{chr(10).join(qualified)}
+}}
 
 def get_function_by_name(name: str):
     """Get function definition by name"""
-    for func in ABI["exposed_functions"]:
-        if func["name"] == name:
-            return func
-    return None
+    return FUNCTIONS.get(name)
 
 def get_struct_by_name(name: str):
     """Get struct definition by name"""
-    for struct in ABI["structs"]:
-        if struct["name"] == name:
-            return struct
-    return None
+    return STRUCTS.get(name)
 
 def get_view_functions():
     """Get all view functions"""
-    return [func for func in ABI["exposed_functions"] if func["is_view"]]
+    return list(VIEW_FUNCTIONS)
 
 def get_entry_functions():
     """Get all entry functions"""
-    return [func for func in ABI["exposed_functions"] if func["is_entry"]]
+    return list(ENTRY_FUNCTIONS)
+
+def is_view_function(name: str) -> bool:
+    return name in VIEW_FUNCTION_NAMES
+
+def is_entry_function(name: str) -> bool:
+    return name in ENTRY_FUNCTION_NAMES
 '''
-    
+
     try:
         with open(output_path, 'w', encoding='utf-8') as f:
             f.write(python_content)
@@ -86,40 +262,73 @@ def get_entry_functions():
         print(f"❌ Error writing Python ABI: {e}")
         return False
 
-def generate_typescript_abi(abi_data, output_path):
+def _ts_index(variable, abi_expr, key, entries):
+    lines = [f"export const {variable} = {{"]
+    lines += [f'  "{name}": {abi_expr}.{key}[{i}],' for name, i in entries]
+    lines.append("} as const;")
+    return "\n".join(lines)
+
+def generate_typescript_abi(abi_list, output_path, content_hash):
     """生成 TypeScript ABI 文件"""
-    ts_content = f'''// Auto-generated ABI for {MODULE_NAME} contract
-// Generated from: {CONTRACT_ADDRESS}
+    primary = abi_list[0]
+    functions = _index_entries(primary, "exposed_functions")
+    structs = _index_entries(primary, "structs")
+    views = [name for name, i in functions if primary["exposed_functions"][i]["is_view"]]
+    entries = [name for name, i in functions if primary["exposed_functions"][i]["is_entry"]]
+    sources = ", ".join(_module_id(abi) for abi in abi_list)
+
+    extra_modules = ""
+    module_entries = [f'  "{_module_id(primary)}": ABI,']
+    for n, abi in enumerate(abi_list[1:], 1):
+        extra_modules += f"\nexport const ABI_{n} = {json.dumps(abi, indent=2)} as const;\n"
+        module_entries.append(f'  "{_module_id(abi)}": ABI_{n},')
+
+    ts_content = f'''// Auto-generated ABI for {primary["name"]} contract
+// Generated from: {sources}
 // Network: {NETWORK}
 
-export const ABI = {json.dumps(abi_data, indent=2)} as const;
+export const ABI_HASH = "{content_hash}";
 
+export const ABI = {json.dumps(primary, indent=2)} as const;
+{extra_modules}
 // Helper constants
-export const CONTRACT_ADDRESS = "{CONTRACT_ADDRESS}";
-export const MODULE_NAME = "{MODULE_NAME}";
+export const CONTRACT_ADDRESS = "{primary["address"]}";
+export const MODULE_NAME = "{primary["name"]}";
+
+export const MODULES = {{
+{chr(10).join(module_entries)}
+}} as const;
 
 // Type definitions
 export type ABIFunction = typeof ABI.exposed_functions[number];
 export type ABIStruct = typeof ABI.structs[number];
 
+// Lookup tables built at generation time
+{_ts_index("FUNCTIONS", "ABI", "exposed_functions", functions)}
+
+{_ts_index("STRUCTS", "ABI", "structs", structs)}
+
+export const VIEW_FUNCTION_NAMES: ReadonlySet<string> = new Set({json.dumps(views)});
+export const ENTRY_FUNCTION_NAMES: ReadonlySet<string> = new Set({json.dumps(entries)});
+
 // Helper functions
 export function getFunctionByName(name: string): ABIFunction | undefined {{
-  return ABI.exposed_functions.find(func => func.name === name);
+  return (FUNCTIONS as Record<string, ABIFunction>)[name];
 }}
 
 export function getStructByName(name: string): ABIStruct | undefined {{
-  return ABI.structs.find(struct => struct.name === name);
+  return (STRUCTS as Record<string, ABIStruct>)[name];
 }}
 
 export function getViewFunctions(): ABIFunction[] {{
-  return ABI.exposed_functions.filter(func => func.is_view);
+  return [...VIEW_FUNCTION_NAMES].map(name => (FUNCTIONS as Record<string, ABIFunction>)[name]);
 }}
 
 export function getEntryFunctions(): ABIFunction[] {{
-  return ABI.exposed_functions.filter(func => func.is_entry);
+  return [...ENTRY_FUNCTION_NAMES].map(name => (FUNCTIONS as Record<string, ABIFunction>)[name]);
 }}
 '''
-    
+
     try:
         with open(output_path, 'w', encoding='utf-8') as f:
             f.write(ts_content)
@@ -129,42 +338,67 @@ export function getEntryFunctions(): ABIFunction[] {{
         print(f"❌ Error writing TypeScript ABI: {e}")
         return False
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate Python and TypeScript ABI files")
+    parser.add_argument(
+        "--module", action="append", dest="modules", metavar="ADDRESS::MODULE",
+        help="module to include (repeatable, first is the primary module)",
+    )
+    parser.add_argument("--node-url", help="fullnode REST URL (defaults to the configured network)")
+    parser.add_argument("--from-file", metavar="JSON", help="read ABIs from a local JSON file instead of the network")
+    parser.add_argument("--force", action="store_true", help="rewrite files even if the ABI hash is unchanged")
+    return parser.parse_args(argv)
+
 def main():
     """主函数"""
+    args = parse_args()
     print("🚀 Starting ABI generation...")
-    
+
     # 获取脚本所在目录
     script_dir = Path(__file__).parent
     project_root = script_dir.parent
-    
+
     # 定义输出路径
     python_abi_path = project_root / "backend" / "abi.py"
     ts_abi_path = project_root / "front" / "src" / "utils" / "abi.ts"
-    
+
     # 创建目录（如果不存在）
     python_abi_path.parent.mkdir(parents=True, exist_ok=True)
     ts_abi_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    # 从网络获取 ABI
-    abi_data = fetch_abi_from_network()
-    if not abi_data:
+
+    # 获取 ABI（本地文件或并发从网络获取）
+    if args.from_file:
+        abi_list = load_abis(args.from_file)
+    else:
+        abi_list = fetch_abis(args.modules or DEFAULT_MODULES, args.node_url)
+    if not abi_list:
         print("❌ Failed to fetch ABI, exiting...")
         sys.exit(1)
-    
-    # 生成文件
+
+    # 链上模块与本地源码不一致时提示（见 MOVE_SOURCE_DIR 处的已知漂移说明）
+    report_source_drift(abi_list[0])
+
+    content_hash = abi_hash(abi_list)
+    outputs = [
+        (python_abi_path, generate_python_abi),
+        (ts_abi_path, generate_typescript_abi),
+    ]
+
+    # 生成文件（内容哈希未变化的跳过）
     success_count = 0
-    
-    if generate_python_abi(abi_data, python_abi_path):
-        success_count += 1
-    
-    if generate_typescript_abi(abi_data, ts_abi_path):
-        success_count += 1
-    
-    if success_count == 2:
+
+    for path, generate in outputs:
+        if not args.force and existing_hash(path) == content_hash:
+            print(f"⏭️  {path} is up to date ({content_hash[:12]})")
+            success_count += 1
+        elif generate(abi_list, path, content_hash):
+            success_count += 1
+
+    if success_count == len(outputs):
         print("🎉 All ABI files generated successfully!")
     else:
-        print(f"⚠️  Only {success_count}/2 files generated successfully")
+        print(f"⚠️  Only {success_count}/{len(outputs)} files generated successfully")
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()